@@ -1,15 +1,19 @@
 """Agent adapters for query planning, extraction, composition, and verification."""
 
+from .cached_extractor import CachedDataExtractor, CacheStats
 from .composer import LLMResponseComposer
+from .compressor import SentenceContextCompressor
 from .config import AgentConfig
 from .extractor import LLMDataExtractor
 from .factory import (
+    create_context_compressor,
     create_context_retriever,
     create_data_extractor,
     create_query_planner,
     create_response_composer,
     create_response_verifier,
 )
+from .fast_planner import CachedQueryPlanner, FastPathQueryPlanner, RuleBasedClassifier
 from .planner import LLMQueryPlanner
 from .retriever import IntentDrivenRetriever
 from .verifier import LLMResponseVerifier
@@ -17,13 +21,20 @@ from .verifier import LLMResponseVerifier
 __all__ = [
     "AgentConfig",
     "LLMQueryPlanner",
+    "CachedQueryPlanner",
+    "FastPathQueryPlanner",
+    "RuleBasedClassifier",
     "LLMDataExtractor",
+    "CachedDataExtractor",
+    "CacheStats",
     "LLMResponseComposer",
     "LLMResponseVerifier",
     "IntentDrivenRetriever",
+    "SentenceContextCompressor",
     "create_query_planner",
     "create_data_extractor",
     "create_response_composer",
     "create_response_verifier",
     "create_context_retriever",
+    "create_context_compressor",
 ]
@@ -0,0 +1,122 @@
+"""Cache in front of the data extractor, for repeated extraction over the same grounding."""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+
+from democrata_server.domain.agents.entities import ExtractionResult, IntentResult
+from democrata_server.domain.agents.ports import DataExtractor
+from democrata_server.domain.rag.ports import Cache
+
+from .extractor import build_query_focus
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction prompts or schemas change
+EXTRACTION_CACHE_VERSION = 1
+EXTRACTION_CACHE_PREFIX = "extraction:"
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts since the process started."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedDataExtractor:
+    """
+    Reuses extractions for the same component type, context and query focus.
+
+    The context is identified by the sorted digests of its chunk texts. The
+    DataExtractor port receives texts rather than chunk IDs, and a digest
+    also tells apart chunks whose text was compressed differently. Failed
+    extractions, which spend no tokens, are not cached.
+    """
+
+    def __init__(
+        self,
+        extractor: DataExtractor,
+        cache: Cache,
+        ttl_seconds: int = 86400,
+        namespace: str = "",
+    ):
+        self.extractor = extractor
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace  # e.g. the extractor model
+        self.stats = CacheStats()
+
+    async def extract(
+        self,
+        component_type: str,
+        context: list[str],
+        intent: IntentResult,
+    ) -> tuple[ExtractionResult, dict]:
+        key = self._key(component_type, context, intent)
+        try:
+            cached = await self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Extraction cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            self.stats.hits += 1
+            logger.debug(f"Extraction cache hit for {component_type}")
+            return cached, {"input_tokens": 0, "output_tokens": 0}
+
+        self.stats.misses += 1
+        result, usage = await self.extractor.extract(component_type, context, intent)
+        if usage.get("input_tokens", 0) > 0:
+            try:
+                await self.cache.set(key, result, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Extraction cache store failed: {e}")
+        return result, usage
+
+    async def extract_many(
+        self,
+        component_types: list[str],
+        context: list[str],
+        intent: IntentResult,
+    ) -> tuple[list[ExtractionResult], dict]:
+        keys = {ct: self._key(ct, context, intent) for ct in dict.fromkeys(component_types)}
+        results: dict[str, ExtractionResult] = {}
+        for component_type, key in keys.items():
+            try:
+                cached = await self.cache.get(key)
+            except Exception as e:
+                logger.warning(f"Extraction cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                results[component_type] = cached
+        self.stats.hits += len(results)
+
+        missing = [ct for ct in keys if ct not in results]
+        usage: dict = {"input_tokens": 0, "output_tokens": 0}
+        if missing:
+            self.stats.misses += len(missing)
+            extractions, usage = await self.extractor.extract_many(missing, context, intent)
+            for component_type, extraction in zip(missing, extractions):
+                results[component_type] = extraction
+                # Failed extractions come back empty
+                if usage.get("input_tokens", 0) > 0 and extraction.extracted_data:
+                    try:
+                        await self.cache.set(keys[component_type], extraction, self.ttl_seconds)
+                    except Exception as e:
+                        logger.warning(f"Extraction cache store failed: {e}")
+        return [results[ct] for ct in component_types], usage
+
+    def _key(self, component_type: str, context: list[str], intent: IntentResult) -> str:
+        digest = hashlib.sha256(build_query_focus(intent).encode())
+        for chunk_digest in sorted(hashlib.sha256(text.encode()).digest() for text in context):
+            digest.update(chunk_digest)
+        return (
+            f"{EXTRACTION_CACHE_PREFIX}v{EXTRACTION_CACHE_VERSION}:{self.namespace}:"
+            f"{component_type}:{digest.hexdigest()[:32]}"
+        )
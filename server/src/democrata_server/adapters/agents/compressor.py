@@ -0,0 +1,155 @@
+"""Context compression between retrieval and the extraction and verification agents."""
+
+import logging
+import re
+from collections.abc import Callable
+
+from democrata_server.domain.agents.entities import IntentResult
+from democrata_server.domain.rag.entities import CompressedContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPONENT_TOKEN_BUDGET = 3000
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 400  # Ingestion overlaps adjacent chunks by 200 characters
+
+# Share of the component token budget per component type. Structured
+# components need a handful of facts, while prose and comparisons need more
+COMPONENT_BUDGET_SHARES: dict[str, float] = {
+    "text_block": 1.0,
+    "comparison": 1.0,
+    "timeline": 0.75,
+    "data_table": 0.75,
+    "voting_breakdown": 0.5,
+    "chart": 0.5,
+    "member_profiles": 0.5,
+    "notice": 0.25,
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be been by did do does for from had has have how in is it its of on "
+    "or over since than that the their them they this to was were what when where which who "
+    "why will with about between during into compare tell show me".split()
+)
+
+
+def _overlap(before: str, after: str) -> int:
+    """Length of the longest suffix of `before` that is also a prefix of `after`."""
+    longest = min(len(before), len(after), MAX_OVERLAP_CHARS)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if before.endswith(after[:size]):
+            return size
+    return 0
+
+
+class SentenceContextCompressor:
+    """
+    Cuts context tokens without reordering retrieval results.
+
+    1. Removes the overlap that chunking duplicates between adjacent chunks of
+       the same document, when both are in the context.
+    2. Keeps only sentences that mention a query term or extracted entity.
+       A chunk with no such sentence is kept whole, because vector search
+       found it relevant in ways that keywords do not show.
+    3. Stops adding text once the component's token budget is reached.
+    """
+
+    def __init__(
+        self,
+        token_counter: Callable[[list[str]], int],
+        component_token_budget: int = DEFAULT_COMPONENT_TOKEN_BUDGET,
+        budget_shares: dict[str, float] | None = None,
+    ):
+        self.token_counter = token_counter
+        self.component_token_budget = component_token_budget
+        self.budget_shares = budget_shares or COMPONENT_BUDGET_SHARES
+
+    def compress(
+        self,
+        query: str,
+        intent: IntentResult,
+        chunks: list,
+        component_type: str | None = None,
+    ) -> CompressedContext:
+        original_tokens = self.token_counter([chunk.text for chunk in chunks])
+        budget = self._budget(component_type)
+        terms = self._terms(query, intent)
+
+        texts: list[str] = []
+        used = 0
+        for text in self._without_overlap(chunks):
+            sentences = self._relevant_sentences(text, terms)
+            tokens = self.token_counter(sentences)
+            if used + tokens <= budget:
+                texts.append(" ".join(sentences))
+                used += tokens
+                continue
+            # Fill the remaining budget with this chunk's leading sentences
+            kept = []
+            for sentence in sentences:
+                sentence_tokens = self.token_counter([sentence])
+                if used + sentence_tokens > budget:
+                    break
+                kept.append(sentence)
+                used += sentence_tokens
+            if kept:
+                texts.append(" ".join(kept))
+            break
+
+        compressed = CompressedContext(
+            texts=texts, original_tokens=original_tokens, compressed_tokens=used
+        )
+        logger.debug(
+            f"Compressed context for {component_type or 'verifier'}: "
+            f"{original_tokens} -> {used} tokens"
+        )
+        return compressed
+
+    def _budget(self, component_type: str | None) -> int:
+        if component_type is None:
+            # The verifier checks every component, so it sees the largest context
+            share = max(self.budget_shares.values(), default=1.0)
+        else:
+            share = self.budget_shares.get(component_type, 1.0)
+        return max(1, int(self.component_token_budget * share))
+
+    def _terms(self, query: str, intent: IntentResult) -> set[str]:
+        entities = intent.entities
+        phrases = [
+            query,
+            *entities.parties,
+            *entities.members,
+            *entities.bills,
+            *entities.topics,
+        ]
+        return {
+            word
+            for phrase in phrases
+            for word in _WORD.findall(phrase.lower())
+            if len(word) > 2 and word not in _STOPWORDS
+        }
+
+    def _without_overlap(self, chunks: list) -> list[str]:
+        """Chunk texts in retrieval order, trimming text already given by an adjacent chunk."""
+        emitted: dict[tuple, str] = {}
+        texts = []
+        for chunk in chunks:
+            text = chunk.text
+            document_id, position = chunk.document_id, chunk.position
+            if (previous := emitted.get((document_id, position - 1))) is not None:
+                text = text[_overlap(previous, text) :]
+            if (following := emitted.get((document_id, position + 1))) is not None:
+                text = text[: len(text) - _overlap(text, following)]
+            emitted[(document_id, position)] = chunk.text
+            if text.strip():
+                texts.append(text.strip())
+        return texts
+
+    def _relevant_sentences(self, text: str, terms: set[str]) -> list[str]:
+        sentences = [s for s in _SENTENCE_END.split(text) if s.strip()]
+        if not terms:
+            return sentences
+        relevant = [s for s in sentences if terms.intersection(_WORD.findall(s.lower()))]
+        return relevant or sentences
@@ -16,6 +16,12 @@ class AgentConfig:
 
     # Feature flags
     verifier_enabled: bool
+    verifier_background: bool  # Return responses before verification finishes
+
+    # Planner shortcuts
+    planner_fast_path_min_confidence: float  # Above 1 disables the rule-based fast path
+    planner_cache_ttl_seconds: int  # 0 disables the intent cache
+    extraction_cache_ttl_seconds: int  # 0 disables the extraction cache
 
     # API configuration
     openai_api_key: str | None
@@ -24,6 +30,11 @@ class AgentConfig:
     # Retrieval configuration
     default_top_k: int
     min_chunks_for_sufficiency: int
+    context_token_budget: int  # 0 disables the budget
+    hybrid_search_enabled: bool
+    context_compression_enabled: bool
+    component_token_budget: int  # Context tokens per component extraction, before its share
+    extractor_fused: bool  # Extract all components in one LLM call
 
     @classmethod
     def from_env(cls) -> "AgentConfig":
@@ -36,10 +47,23 @@ class AgentConfig:
             verifier_model=os.getenv("AGENT_VERIFIER_MODEL", "gpt-4o-mini"),
             # Feature flags
             verifier_enabled=os.getenv("AGENT_VERIFIER_ENABLED", "true").lower() == "true",
+            verifier_background=os.getenv("AGENT_VERIFIER_BACKGROUND", "false").lower() == "true",
+            # Planner shortcuts
+            planner_fast_path_min_confidence=float(
+                os.getenv("AGENT_PLANNER_FAST_PATH_CONFIDENCE", "0.85")
+            ),
+            planner_cache_ttl_seconds=int(os.getenv("AGENT_PLANNER_CACHE_TTL", "86400")),
+            extraction_cache_ttl_seconds=int(os.getenv("AGENT_EXTRACTION_CACHE_TTL", "86400")),
             # API configuration
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             openai_base_url=os.getenv("OPENAI_BASE_URL"),
             # Retrieval
             default_top_k=int(os.getenv("AGENT_DEFAULT_TOP_K", "20")),
             min_chunks_for_sufficiency=int(os.getenv("AGENT_MIN_CHUNKS", "3")),
+            context_token_budget=int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "6000")),
+            hybrid_search_enabled=os.getenv("AGENT_HYBRID_SEARCH", "true").lower() == "true",
+            context_compression_enabled=os.getenv("AGENT_CONTEXT_COMPRESSION", "true").lower()
+            == "true",
+            component_token_budget=int(os.getenv("AGENT_COMPONENT_TOKEN_BUDGET", "3000")),
+            extractor_fused=os.getenv("AGENT_EXTRACTOR_FUSED", "true").lower() == "true",
         )
@@ -1,5 +1,6 @@
 """LLM-based data extractor for grounded extraction from context."""
 
+import asyncio
 import json
 import logging
 from typing import Any
@@ -13,12 +14,33 @@ from democrata_server.domain.agents.entities import (
     SourceQuote,
 )
 
-from .prompts.extractor import EXTRACTION_PROMPTS, GENERIC_EXTRACTION_PROMPT
+from .prompts.extractor import (
+    EXTRACTION_FORMATS,
+    EXTRACTION_PROMPTS,
+    GENERIC_EXTRACTION_FORMAT,
+    GENERIC_EXTRACTION_PROMPT,
+    MULTI_EXTRACTION_PROMPT,
+)
 from .schemas import BaseExtractionSchema, get_extraction_schema
 
 logger = logging.getLogger(__name__)
 
 
+def build_query_focus(intent: IntentResult) -> str:
+    """Summarise the entities an extraction should focus on."""
+    query_focus_parts = []
+    if intent.entities.parties:
+        query_focus_parts.append(f"Parties: {', '.join(intent.entities.parties)}")
+    if intent.entities.members:
+        query_focus_parts.append(f"Members: {', '.join(intent.entities.members)}")
+    if intent.entities.bills:
+        query_focus_parts.append(f"Bills: {', '.join(intent.entities.bills)}")
+    if intent.entities.topics:
+        query_focus_parts.append(f"Topics: {', '.join(intent.entities.topics)}")
+
+    return "; ".join(query_focus_parts) if query_focus_parts else "General query"
+
+
 class LLMDataExtractor:
     """Data extractor that uses an LLM to extract grounded, structured data."""
 
@@ -77,6 +99,75 @@ class LLMDataExtractor:
                 "model": self.model,
             }
 
+    async def extract_many(
+        self,
+        component_types: list[str],
+        context: list[str],
+        intent: IntentResult,
+    ) -> tuple[list[ExtractionResult], dict]:
+        """
+        Extract several component types in one LLM call. Returns (results, token_usage).
+
+        Each component's part of the response is validated against its schema.
+        Components that are missing or fail validation are extracted again on
+        their own, so one malformed schema does not cost the others.
+        """
+        unique_types = list(dict.fromkeys(component_types))
+        if len(unique_types) == 1 or not context:
+            extractions = await asyncio.gather(
+                *(self.extract(component_type, context, intent) for component_type in unique_types)
+            )
+            by_type = {ct: extraction for ct, (extraction, _) in zip(unique_types, extractions)}
+            usage = self._sum_usage([u for _, u in extractions])
+            return [by_type[ct] for ct in component_types], usage
+
+        prompt = self._build_multi_prompt(unique_types, context, intent)
+        messages = [
+            SystemMessage(
+                content=(
+                    "You are a data extractor. Extract only facts explicitly stated "
+                    "in the context. Output valid JSON only."
+                )
+            ),
+            HumanMessage(content=prompt),
+        ]
+
+        usages: list[dict] = []
+        results: dict[str, ExtractionResult] = {}
+        try:
+            response = await self.llm.ainvoke(messages)
+            usages.append(self._extract_token_usage(response))
+            data = self._load_json(
+                response.content if isinstance(response.content, str) else str(response.content)
+            )
+            for component_type in unique_types:
+                try:
+                    schema_class = get_extraction_schema(component_type)
+                    schema = schema_class.model_validate(data[component_type])
+                    results[component_type] = self._build_extraction_result(schema, component_type)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.info(
+                        f"Fused extraction invalid for {component_type}, retrying alone: {e}"
+                    )
+        except Exception as e:
+            logger.warning(f"Fused extraction failed, falling back to one call per component: {e}")
+
+        missing = [ct for ct in unique_types if ct not in results]
+        if missing:
+            fallbacks = await asyncio.gather(*(self.extract(ct, context, intent) for ct in missing))
+            for component_type, (extraction, usage) in zip(missing, fallbacks):
+                results[component_type] = extraction
+                usages.append(usage)
+
+        return [results[ct] for ct in component_types], self._sum_usage(usages)
+
+    def _sum_usage(self, usages: list[dict]) -> dict:
+        return {
+            "input_tokens": sum(u.get("input_tokens", 0) for u in usages),
+            "output_tokens": sum(u.get("output_tokens", 0) for u in usages),
+            "model": self.model,
+        }
+
     def _extract_token_usage(self, response) -> dict:
         """Extract token usage from LangChain response metadata."""
         usage = {}
@@ -96,15 +187,20 @@ class LLMDataExtractor:
             "model": self.model,
         }
 
-    def _parse_json_content(self, content: str, schema_class: type[BaseExtractionSchema]) -> BaseExtractionSchema:
-        """Extract JSON from response and validate against schema."""
+    def _load_json(self, content: str) -> Any:
+        """Extract JSON from response, handling markdown code blocks."""
         text = content.strip()
         if "```json" in text:
             text = text.split("```json")[1].split("```")[0]
         elif "```" in text:
             text = text.split("```")[1].split("```")[0]
-        data = json.loads(text)
-        return schema_class.model_validate(data)
+        return json.loads(text)
+
+    def _parse_json_content(
+        self, content: str, schema_class: type[BaseExtractionSchema]
+    ) -> BaseExtractionSchema:
+        """Extract JSON from response and validate against schema."""
+        return schema_class.model_validate(self._load_json(content))
 
     def _parse_extraction(self, content: str, component_type: str) -> ExtractionResult:
         """Parse response content to ExtractionResult. Returns empty result on parse failure."""
@@ -125,18 +221,7 @@ class LLMDataExtractor:
         prompt_template = EXTRACTION_PROMPTS.get(component_type, GENERIC_EXTRACTION_PROMPT)
         context_text = "\n\n---\n\n".join(context)
 
-        # Build query focus from intent
-        query_focus_parts = []
-        if intent.entities.parties:
-            query_focus_parts.append(f"Parties: {', '.join(intent.entities.parties)}")
-        if intent.entities.members:
-            query_focus_parts.append(f"Members: {', '.join(intent.entities.members)}")
-        if intent.entities.bills:
-            query_focus_parts.append(f"Bills: {', '.join(intent.entities.bills)}")
-        if intent.entities.topics:
-            query_focus_parts.append(f"Topics: {', '.join(intent.entities.topics)}")
-
-        query_focus = "; ".join(query_focus_parts) if query_focus_parts else "General query"
+        query_focus = build_query_focus(intent)
 
         # Format the prompt
         format_kwargs: dict[str, Any] = {
@@ -156,6 +241,33 @@ class LLMDataExtractor:
 
         return prompt_template.format(**format_kwargs)
 
+    def _build_multi_prompt(
+        self,
+        component_types: list[str],
+        context: list[str],
+        intent: IntentResult,
+    ) -> str:
+        """Build one prompt asking for every component type's format."""
+        component_formats = "\n\n".join(
+            f'"{component_type}":\n'
+            + EXTRACTION_FORMATS.get(component_type, GENERIC_EXTRACTION_FORMAT)
+            for component_type in component_types
+        )
+
+        extra_instructions = ""
+        if "comparison" in component_types:
+            entities = ", ".join(intent.entities.parties) or "entities mentioned in context"
+            extra_instructions = f"Entities to compare: {entities}\n"
+
+        # The formats keep their escaped braces until this single format() call
+        return (
+            MULTI_EXTRACTION_PROMPT.replace("{component_formats}", component_formats).format(
+                context="\n\n---\n\n".join(context),
+                query_focus=build_query_focus(intent),
+                extra_instructions=extra_instructions,
+            )
+        )
+
     def _build_extraction_result(
         self, data: BaseExtractionSchema, component_type: str
     ) -> ExtractionResult:
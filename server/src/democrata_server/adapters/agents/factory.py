@@ -2,44 +2,80 @@
 
 from typing import Any
 
+from democrata_server.adapters.llm.sparse_encoder import BM25SparseEncoder
+from democrata_server.adapters.llm.token_counter import count_tokens
 from democrata_server.domain.agents.ports import (
     DataExtractor,
     QueryPlanner,
     ResponseComposer,
     ResponseVerifier,
 )
-from democrata_server.domain.rag.ports import ContextRetriever
+from democrata_server.domain.rag.ports import Cache, ContextCompressor, ContextRetriever
 
+from .cached_extractor import CachedDataExtractor
 from .config import AgentConfig
 from .composer import LLMResponseComposer
+from .compressor import SentenceContextCompressor
 from .extractor import LLMDataExtractor
+from .fast_planner import CachedQueryPlanner, FastPathQueryPlanner
 from .planner import LLMQueryPlanner
 from .retriever import IntentDrivenRetriever
 from .verifier import LLMResponseVerifier
 
 
-def create_query_planner(config: AgentConfig | None = None) -> QueryPlanner:
-    """Create a query planner instance."""
+def create_query_planner(
+    config: AgentConfig | None = None,
+    cache: Cache | None = None,
+) -> QueryPlanner:
+    """
+    Create a query planner instance.
+
+    Confident rule-based classifications skip the LLM entirely. With a cache,
+    the LLM planner's intents are then reused for repeated queries.
+    """
     config = config or AgentConfig.from_env()
 
-    return LLMQueryPlanner(
+    planner: QueryPlanner = LLMQueryPlanner(
         api_key=config.openai_api_key,
         base_url=config.openai_base_url,
         model=config.planner_model,
         temperature=0.1,  # Low temperature for consistent classification
     )
-
-
-def create_data_extractor(config: AgentConfig | None = None) -> DataExtractor:
-    """Create a data extractor instance."""
+    if cache is not None and config.planner_cache_ttl_seconds > 0:
+        planner = CachedQueryPlanner(
+            planner,
+            cache,
+            ttl_seconds=config.planner_cache_ttl_seconds,
+            namespace=config.planner_model,
+        )
+    if config.planner_fast_path_min_confidence <= 1:
+        planner = FastPathQueryPlanner(
+            planner, min_confidence=config.planner_fast_path_min_confidence
+        )
+    return planner
+
+
+def create_data_extractor(
+    config: AgentConfig | None = None,
+    cache: Cache | None = None,
+) -> DataExtractor:
+    """Create a data extractor instance, cached when a cache is given."""
     config = config or AgentConfig.from_env()
 
-    return LLMDataExtractor(
+    extractor: DataExtractor = LLMDataExtractor(
         api_key=config.openai_api_key,
         base_url=config.openai_base_url,
         model=config.extractor_model,
         temperature=0.1,  # Low temperature for accurate extraction
     )
+    if cache is not None and config.extraction_cache_ttl_seconds > 0:
+        extractor = CachedDataExtractor(
+            extractor,
+            cache,
+            ttl_seconds=config.extraction_cache_ttl_seconds,
+            namespace=config.extractor_model,
+        )
+    return extractor
 
 
 def create_response_composer(config: AgentConfig | None = None) -> ResponseComposer:
@@ -82,4 +118,20 @@ def create_context_retriever(
         vector_store=vector_store,
         default_top_k=config.default_top_k,
         min_chunks_for_sufficiency=config.min_chunks_for_sufficiency,
+        context_token_budget=config.context_token_budget or None,
+        token_counter=count_tokens,
+        sparse_encoder=BM25SparseEncoder() if config.hybrid_search_enabled else None,
+    )
+
+
+def create_context_compressor(config: AgentConfig | None = None) -> ContextCompressor | None:
+    """Create a context compressor instance if enabled."""
+    config = config or AgentConfig.from_env()
+
+    if not config.context_compression_enabled:
+        return None
+
+    return SentenceContextCompressor(
+        token_counter=count_tokens,
+        component_token_budget=config.component_token_budget,
     )
@@ -0,0 +1,241 @@
+"""Query planners that avoid the LLM: a rule-based fast path and an intent cache."""
+
+import hashlib
+import logging
+import re
+
+from democrata_server.domain.agents.entities import (
+    ExtractedEntities,
+    IntentResult,
+    QueryType,
+    ResponseDepth,
+    RetrievalStrategy,
+)
+from democrata_server.domain.agents.ports import QueryPlanner
+from democrata_server.domain.rag.ports import Cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when planner prompts or rules change in ways that alter intents
+PLANNER_CACHE_VERSION = 1
+PLANNER_CACHE_PREFIX = "planner:intent:"
+DEFAULT_FAST_PATH_MIN_CONFIDENCE = 0.85
+
+PARTY_ALIASES: dict[str, tuple[str, ...]] = {
+    "Labor": ("labor", "alp", "labour"),
+    "Liberal": ("liberal", "liberals", "libs"),
+    "Nationals": ("nationals", "national party", "nats"),
+    "Greens": ("greens", "the greens"),
+    "One Nation": ("one nation",),
+    "Coalition": ("coalition",),
+}
+MAJOR_PARTIES = ["Labor", "Liberal"]
+
+_PARTY_PATTERNS = [
+    (party, re.compile(r"\b(?:" + "|".join(re.escape(a) for a in aliases) + r")\b"))
+    for party, aliases in PARTY_ALIASES.items()
+]
+_MAJOR_PARTIES = re.compile(r"\b(?:both|the) major parties\b")
+_BILL = re.compile(r"\b((?:[A-Z][\w'()-]*\s+){1,10}(?:Bill|Act)(?:\s+(?:19|20)\d{2})?)")
+
+_YEAR = r"((?:19|20)\d{2})"
+_BETWEEN_YEARS = re.compile(rf"\bbetween\s+{_YEAR}\s+and\s+{_YEAR}\b")
+_SINCE_YEAR = re.compile(rf"\b(?:since|after|from)\s+{_YEAR}\b")
+_BEFORE_YEAR = re.compile(rf"\b(?:before|until|prior to)\s+{_YEAR}\b")
+_IN_YEAR = re.compile(rf"\b{_YEAR}\b")
+
+# Signals for each query type, matched against the normalized query
+_TYPE_SIGNALS: dict[QueryType, re.Pattern] = {
+    QueryType.VOTING: re.compile(r"\b(?:vote[sd]?|voting|division|divisions)\b"),
+    QueryType.COMPARATIVE: re.compile(
+        r"\b(?:compare|compared|comparison|versus|vs|differ|differences?)\b"
+    ),
+    QueryType.TIMELINE: re.compile(
+        r"\b(?:timeline|history of|chronolog\w*|over time|over the years|progress of)\b"
+    ),
+    QueryType.ANALYTICAL: re.compile(
+        r"\b(?:why|explain|impacts?|analy[sz]e|analysis|implications?|effects? of|consequences)\b"
+    ),
+}
+_FACTUAL_OPENER = re.compile(r"^(?:who|what|when|which|where|did|does|is|was|has|how many)\b")
+_FILLER = re.compile(
+    r"\b(?:compare|compared|comparison|versus|vs|and|the|between|how|did|do|does|on|of)\b"
+)
+
+# Components, depth and strategy per type, as the planner prompt prescribes
+_PLANS: dict[QueryType, tuple[list[str], ResponseDepth, RetrievalStrategy]] = {
+    QueryType.FACTUAL: (["text_block"], ResponseDepth.BRIEF, RetrievalStrategy.SINGLE_FOCUS),
+    QueryType.VOTING: (
+        ["voting_breakdown", "text_block"],
+        ResponseDepth.STANDARD,
+        RetrievalStrategy.SINGLE_FOCUS,
+    ),
+    QueryType.COMPARATIVE: (
+        ["comparison", "text_block"],
+        ResponseDepth.STANDARD,
+        RetrievalStrategy.MULTI_ENTITY,
+    ),
+    QueryType.TIMELINE: (
+        ["timeline", "text_block"],
+        ResponseDepth.STANDARD,
+        RetrievalStrategy.CHRONOLOGICAL,
+    ),
+}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip(" ?!.")
+
+
+class RuleBasedClassifier:
+    """
+    Keyword and regex rules over party names, bill titles and date phrases.
+
+    Only classifies queries whose type is unambiguous. Analytical queries and
+    queries naming things the rules cannot recognise (such as members or
+    topics) get low confidence, leaving them to the LLM planner.
+    """
+
+    def classify(self, query: str) -> IntentResult | None:
+        normalized = normalize_query(query)
+        signals = [qtype for qtype, pattern in _TYPE_SIGNALS.items() if pattern.search(normalized)]
+        if len(signals) > 1 or QueryType.ANALYTICAL in signals:
+            return None
+        if signals:
+            query_type = signals[0]
+        elif _FACTUAL_OPENER.match(normalized):
+            query_type = QueryType.FACTUAL
+        else:
+            return None
+
+        parties = self._parties(normalized)
+        bills = [b.strip() for b in _BILL.findall(query)]
+        # A bill's year is part of its title, not a date range
+        date_from, date_to = self._dates(normalize_query(_BILL.sub(" ", query)))
+        entities = ExtractedEntities(
+            parties=parties, bills=bills, date_from=date_from, date_to=date_to
+        )
+
+        if query_type == QueryType.COMPARATIVE and len(parties) + len(bills) < 2:
+            return None
+
+        confidence = 0.9
+        if not entities.has_entities():
+            confidence -= 0.2
+        if self._has_unrecognised_names(query, parties, bills):
+            # Probably a member or topic name the rules cannot extract
+            confidence -= 0.3
+
+        components, depth, strategy = _PLANS[query_type]
+        return IntentResult(
+            query_type=query_type,
+            entities=entities,
+            expected_components=list(components),
+            retrieval_strategy=strategy,
+            rewritten_queries=self._rewrite(query, normalized, query_type, parties),
+            confidence=round(confidence, 2),
+            response_depth=depth,
+        )
+
+    def _parties(self, normalized: str) -> list[str]:
+        if _MAJOR_PARTIES.search(normalized):
+            return list(MAJOR_PARTIES)
+        return [party for party, pattern in _PARTY_PATTERNS if pattern.search(normalized)]
+
+    def _dates(self, normalized: str) -> tuple[str | None, str | None]:
+        if match := _BETWEEN_YEARS.search(normalized):
+            return f"{match.group(1)}-01-01", f"{match.group(2)}-12-31"
+        if match := _SINCE_YEAR.search(normalized):
+            return f"{match.group(1)}-01-01", None
+        if match := _BEFORE_YEAR.search(normalized):
+            return None, f"{int(match.group(1)) - 1}-12-31"
+        if len(years := _IN_YEAR.findall(normalized)) == 1:
+            return f"{years[0]}-01-01", f"{years[0]}-12-31"
+        return None, None
+
+    def _has_unrecognised_names(self, query: str, parties: list[str], bills: list[str]) -> bool:
+        """Capitalised words after the first that are not part of a known party or bill."""
+        known = " ".join([*bills, *parties]).lower()
+        aliases = {alias for party in parties for alias in PARTY_ALIASES[party]}
+        words = re.findall(r"[A-Za-z][\w'-]*", query)[1:]
+        return any(
+            word[0].isupper()
+            and word.lower() not in known
+            and word.lower() not in aliases
+            and word.upper() != word  # Acronyms like ALP or NDIS
+            for word in words
+        )
+
+    def _rewrite(
+        self, query: str, normalized: str, query_type: QueryType, parties: list[str]
+    ) -> list[str]:
+        if query_type != QueryType.COMPARATIVE or not parties:
+            return [query]
+        topic = normalized
+        for _, pattern in _PARTY_PATTERNS:
+            topic = pattern.sub(" ", topic)
+        topic = " ".join(_FILLER.sub(" ", _MAJOR_PARTIES.sub(" ", topic)).split())
+        return [f"{party} {topic}".strip() for party in parties]
+
+
+class FastPathQueryPlanner:
+    """Answers with the rule-based classifier when it is confident, otherwise delegates."""
+
+    def __init__(
+        self,
+        planner: QueryPlanner,
+        classifier: RuleBasedClassifier | None = None,
+        min_confidence: float = DEFAULT_FAST_PATH_MIN_CONFIDENCE,
+    ):
+        self.planner = planner
+        self.classifier = classifier or RuleBasedClassifier()
+        self.min_confidence = min_confidence
+
+    async def analyze(self, query: str) -> tuple[IntentResult, dict]:
+        intent = self.classifier.classify(query)
+        if intent is not None and intent.confidence >= self.min_confidence:
+            logger.debug(f"Fast-path intent {intent.query_type.value} for query: {query[:80]}")
+            return intent, {"input_tokens": 0, "output_tokens": 0}
+        return await self.planner.analyze(query)
+
+
+class CachedQueryPlanner:
+    """Caches the wrapped planner's intents, keyed on the normalized query."""
+
+    def __init__(
+        self,
+        planner: QueryPlanner,
+        cache: Cache,
+        ttl_seconds: int = 86400,
+        namespace: str = "",
+    ):
+        self.planner = planner
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace  # e.g. the planner model, so switching models starts afresh
+
+    async def analyze(self, query: str) -> tuple[IntentResult, dict]:
+        key = self._key(query)
+        try:
+            intent = await self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Planner cache lookup failed: {e}")
+            intent = None
+        if intent is not None:
+            logger.debug(f"Planner cache hit for query: {query[:80]}")
+            return intent, {"input_tokens": 0, "output_tokens": 0}
+
+        intent, usage = await self.planner.analyze(query)
+        # The LLM planner falls back to a default intent without spending tokens
+        # when it fails; caching that would pin the fallback
+        if usage.get("input_tokens", 0) > 0:
+            try:
+                await self.cache.set(key, intent, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Planner cache store failed: {e}")
+        return intent, usage
+
+    def _key(self, query: str) -> str:
+        digest = hashlib.sha256(normalize_query(query).encode()).hexdigest()[:32]
+        return f"{PLANNER_CACHE_PREFIX}v{PLANNER_CACHE_VERSION}:{self.namespace}:{digest}"
@@ -284,3 +284,37 @@ EXTRACTION_PROMPTS = {
     "text_block": TEXT_BLOCK_EXTRACTION_PROMPT,
     "notice": NOTICE_EXTRACTION_PROMPT,
 }
+
+
+def _json_format(prompt: str) -> str:
+    """The JSON example a single-component prompt asks for, braces still escaped."""
+    return prompt.split("```json", 1)[1].split("```", 1)[0].strip()
+
+
+EXTRACTION_FORMATS = {
+    component_type: _json_format(prompt) for component_type, prompt in EXTRACTION_PROMPTS.items()
+}
+
+GENERIC_EXTRACTION_FORMAT = """{{
+  "data": {{"relevant structured data for the component type": "..."}},
+  "source_quotes": ["supporting quotes"],
+  "completeness": "0.0-1.0",
+  "warnings": ["any data issues"]
+}}"""
+
+MULTI_EXTRACTION_PROMPT = """Extract data for several response components from the context below.
+
+""" + GROUNDING_RULES + """
+
+Context:
+{context}
+
+Query focus: {query_focus}
+{extra_instructions}
+Return one JSON object with a key for each component type below. Each value must
+follow that component's format, with its own source_quotes, completeness and
+warnings.
+
+{component_formats}
+
+Respond with JSON only:"""
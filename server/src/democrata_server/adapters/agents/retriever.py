@@ -1,15 +1,46 @@
 import asyncio
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from democrata_server.domain.agents.entities import IntentResult, RetrievalStrategy
-from democrata_server.domain.rag.entities import RetrievalResult
+from democrata_server.domain.rag.entities import QueryFilters, RetrievalResult
 
 logger = logging.getLogger(__name__)
 
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(result_lists: list[list[Any]], k: int = RRF_K) -> list[Any]:
+    """
+    Merge ranked chunk lists with reciprocal rank fusion.
+
+    Each chunk scores sum(1 / (k + rank)) over the lists it appears in, so chunks
+    ranked highly by several sub-queries rise to the top. Raw similarity scores
+    are not compared across lists, which keeps the merge robust to score scale.
+    """
+    fused: dict[str, float] = {}
+    chunks_by_id: dict[str, Any] = {}
+
+    for results in result_lists:
+        for rank, chunk in enumerate(results):
+            chunk_id = str(chunk.id)
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+            chunks_by_id.setdefault(chunk_id, chunk)
+
+    ranked_ids = sorted(fused, key=lambda chunk_id: fused[chunk_id], reverse=True)
+    return [chunks_by_id[chunk_id] for chunk_id in ranked_ids]
+
 
 class IntentDrivenRetriever:
-    """Retriever that uses intent classification to optimize context retrieval."""
+    """
+    Retriever that uses intent classification to optimize context retrieval.
+
+    Filters from the request and from the classified intent are applied in the
+    vector store. If a filtered search returns fewer than
+    `min_chunks_for_sufficiency` chunks, it is topped up from an unfiltered
+    search. Filtered matches keep their place at the top.
+    """
 
     def __init__(
         self,
@@ -17,48 +48,56 @@ class IntentDrivenRetriever:
         vector_store: Any,  # VectorStore protocol
         default_top_k: int = 10,
         min_chunks_for_sufficiency: int = 3,
+        context_token_budget: int | None = None,
+        token_counter: Callable[[list[str]], int] | None = None,
+        sparse_encoder: Any = None,  # SparseEncoder protocol; enables hybrid search
     ):
         self.embedder = embedder
         self.vector_store = vector_store
         self.default_top_k = default_top_k
         self.min_chunks_for_sufficiency = min_chunks_for_sufficiency
+        self.context_token_budget = context_token_budget
+        self._token_counter = token_counter or (
+            lambda texts: sum(max(1, len(t.split())) for t in texts)
+        )
+        self.sparse_encoder = sparse_encoder
 
     async def retrieve(
         self,
         query: str,
         intent: IntentResult,
+        filters: QueryFilters | None = None,
     ) -> RetrievalResult:
-        """Retrieve context chunks based on query and classified intent."""
+        """Retrieve context chunks based on query, classified intent and request filters."""
         strategy = intent.retrieval_strategy
 
         if strategy == RetrievalStrategy.MULTI_ENTITY:
-            return await self._retrieve_multi_entity(query, intent)
+            return await self._retrieve_multi_entity(query, intent, filters)
         elif strategy == RetrievalStrategy.CHRONOLOGICAL:
-            return await self._retrieve_chronological(query, intent)
+            return await self._retrieve_chronological(query, intent, filters)
         elif strategy == RetrievalStrategy.BROAD:
-            return await self._retrieve_broad(query, intent)
+            return await self._retrieve_broad(query, intent, filters)
         else:  # SINGLE_FOCUS
-            return await self._retrieve_single_focus(query, intent)
+            return await self._retrieve_single_focus(query, intent, filters)
 
     async def _retrieve_single_focus(
         self,
         query: str,
         intent: IntentResult,
+        query_filters: QueryFilters | None = None,
     ) -> RetrievalResult:
         """Standard single embedding search."""
         embedding = await self.embedder.embed_single(query)
-        filters = self._build_filters(intent)
+        filters = self._build_filters(intent, query_filters)
 
-        chunks = await self.vector_store.search(
-            vector=embedding,
-            k=self.default_top_k,
-            filters=filters,
+        chunks = await self._search_with_fallback(
+            embedding, self.default_top_k, filters, self._sparse_query(query)
         )
 
         is_sufficient = len(chunks) >= self.min_chunks_for_sufficiency
 
         return RetrievalResult(
-            chunks=chunks,
+            chunks=self._apply_token_budget(chunks),
             strategy_used=RetrievalStrategy.SINGLE_FOCUS.value,
             is_sufficient=is_sufficient,
             warnings=[] if is_sufficient else ["Few relevant documents found"],
@@ -68,46 +107,48 @@ class IntentDrivenRetriever:
         self,
         query: str,
         intent: IntentResult,
+        query_filters: QueryFilters | None = None,
     ) -> RetrievalResult:
-        """Parallel searches for multiple entities, then merge and dedupe."""
+        """Batched searches for multiple entities, then merge and dedupe."""
         rewritten_queries = intent.rewritten_queries
         if not rewritten_queries:
             rewritten_queries = [query]
 
-        # Execute parallel searches
-        search_tasks = []
-        for rq in rewritten_queries:
-            search_tasks.append(self._search_single(rq, intent))
-
-        results = await asyncio.gather(*search_tasks, return_exceptions=True)
+        k = self.default_top_k // 2  # Smaller k for multi-entity
+        filters = self._build_filters(intent, query_filters)
+
+        # One embedding round-trip and one batched search for all entities
+        try:
+            embeddings = await self.embedder.embed(rewritten_queries)
+            results = await self._search_batch_with_fallback(
+                embeddings,
+                k,
+                filters,
+                (
+                    [self.sparse_encoder.encode_query(rq) for rq in rewritten_queries]
+                    if self.sparse_encoder
+                    else None
+                ),
+            )
+        except Exception as e:
+            # Search entities one by one so a failure only loses that entity's chunks
+            logger.warning(f"Batched multi-entity search failed, searching per entity: {e}")
+            results = await asyncio.gather(
+                *(self._search_entity(rq, k, filters) for rq in rewritten_queries)
+            )
 
-        # Merge and dedupe chunks
-        all_chunks = []
-        seen_ids = set()
         coverage: dict[str, float] = {}
-
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.warning(f"Search failed for query {i}: {result}")
-                continue
-
-            query_chunks = result
+        for i, query_chunks in enumerate(results):
             coverage[rewritten_queries[i]] = len(query_chunks) / self.default_top_k
 
-            for chunk in query_chunks:
-                chunk_id = str(chunk.id)
-                if chunk_id not in seen_ids:
-                    seen_ids.add(chunk_id)
-                    all_chunks.append(chunk)
-
-        # Sort by relevance (assuming chunks have a score or position)
-        # For now, keep order from retrieval
-        chunks = all_chunks[: self.default_top_k * 2]  # Allow more for multi-entity
+        # Fuse the per-entity rankings so the best chunks across all entities come first
+        # Allow more for multi-entity
+        chunks = reciprocal_rank_fusion(results)[: self.default_top_k * 2]
 
         is_sufficient = len(chunks) >= self.min_chunks_for_sufficiency
 
         return RetrievalResult(
-            chunks=chunks,
+            chunks=self._apply_token_budget(chunks),
             strategy_used=RetrievalStrategy.MULTI_ENTITY.value,
             coverage=coverage,
             is_sufficient=is_sufficient,
@@ -118,25 +159,24 @@ class IntentDrivenRetriever:
         self,
         query: str,
         intent: IntentResult,
+        query_filters: QueryFilters | None = None,
     ) -> RetrievalResult:
         """Date-filtered search for chronological queries."""
         embedding = await self.embedder.embed_single(query)
-        filters = self._build_filters(intent)
+        filters = self._build_filters(intent, query_filters)
 
-        chunks = await self.vector_store.search(
-            vector=embedding,
-            k=self.default_top_k,
-            filters=filters,
+        chunks = await self._search_with_fallback(
+            embedding, self.default_top_k, filters, self._sparse_query(query)
         )
 
-        # Sort chunks by date if available in metadata
+        is_sufficient = len(chunks) >= self.min_chunks_for_sufficiency
+
+        # Budget by relevance first, then sort chunks by date if available in metadata
         sorted_chunks = sorted(
-            chunks,
+            self._apply_token_budget(chunks),
             key=lambda c: c.metadata.get("date", "9999-99-99"),
         )
 
-        is_sufficient = len(sorted_chunks) >= self.min_chunks_for_sufficiency
-
         return RetrievalResult(
             chunks=sorted_chunks,
             strategy_used=RetrievalStrategy.CHRONOLOGICAL.value,
@@ -148,58 +188,149 @@ class IntentDrivenRetriever:
         self,
         query: str,
         intent: IntentResult,
+        query_filters: QueryFilters | None = None,
     ) -> RetrievalResult:
         """Broader search with diversity for analytical queries."""
         embedding = await self.embedder.embed_single(query)
-        # Don't apply strict filters for broad search
-        filters = {}
-        if intent.entities.document_types:
-            filters["document_type"] = intent.entities.document_types
+        # Don't apply the planner's date guesses for broad search
+        filters = self._build_filters(intent, query_filters, include_intent_dates=False)
 
         # Retrieve more chunks for diversity
-        chunks = await self.vector_store.search(
-            vector=embedding,
-            k=self.default_top_k + 10,
-            filters=filters if filters else None,
+        chunks = await self._search_with_fallback(
+            embedding, self.default_top_k + 10, filters, self._sparse_query(query)
         )
 
         is_sufficient = len(chunks) >= self.min_chunks_for_sufficiency
 
         return RetrievalResult(
-            chunks=chunks,
+            chunks=self._apply_token_budget(chunks),
             strategy_used=RetrievalStrategy.BROAD.value,
             is_sufficient=is_sufficient,
             warnings=[] if is_sufficient else ["Limited diverse content found"],
         )
 
-    async def _search_single(
+    async def _search_entity(self, query: str, k: int, filters: dict[str, Any] | None) -> list[Any]:
+        """Search for one entity's query on its own, returning no chunks on failure."""
+        try:
+            embedding = await self.embedder.embed_single(query)
+            sparse_vector = self._sparse_query(query)
+            return await self._search_with_fallback(embedding, k, filters, sparse_vector)
+        except Exception as e:
+            logger.warning(f"Search failed for query {query!r}: {e}")
+            return []
+
+    async def _search_with_fallback(
         self,
-        query: str,
-        intent: IntentResult,
+        embedding: list[float],
+        k: int,
+        filters: dict[str, Any] | None,
+        sparse_vector: Any,
     ) -> list[Any]:
-        """Execute a single search for a rewritten query."""
-        embedding = await self.embedder.embed_single(query)
-        filters = self._build_filters(intent)
-
+        """Filtered search, topped up from an unfiltered search when it under-returns."""
         chunks = await self.vector_store.search(
             vector=embedding,
-            k=self.default_top_k // 2,  # Smaller k for multi-entity
+            k=k,
             filters=filters,
+            sparse_vector=sparse_vector,
         )
+        if not filters or len(chunks) >= self.min_chunks_for_sufficiency:
+            return chunks
 
-        return chunks
+        logger.info(f"Filtered search returned {len(chunks)} chunks, widening to unfiltered")
+        unfiltered = await self.vector_store.search(
+            vector=embedding,
+            k=k,
+            filters=None,
+            sparse_vector=sparse_vector,
+        )
+        return self._merge_fallback(chunks, unfiltered, k)
 
-    def _build_filters(self, intent: IntentResult) -> dict[str, Any] | None:
-        """Build vector store filters from intent entities."""
+    async def _search_batch_with_fallback(
+        self,
+        embeddings: list[list[float]],
+        k: int,
+        filters: dict[str, Any] | None,
+        sparse_vectors: list[Any] | None,
+    ) -> list[list[Any]]:
+        """Batched variant of _search_with_fallback; only under-returning queries are re-run."""
+        results = await self.vector_store.search_batch(
+            vectors=embeddings,
+            k=k,
+            filters=filters,
+            sparse_vectors=sparse_vectors,
+        )
+        if not filters:
+            return results
+
+        short = [
+            i for i, chunks in enumerate(results) if len(chunks) < self.min_chunks_for_sufficiency
+        ]
+        if not short:
+            return results
+
+        logger.info(
+            f"{len(short)}/{len(results)} filtered searches under-returned, widening to unfiltered"
+        )
+        unfiltered = await self.vector_store.search_batch(
+            vectors=[embeddings[i] for i in short],
+            k=k,
+            filters=None,
+            sparse_vectors=[sparse_vectors[i] for i in short] if sparse_vectors else None,
+        )
+        for i, extra in zip(short, unfiltered):
+            results[i] = self._merge_fallback(results[i], extra, k)
+        return results
+
+    def _merge_fallback(self, filtered: list[Any], unfiltered: list[Any], k: int) -> list[Any]:
+        seen = {str(chunk.id) for chunk in filtered}
+        extra = [chunk for chunk in unfiltered if str(chunk.id) not in seen]
+        return (filtered + extra)[:k]
+
+    def _sparse_query(self, query: str) -> Any:
+        """Sparse keyword vector for hybrid search, or None for dense-only."""
+        return self.sparse_encoder.encode_query(query) if self.sparse_encoder else None
+
+    def _apply_token_budget(self, chunks: list[Any]) -> list[Any]:
+        """Keep the highest-ranked chunks that fit within the context token budget."""
+        if not self.context_token_budget:
+            return chunks
+
+        kept: list[Any] = []
+        used = 0
+        for chunk in chunks:
+            tokens = self._token_counter([chunk.text])
+            if kept and used + tokens > self.context_token_budget:
+                break
+            kept.append(chunk)
+            used += tokens
+
+        if len(kept) < len(chunks):
+            logger.debug(
+                f"Context budget kept {len(kept)}/{len(chunks)} chunks ({used} tokens)"
+            )
+        return kept
+
+    def _build_filters(
+        self,
+        intent: IntentResult,
+        query_filters: QueryFilters | None = None,
+        include_intent_dates: bool = True,
+    ) -> dict[str, Any] | None:
+        """Build vector store filters from request filters, falling back to intent entities."""
         filters: dict[str, Any] = {}
+        explicit = query_filters or QueryFilters()
+        entities = intent.entities
+
+        if document_types := explicit.document_types or entities.document_types:
+            filters["document_type"] = document_types
 
-        if intent.entities.document_types:
-            filters["document_type"] = intent.entities.document_types
+        if explicit.sources:
+            filters["sources"] = explicit.sources
 
-        if intent.entities.date_from:
-            filters["date_from"] = intent.entities.date_from
+        if date_from := explicit.date_from or (include_intent_dates and entities.date_from):
+            filters["date_from"] = date_from
 
-        if intent.entities.date_to:
-            filters["date_to"] = intent.entities.date_to
+        if date_to := explicit.date_to or (include_intent_dates and entities.date_to):
+            filters["date_to"] = date_to
 
         return filters if filters else None
@@ -1,3 +1,6 @@
+from .corpus import RedisCorpusVersions
 from .redis import RedisCache
+from .semantic import QdrantSemanticCache
+from .single_flight import RedisSingleFlight
 
-__all__ = ["RedisCache"]
+__all__ = ["QdrantSemanticCache", "RedisCache", "RedisCorpusVersions", "RedisSingleFlight"]
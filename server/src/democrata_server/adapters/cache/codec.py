@@ -0,0 +1,139 @@
+"""Versioned msgpack + zstd encoding for cached domain objects."""
+
+import inspect
+from dataclasses import MISSING, fields, is_dataclass
+from enum import Enum
+from types import ModuleType
+from typing import Any
+from uuid import UUID
+
+import ormsgpack
+import zstandard
+
+from democrata_server.domain.agents import entities as agent_entities
+from democrata_server.domain.rag import entities as rag_entities
+from democrata_server.domain.usage.entities import CostBreakdown
+
+# Bump when the encoding changes incompatibly; older entries then read as misses
+FORMAT_VERSION = 1
+MAGIC = b"DM"
+COMPRESSION_THRESHOLD_BYTES = 512
+ZSTD_LEVEL = 3
+
+_RAW = 0
+_ZSTD = 1
+TYPE_KEY = "~t"
+VALUE_KEY = "v"
+
+_PACK_OPTIONS = (
+    ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+    | ormsgpack.OPT_PASSTHROUGH_UUID
+)
+
+
+class CodecError(Exception):
+    """Raised when a cached payload cannot be decoded."""
+
+
+def _module_types(module: ModuleType) -> dict[str, type]:
+    return {
+        name: obj
+        for name, obj in inspect.getmembers(module, inspect.isclass)
+        if obj.__module__ == module.__name__ and (is_dataclass(obj) or issubclass(obj, Enum))
+    }
+
+
+# Only these types are ever reconstructed, unlike pickle which can build anything
+_TYPES: dict[str, type] = {
+    **_module_types(rag_entities),
+    **_module_types(agent_entities),
+    CostBreakdown.__name__: CostBreakdown,
+}
+# (name, default, default_factory) per dataclass, precomputed for the decode loop
+_FIELD_SPECS: dict[type, tuple[tuple[str, Any, Any], ...]] = {
+    cls: tuple((f.name, f.default, f.default_factory) for f in fields(cls))
+    for cls in _TYPES.values()
+    if is_dataclass(cls)
+}
+
+_CONTAINERS = (dict, list)
+
+_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def encode(value: Any) -> bytes:
+    """Encode a value as MAGIC | version | compression | msgpack body."""
+    body = ormsgpack.packb(value, default=_to_tagged, option=_PACK_OPTIONS)
+    if len(body) >= COMPRESSION_THRESHOLD_BYTES:
+        return MAGIC + bytes((FORMAT_VERSION, _ZSTD)) + _compressor.compress(body)
+    return MAGIC + bytes((FORMAT_VERSION, _RAW)) + body
+
+
+def decode(data: bytes) -> Any:
+    if len(data) < 4 or data[:2] != MAGIC:
+        raise CodecError("Unrecognised cache payload")
+    version, compression = data[2], data[3]
+    if version != FORMAT_VERSION:
+        raise CodecError(f"Unsupported cache format version {version}")
+
+    body = data[4:]
+    try:
+        if compression == _ZSTD:
+            body = _decompressor.decompress(body)
+        return _from_tagged(ormsgpack.unpackb(body))
+    except (zstandard.ZstdError, ormsgpack.MsgpackDecodeError, TypeError, ValueError) as e:
+        raise CodecError(f"Corrupt cache payload: {e}") from e
+
+
+def _to_tagged(obj: Any) -> Any:
+    if is_dataclass(obj) and type(obj).__name__ in _TYPES:
+        tagged = {f.name: getattr(obj, f.name) for f in fields(obj)}
+        tagged[TYPE_KEY] = type(obj).__name__
+        return tagged
+    if isinstance(obj, Enum) and type(obj).__name__ in _TYPES:
+        return {TYPE_KEY: type(obj).__name__, VALUE_KEY: obj.value}
+    if isinstance(obj, UUID):
+        return {TYPE_KEY: "UUID", VALUE_KEY: str(obj)}
+    raise TypeError(f"Cannot cache values of type {type(obj).__name__}")
+
+
+def _from_tagged(value: Any) -> Any:
+    kind = type(value)
+    if kind is list:
+        return [_from_tagged(item) if type(item) in _CONTAINERS else item for item in value]
+    if kind is not dict:
+        return value
+
+    type_name = value.get(TYPE_KEY)
+    if type_name is None:
+        return {
+            key: _from_tagged(item) if type(item) in _CONTAINERS else item
+            for key, item in value.items()
+        }
+    if type_name == "UUID":
+        return UUID(value[VALUE_KEY])
+
+    cls = _TYPES.get(type_name)
+    if cls is None:
+        raise CodecError(f"Unknown cached type {type_name}")
+    if issubclass(cls, Enum):
+        return cls(value[VALUE_KEY])
+
+    # Restore attributes directly rather than through __init__, which is
+    # noticeably faster. Fields that no longer exist are dropped and fields
+    # added since the entry was written take their defaults.
+    obj = cls.__new__(cls)
+    attrs = obj.__dict__
+    for name, default, default_factory in _FIELD_SPECS[cls]:
+        item = value.get(name, MISSING)
+        if item is not MISSING:
+            attrs[name] = _from_tagged(item) if type(item) in _CONTAINERS else item
+        elif default is not MISSING:
+            attrs[name] = default
+        elif default_factory is not MISSING:
+            attrs[name] = default_factory()
+        else:
+            raise CodecError(f"Cached {type_name} is missing field {name}")
+    return obj
@@ -0,0 +1,54 @@
+"""Corpus version counters shared by ingestion and the query caches."""
+
+import logging
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+CORPUS_VERSION_KEY = "rag:corpus:version"
+DOCUMENT_TYPE_VERSION_PREFIX = "rag:corpus:version:type:"
+SOURCE_VERSION_PREFIX = "rag:corpus:version:source:"
+
+
+class RedisCorpusVersions:
+    """
+    Monotonic counters bumped whenever new content is indexed.
+
+    A global counter changes on every ingestion. Per document type and per
+    source counters change only when content of that type or from that
+    source arrives. Cache entries record the counters they were built
+    against, so a query filtered to bills is not invalidated by new Hansard.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0"):
+        self.client = redis.from_url(url, decode_responses=True)
+
+    async def bump(self, document_type: str | None = None, source_name: str | None = None) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(CORPUS_VERSION_KEY)
+            if document_type:
+                pipe.incr(f"{DOCUMENT_TYPE_VERSION_PREFIX}{document_type}")
+            if source_name:
+                pipe.incr(f"{SOURCE_VERSION_PREFIX}{source_name}")
+            results = await pipe.execute()
+        return int(results[0])
+
+    async def current(self) -> int:
+        value = await self.client.get(CORPUS_VERSION_KEY)
+        return int(value) if value else 0
+
+    async def snapshot(
+        self,
+        document_types: list[str] | None = None,
+        source_names: list[str] | None = None,
+    ) -> dict[str, int]:
+        keys = [f"{DOCUMENT_TYPE_VERSION_PREFIX}{t}" for t in sorted(document_types or [])]
+        keys += [f"{SOURCE_VERSION_PREFIX}{s}" for s in sorted(source_names or [])]
+        if not keys:
+            keys = [CORPUS_VERSION_KEY]
+        values = await self.client.mget(keys)
+        return {key: int(value) if value else 0 for key, value in zip(keys, values)}
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -1,13 +1,25 @@
 import hashlib
-import pickle
+import logging
 from typing import Any
 
 import redis.asyncio as redis
 
 from democrata_server.domain.rag.entities import Query
 
+from .codec import CodecError, decode, encode
+
+logger = logging.getLogger(__name__)
+
 
 class RedisCache:
+    """
+    Redis-backed cache for RAG results and related domain objects.
+
+    Values are stored in the versioned msgpack + zstd format from `codec`.
+    Entries that cannot be decoded, such as those written by an older format
+    version, are treated as misses.
+    """
+
     def __init__(self, url: str = "redis://localhost:6379/0"):
         self.client = redis.from_url(url, decode_responses=False)
 
@@ -15,10 +27,14 @@ class RedisCache:
         data = await self.client.get(key)
         if data is None:
             return None
-        return pickle.loads(data)
+        try:
+            return decode(data)
+        except CodecError as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            return None
 
     async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
-        data = pickle.dumps(value)
+        data = encode(value)
         if ttl_seconds:
             await self.client.setex(key, ttl_seconds, data)
         else:
@@ -0,0 +1,180 @@
+"""Semantic query cache: maps query embeddings to exact-match cache keys."""
+
+import asyncio
+import logging
+import time
+from typing import Any
+from uuid import NAMESPACE_URL, uuid5
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Direction,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchValue,
+    OrderBy,
+    PayloadSchemaType,
+    PointStruct,
+    Range,
+    VectorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_MAX_ENTRIES = 10_000
+EVICTION_INTERVAL = 100  # Stores between eviction passes
+
+
+class QdrantSemanticCache:
+    """
+    Nearest-neighbour index of answered queries, stored in its own Qdrant collection.
+
+    Each entry holds a query embedding plus the exact cache key of its result.
+    A lookup returns the key of the most similar entry above
+    `similarity_threshold`, within the same filter scope and corpus version.
+    The result itself stays in the exact-match cache, so an evicted or expired
+    result is simply a miss.
+
+    Entries older than `ttl_seconds` or built against an older corpus version
+    are never matched, and are deleted every EVICTION_INTERVAL stores. The
+    oldest entries are also dropped beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:6333",
+        collection: str = "democrata_query_cache",
+        vector_size: int = 768,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: int = 3600,
+        corpus_versions: Any = None,  # CorpusVersions protocol
+        prefer_grpc: bool = False,
+    ):
+        self.client = AsyncQdrantClient(url=url, prefer_grpc=prefer_grpc)
+        self.collection = collection
+        self.vector_size = vector_size
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.corpus_versions = corpus_versions
+        self._collection_ready = False
+        self._collection_lock = asyncio.Lock()
+        self._stores_since_eviction = 0
+
+    async def _ensure_collection(self) -> None:
+        if self._collection_ready:
+            return
+        async with self._collection_lock:
+            if self._collection_ready:
+                return
+            if not await self.client.collection_exists(self.collection):
+                await self.client.create_collection(
+                    collection_name=self.collection,
+                    vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE),
+                )
+                for field_name, schema in (
+                    ("scope", PayloadSchemaType.KEYWORD),
+                    ("corpus_version", PayloadSchemaType.INTEGER),
+                    ("created_at", PayloadSchemaType.FLOAT),
+                ):
+                    await self.client.create_payload_index(
+                        collection_name=self.collection,
+                        field_name=field_name,
+                        field_schema=schema,
+                    )
+            self._collection_ready = True
+
+    async def lookup(self, embedding: list[float], scope: str) -> str | None:
+        await self._ensure_collection()
+        corpus_version = await self._corpus_version()
+        results = await self.client.query_points(
+            collection_name=self.collection,
+            query=embedding,
+            limit=1,
+            score_threshold=self.similarity_threshold,
+            query_filter=Filter(
+                must=[
+                    FieldCondition(key="scope", match=MatchValue(value=scope)),
+                    FieldCondition(key="corpus_version", match=MatchValue(value=corpus_version)),
+                    FieldCondition(
+                        key="created_at", range=Range(gte=time.time() - self.ttl_seconds)
+                    ),
+                ]
+            ),
+        )
+        if not results.points:
+            return None
+
+        point = results.points[0]
+        logger.debug(f"Semantic cache hit (similarity {point.score:.3f})")
+        return (point.payload or {}).get("cache_key")
+
+    async def store(self, embedding: list[float], scope: str, cache_key: str) -> None:
+        await self._ensure_collection()
+        await self.client.upsert(
+            collection_name=self.collection,
+            points=[
+                PointStruct(
+                    # One entry per exact key, so re-caching a result replaces it
+                    id=str(uuid5(NAMESPACE_URL, cache_key)),
+                    vector=embedding,
+                    payload={
+                        "scope": scope,
+                        "cache_key": cache_key,
+                        "corpus_version": await self._corpus_version(),
+                        "created_at": time.time(),
+                    },
+                )
+            ],
+        )
+
+        self._stores_since_eviction += 1
+        if self._stores_since_eviction >= EVICTION_INTERVAL:
+            self._stores_since_eviction = 0
+            await self.evict()
+
+    async def evict(self) -> None:
+        """Delete expired and outdated entries, then the oldest beyond max_entries."""
+        await self._ensure_collection()
+        await self.client.delete(
+            collection_name=self.collection,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    should=[
+                        FieldCondition(
+                            key="created_at", range=Range(lt=time.time() - self.ttl_seconds)
+                        ),
+                        FieldCondition(
+                            key="corpus_version", range=Range(lt=await self._corpus_version())
+                        ),
+                    ]
+                )
+            ),
+        )
+
+        count = (await self.client.count(collection_name=self.collection)).count
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        oldest, _ = await self.client.scroll(
+            collection_name=self.collection,
+            limit=excess,
+            order_by=OrderBy(key="created_at", direction=Direction.ASC),
+            with_payload=False,
+        )
+        await self.client.delete(
+            collection_name=self.collection,
+            points_selector=[point.id for point in oldest],
+        )
+        logger.info(f"Evicted {len(oldest)} semantic cache entries over the {self.max_entries} cap")
+
+    async def _corpus_version(self) -> int:
+        return await self.corpus_versions.current() if self.corpus_versions else 0
+
+    async def close(self) -> None:
+        await self.client.close()
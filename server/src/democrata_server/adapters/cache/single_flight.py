@@ -0,0 +1,134 @@
+"""Single-flight coalescing of identical queries, within and across workers."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import uuid4
+
+import redis.asyncio as redis
+
+from democrata_server.domain.rag.entities import Flight
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY_PREFIX = "rag:flight:"
+DEFAULT_LOCK_TTL_SECONDS = 60
+DEFAULT_WAIT_TIMEOUT_SECONDS = 60.0
+DEFAULT_POLL_INTERVAL_SECONDS = 0.25
+
+
+class RedisSingleFlight:
+    """
+    Query coalescer with an in-process tier and a Redis lock tier.
+
+    Within a worker, followers await the leader's future directly. Across
+    workers, the leader holds a Redis lock (SET NX with a TTL). Followers poll
+    the result cache until the result appears, then take it. Followers are
+    released and the lock given up as soon as the leader publishes. If the lock
+    disappears without a cached result, a follower takes over as leader. This
+    happens when the leader failed or its result was not cacheable. Redis errors
+    degrade to running the query uncoalesced.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        lock_ttl_seconds: int = DEFAULT_LOCK_TTL_SECONDS,
+        wait_timeout_seconds: float = DEFAULT_WAIT_TIMEOUT_SECONDS,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    ):
+        self.client = redis.from_url(url, decode_responses=True)
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @asynccontextmanager
+    async def flight(
+        self, key: str, load_result: Callable[[], Awaitable[Any | None]]
+    ) -> AsyncIterator[Flight]:
+        # Follow a leader in this process; it may finish without a result
+        while (future := self._inflight.get(key)) is not None:
+            result = await asyncio.shield(future)
+            if result is not None:
+                yield Flight(leader=False, result=result)
+                return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        flight = Flight(leader=True)
+        token: str | None = None
+        release: asyncio.Task | None = None
+
+        def land(result: Any) -> None:
+            """Hand the result to followers and give up leadership."""
+            nonlocal release
+            if future.done():
+                return
+            future.set_result(result)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if token is not None:
+                release = asyncio.create_task(self._release(key, token))
+
+        try:
+            token, result = await self._acquire_or_follow(key, load_result)
+            if result is not None:
+                flight = Flight(leader=False, result=result)
+            else:
+                # Followers are released on publish, not when the leader exits,
+                # which may be long after (e.g. while it streams verification)
+                flight.on_publish = land
+            yield flight
+        finally:
+            land(flight.result)
+            if release is not None:
+                await release
+
+    async def _acquire_or_follow(
+        self, key: str, load_result: Callable[[], Awaitable[Any | None]]
+    ) -> tuple[str | None, Any | None]:
+        """
+        Take the cross-worker lock, returning (token, None), or wait for another
+        worker's result, returning (None, result).
+        """
+        lock_key = f"{LOCK_KEY_PREFIX}{key}"
+        token = str(uuid4())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout_seconds
+
+        try:
+            while True:
+                if await self.client.set(lock_key, token, nx=True, ex=self.lock_ttl_seconds):
+                    return token, None
+
+                await asyncio.sleep(self.poll_interval_seconds)
+                result = await load_result()
+                if result is not None:
+                    return None, result
+                if loop.time() >= deadline:
+                    logger.warning(f"Timed out waiting for in-flight query {key}, running it here")
+                    return None, None
+        except redis.RedisError as e:
+            logger.warning(f"Query coalescing unavailable: {e}")
+            return None, None
+
+    async def _release(self, key: str, token: str) -> None:
+        """Delete the lock only if we still own it (it may have expired and been retaken)."""
+        lock_key = f"{LOCK_KEY_PREFIX}{key}"
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(lock_key)
+                if await pipe.get(lock_key) == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    await pipe.execute()
+        except redis.WatchError:
+            pass
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release query lock {key}: {e}")
+
+    async def close(self) -> None:
+        await self.client.close()
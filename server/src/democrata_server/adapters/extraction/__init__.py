@@ -1,9 +1,10 @@
-from .pdf import PdfExtractor
+from .pdf import ExtractionError, PdfExtractor
 from .plain import PlainTextExtractor
 from .router import ContentTypeExtractor
 
 __all__ = [
     "ContentTypeExtractor",
+    "ExtractionError",
     "PdfExtractor",
     "PlainTextExtractor",
 ]
@@ -1,10 +1,81 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 
 from pypdf import PdfReader
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGES_PER_TASK = 16
+DEFAULT_MAX_MEMORY_MB = 1024
+DEFAULT_MAX_FILE_MB = 100
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be extracted within the configured limits."""
+
+
+def _limit_memory(max_memory_bytes: int) -> None:
+    """Pool initializer: cap each worker's address space so a pathological PDF fails alone."""
+    if max_memory_bytes <= 0:
+        return
+    try:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not cap PDF worker memory: {e}")
+
+
+def _write_temp_file(content: bytes) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(content)
+        return f.name
+
+
+def _count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _extract_pages(path: str, start: int, end: int) -> list[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
 
 class PdfExtractor:
-    """Extracts text from PDF files using pypdf."""
+    """
+    Extracts text from PDF files using pypdf.
+
+    `extract_stream` parses in a process pool, so a large PDF does not block
+    the event loop. Pages are split into ranges of `pages_per_task` that are
+    parsed in parallel, with at most two ranges per worker in flight. Text is
+    yielded in page order as ranges finish, so consumers can start on the
+    first pages while later ones are parsed, and a slow consumer holds back
+    further parsing. Pages done are reported to `on_progress`. Files over
+    `max_file_mb` are rejected. Each worker's address space is capped at
+    `max_memory_mb`, so a pathological file fails its own extraction instead
+    of exhausting the host.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        max_memory_mb: int = DEFAULT_MAX_MEMORY_MB,
+        max_file_mb: int = DEFAULT_MAX_FILE_MB,
+    ):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.pages_per_task = pages_per_task
+        self.max_memory_mb = max_memory_mb
+        self.max_file_mb = max_file_mb
+        self._pool: ProcessPoolExecutor | None = None
 
     def extract(self, content: bytes, content_type: str, filename: str) -> str:
         reader = PdfReader(BytesIO(content))
@@ -16,3 +87,79 @@ class PdfExtractor:
                 text_parts.append(page_text)
 
         return "\n\n".join(text_parts)
+
+    async def extract_stream(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> AsyncIterator[str]:
+        if self.max_file_mb > 0 and len(content) > self.max_file_mb * 1024 * 1024:
+            raise ExtractionError(f"{filename} exceeds the {self.max_file_mb} MB PDF limit")
+
+        # Workers read the file from disk rather than each receiving a copy of the bytes.
+        # Writing up to max_file_mb is slow enough to keep off the event loop.
+        path = await asyncio.to_thread(_write_temp_file, content)
+
+        # Each in-flight range's first page, with its future
+        pending: deque[tuple[int, asyncio.Future]] = deque()
+        try:
+            page_count = await self._result(self._submit(_count_pages, path), filename)
+            ranges = iter(
+                (start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            )
+            for start, end in ranges:
+                pending.append((start, self._submit(_extract_pages, path, start, end)))
+                if len(pending) >= self.max_workers * 2:
+                    break
+
+            while pending:
+                start, future = pending.popleft()
+                pages = await self._result(future, filename)
+                if (next_range := next(ranges, None)) is not None:
+                    pending.append(
+                        (next_range[0], self._submit(_extract_pages, path, *next_range))
+                    )
+                for page_number, page_text in enumerate(pages, start + 1):
+                    if on_progress is not None:
+                        on_progress(page_number, page_count)
+                    if page_text:
+                        yield page_text
+        finally:
+            for _, future in pending:
+                future.cancel()
+            os.unlink(path)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned rather than forked: the parent runs an event loop and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_memory,
+                initargs=(self.max_memory_mb * 1024 * 1024,),
+            )
+        return self._pool
+
+    def _submit(self, fn, *args) -> asyncio.Future:
+        future: Future = self._executor().submit(fn, *args)
+        return asyncio.wrap_future(future)
+
+    async def _result(self, future: asyncio.Future, filename: str):
+        try:
+            return await future
+        except MemoryError as e:
+            raise ExtractionError(
+                f"{filename} needs more than {self.max_memory_mb} MB to extract"
+            ) from e
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); start afresh next time
+            self._pool = None
+            raise ExtractionError(f"PDF worker crashed while extracting {filename}") from e
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,5 +1,18 @@
+from collections.abc import AsyncIterator, Callable
+
+
 class PlainTextExtractor:
     """Extracts text from plain text files using UTF-8 decoding."""
 
     def extract(self, content: bytes, content_type: str, filename: str) -> str:
         return content.decode("utf-8", errors="replace")
+
+    async def extract_stream(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> AsyncIterator[str]:
+        # Yielded whole; the byte length already tells callers the text length
+        yield self.extract(content, content_type, filename)
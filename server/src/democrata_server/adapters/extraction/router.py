@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator, Callable
+
 from .pdf import PdfExtractor
 from .plain import PlainTextExtractor
 
@@ -5,8 +7,8 @@ from .plain import PlainTextExtractor
 class ContentTypeExtractor:
     """Routes extraction to the appropriate extractor based on content type."""
 
-    def __init__(self):
-        self._pdf_extractor = PdfExtractor()
+    def __init__(self, pdf_extractor: PdfExtractor | None = None):
+        self._pdf_extractor = pdf_extractor or PdfExtractor()
         self._plain_extractor = PlainTextExtractor()
         self._extractors = {
             "application/pdf": self._pdf_extractor,
@@ -18,6 +20,20 @@ class ContentTypeExtractor:
         }
 
     def extract(self, content: bytes, content_type: str, filename: str) -> str:
+        return self._route(content_type, filename).extract(content, content_type, filename)
+
+    def extract_stream(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> AsyncIterator[str]:
+        return self._route(content_type, filename).extract_stream(
+            content, content_type, filename, on_progress
+        )
+
+    def _route(self, content_type: str, filename: str) -> PdfExtractor | PlainTextExtractor:
         # Check by content type first
         extractor = self._extractors.get(content_type)
 
@@ -28,4 +44,7 @@ class ContentTypeExtractor:
             else:
                 extractor = self._plain_extractor
 
-        return extractor.extract(content, content_type, filename)
+        return extractor
+
+    async def close(self) -> None:
+        await self._pdf_extractor.close()
@@ -1,9 +1,13 @@
+from .cached_embedder import CachedEmbedder
 from .config import EmbeddingConfig, EmbeddingProvider
 from .embedder import OpenAIEmbedder
 from .factory import Embedder, create_embedder
 from .ollama_embedder import OllamaEmbedder
+from .sparse_encoder import BM25SparseEncoder
 
 __all__ = [
+    "BM25SparseEncoder",
+    "CachedEmbedder",
     "EmbeddingConfig",
     "EmbeddingProvider",
     "Embedder",
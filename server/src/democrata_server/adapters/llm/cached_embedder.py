@@ -0,0 +1,155 @@
+"""Content-addressed embedding cache that wraps any Embedder."""
+
+import hashlib
+import logging
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_KEY_PREFIX = "embedding:"
+DEFAULT_LOCAL_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+def normalize_text(text: str) -> str:
+    """Normalise unicode and whitespace so trivially different inputs share an entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes."""
+    return array("f", vector).tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    values = array("f")
+    values.frombytes(data)
+    return values.tolist()
+
+
+class CachedEmbedder:
+    """
+    Embedder wrapper with an in-process LRU tier and a shared Redis tier.
+
+    Entries are keyed on a hash of the model name and normalised text, so
+    unchanged chunks and repeated queries are never re-embedded. Redis stores
+    compact float32 bytes; Redis errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        inner: Any,  # Embedder protocol
+        model: str,
+        redis_url: str | None = None,
+        local_max_entries: int = DEFAULT_LOCAL_MAX_ENTRIES,
+        ttl_seconds: int | None = DEFAULT_TTL_SECONDS,
+    ):
+        self.inner = inner
+        self.model = model
+        self.local_max_entries = local_max_entries
+        self.ttl_seconds = ttl_seconds
+        self._redis_url = redis_url
+        self._client: redis.Redis | None = None
+        self._local: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def _get_client(self) -> redis.Redis | None:
+        if self._client is None and self._redis_url:
+            self._client = redis.from_url(self._redis_url, decode_responses=False)
+        return self._client
+
+    def cache_key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self.model}\0{normalize_text(text)}".encode()).hexdigest()
+        return f"{EMBEDDING_KEY_PREFIX}{digest[:32]}"
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        keys = [self.cache_key(text) for text in texts]
+        found: dict[str, list[float]] = {}
+
+        for key in dict.fromkeys(keys):
+            vector = self._local_get(key)
+            if vector is not None:
+                found[key] = vector
+
+        remote_keys = [key for key in dict.fromkeys(keys) if key not in found]
+        if remote_keys:
+            for key, vector in (await self._redis_get_many(remote_keys)).items():
+                found[key] = vector
+                self._local_put(key, vector)
+
+        # Embed each distinct missing text once, keeping the first occurrence
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = await self.inner.embed(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            for key, vector in fresh.items():
+                found[key] = vector
+                self._local_put(key, vector)
+            await self._redis_set_many(fresh)
+
+        hits = len(texts) - len(missing)
+        if len(texts) > 1:
+            logger.debug(f"Embedding cache: {hits}/{len(texts)} hits")
+        return [found[key] for key in keys]
+
+    async def embed_single(self, text: str) -> list[float]:
+        embeddings = await self.embed([text])
+        return embeddings[0] if embeddings else []
+
+    def _local_get(self, key: str) -> list[float] | None:
+        vector = self._local.get(key)
+        if vector is not None:
+            self._local.move_to_end(key)
+        return vector
+
+    def _local_put(self, key: str, vector: list[float]) -> None:
+        if self.local_max_entries <= 0:
+            return
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    async def _redis_get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        client = await self._get_client()
+        if client is None:
+            return {}
+        try:
+            values = await client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return {}
+        return {key: decode_vector(value) for key, value in zip(keys, values) if value}
+
+    async def _redis_set_many(self, vectors: dict[str, list[float]]) -> None:
+        client = await self._get_client()
+        if client is None or not vectors:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, vector in vectors.items():
+                    if self.ttl_seconds:
+                        pipe.setex(key, self.ttl_seconds, encode_vector(vector))
+                    else:
+                        pipe.set(key, encode_vector(vector))
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    async def close(self) -> None:
+        if hasattr(self.inner, "close"):
+            await self.inner.close()
+        if self._client:
+            await self._client.close()
+            self._client = None
@@ -16,12 +16,21 @@ class EmbeddingConfig:
     api_key: str | None = None
     base_url: str | None = None
     dimensions: int | None = None
+    batch_size: int = 32
+    max_concurrency: int = 4
+    max_batch_tokens: int = 100_000
+    cache_enabled: bool = False
+    cache_redis_url: str | None = None
+    cache_local_max_entries: int = 10_000
     extra: dict[str, Any] = field(default_factory=dict)
 
     @classmethod
     def from_env(cls) -> "EmbeddingConfig":
         provider_str = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
         provider = EmbeddingProvider(provider_str)
+        cache_enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+        cache_redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        cache_local_max_entries = int(os.getenv("EMBEDDING_CACHE_LOCAL_MAX_ENTRIES", "10000"))
 
         if provider == EmbeddingProvider.OPENAI:
             return cls(
@@ -30,6 +39,12 @@ class EmbeddingConfig:
                 api_key=os.getenv("OPENAI_API_KEY"),
                 base_url=os.getenv("OPENAI_BASE_URL"),
                 dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", "1536")),
+                batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "2048")),
+                max_concurrency=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+                max_batch_tokens=int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "100000")),
+                cache_enabled=cache_enabled,
+                cache_redis_url=cache_redis_url,
+                cache_local_max_entries=cache_local_max_entries,
             )
         elif provider == EmbeddingProvider.OLLAMA:
             return cls(
@@ -37,6 +52,11 @@ class EmbeddingConfig:
                 model=os.getenv("EMBEDDING_MODEL", "nomic-embed-text"),
                 base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
                 dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", "768")),
+                batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+                max_concurrency=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+                cache_enabled=cache_enabled,
+                cache_redis_url=cache_redis_url,
+                cache_local_max_entries=cache_local_max_entries,
             )
         else:
             raise ValueError(f"Unsupported embedding provider: {provider_str}")
@@ -1,25 +1,137 @@
-from openai import AsyncOpenAI
+import asyncio
+import logging
+
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+
+from .token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 5
+RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 60.0
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+DEFAULT_MAX_BATCH_INPUTS = 2048
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def pack_by_tokens(
+    token_counts: list[int], max_tokens: int, max_inputs: int
+) -> list[list[int]]:
+    """
+    Greedily pack input indices into batches that stay within the token and input budgets.
+
+    Order is preserved. An input larger than the token budget is sent on its own
+    and left for the provider to accept or reject.
+    """
+    packs: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+
+    for index, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            packs.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        packs.append(current)
+    return packs
 
 
 class OpenAIEmbedder:
+    """
+    Embedder for OpenAI-compatible /embeddings APIs.
+
+    Inputs are packed into requests by token budget, up to `max_concurrency`
+    requests run at once, and results are returned in input order. Rate limits
+    and transient server errors are retried with backoff, honouring Retry-After.
+    """
+
     def __init__(
         self,
         api_key: str | None = None,
         base_url: str | None = None,
         model: str = "text-embedding-3-small",
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_inputs: int = DEFAULT_MAX_BATCH_INPUTS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ):
-        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        # Retries are handled in _embed_with_retry so a rate limit pauses every pack
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
         self.model = model
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_batch_inputs = max(1, max_batch_inputs)
+        self.max_concurrency = max(1, max_concurrency)
+        self._rate_limited_until = 0.0
 
     async def embed(self, texts: list[str]) -> list[list[float]]:
         if not texts:
             return []
 
-        response = await self.client.embeddings.create(
-            model=self.model,
-            input=texts,
-        )
-        return [item.embedding for item in response.data]
+        token_counts = [count_tokens([text]) for text in texts]
+        packs = pack_by_tokens(token_counts, self.max_batch_tokens, self.max_batch_inputs)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_pack(indices: list[int]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_with_retry([texts[i] for i in indices])
+
+        results = await asyncio.gather(*(run_pack(indices) for indices in packs))
+
+        embeddings: list[list[float]] = [[] for _ in texts]
+        for indices, pack_embeddings in zip(packs, results):
+            for index, embedding in zip(indices, pack_embeddings):
+                embeddings[index] = embedding
+
+        if len(packs) > 1:
+            logger.info(f"Embedded {len(texts)} texts in {len(packs)} requests")
+        return embeddings
+
+    async def _embed_with_retry(self, inputs: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(MAX_RETRIES):
+            # Wait out any rate-limit cooldown set by a concurrent pack
+            wait = self._rate_limited_until - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=inputs,
+                )
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                if isinstance(e, RateLimitError):
+                    self._rate_limited_until = max(self._rate_limited_until, loop.time() + delay)
+                logger.warning(
+                    f"Embedding request for {len(inputs)} inputs failed (attempt {attempt + 1}): "
+                    f"{e}. Retrying in {delay:.1f}s..."
+                )
+                await asyncio.sleep(delay)
+
+        # Should not reach here, but just in case
+        raise RuntimeError(f"Failed to embed {len(inputs)} inputs after {MAX_RETRIES} attempts")
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Use the server's Retry-After hint when present, else exponential backoff."""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), MAX_RETRY_DELAY_SECONDS)
+            except ValueError:
+                pass
+        return min(RETRY_DELAY_SECONDS * (2**attempt), MAX_RETRY_DELAY_SECONDS)
 
     async def embed_single(self, text: str) -> list[float]:
         embeddings = await self.embed([text])
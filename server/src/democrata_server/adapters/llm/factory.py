@@ -13,6 +13,21 @@ def create_embedder(config: EmbeddingConfig | None = None) -> Embedder:
     if config is None:
         config = EmbeddingConfig.from_env()
 
+    embedder = _create_provider_embedder(config)
+
+    if config.cache_enabled:
+        from .cached_embedder import CachedEmbedder
+
+        return CachedEmbedder(
+            inner=embedder,
+            model=config.model,
+            redis_url=config.cache_redis_url,
+            local_max_entries=config.cache_local_max_entries,
+        )
+    return embedder
+
+
+def _create_provider_embedder(config: EmbeddingConfig) -> Embedder:
     if config.provider == EmbeddingProvider.OPENAI:
         from .embedder import OpenAIEmbedder
 
@@ -20,6 +35,9 @@ def create_embedder(config: EmbeddingConfig | None = None) -> Embedder:
             api_key=config.api_key,
             base_url=config.base_url,
             model=config.model,
+            max_batch_tokens=config.max_batch_tokens,
+            max_batch_inputs=config.batch_size,
+            max_concurrency=config.max_concurrency,
         )
     elif config.provider == EmbeddingProvider.OLLAMA:
         from .ollama_embedder import OllamaEmbedder
@@ -27,6 +45,8 @@ def create_embedder(config: EmbeddingConfig | None = None) -> Embedder:
         return OllamaEmbedder(
             base_url=config.base_url or "http://localhost:11434",
             model=config.model,
+            batch_size=config.batch_size,
+            max_concurrency=config.max_concurrency,
         )
     else:
         raise ValueError(f"Unsupported embedding provider: {config.provider}")
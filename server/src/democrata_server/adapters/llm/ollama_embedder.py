@@ -7,6 +7,8 @@ logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2.0
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_CONCURRENCY = 4
 
 
 class OllamaEmbeddingError(Exception):
@@ -19,18 +21,36 @@ class OllamaEmbeddingError(Exception):
 
 
 class OllamaEmbedder:
+    """
+    Embedder backed by Ollama's /api/embed endpoint.
+
+    Texts are sent in micro-batches of `batch_size` inputs, with at most
+    `max_concurrency` batches in flight. A batch that still fails after retries
+    with an error response is split in half and retried, so only the failing
+    batch is resent, at smaller sizes, rather than every input. If a single
+    chunk still fails, `embed` raises an OllamaEmbeddingError carrying that
+    chunk's index.
+    """
+
     def __init__(
         self,
         base_url: str = "http://localhost:11434",
         model: str = "nomic-embed-text",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
         self._client: httpx.AsyncClient | None = None
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=120.0)
+            self._client = httpx.AsyncClient(
+                timeout=120.0,
+                limits=httpx.Limits(max_connections=self.max_concurrency),
+            )
         return self._client
 
     async def embed(self, texts: list[str]) -> list[list[float]]:
@@ -38,23 +58,57 @@ class OllamaEmbedder:
             return []
 
         client = await self._get_client()
-        embeddings = []
-
-        for i, text in enumerate(texts):
-            embedding = await self._embed_with_retry(client, text, i, len(texts))
-            embeddings.append(embedding)
-
-            # Log progress every 50 chunks
-            if (i + 1) % 50 == 0:
-                logger.info(f"Embedded {i + 1}/{len(texts)} chunks")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total = len(texts)
+        completed = 0
+
+        async def run_batch(start: int) -> list[list[float]]:
+            nonlocal completed
+            batch = texts[start : start + self.batch_size]
+            async with semaphore:
+                embeddings = await self._embed_batch(client, batch, start, total)
+            completed += len(batch)
+            if total > self.batch_size:
+                logger.info(f"Embedded {completed}/{total} chunks")
+            return embeddings
+
+        results = await asyncio.gather(
+            *(run_batch(start) for start in range(0, total, self.batch_size))
+        )
 
+        embeddings = [embedding for batch in results for embedding in batch]
         logger.info(f"Successfully embedded {len(embeddings)} chunks")
         return embeddings
 
+    async def _embed_batch(
+        self, client: httpx.AsyncClient, batch: list[str], first_index: int, total_chunks: int
+    ) -> list[list[float]]:
+        """Embed a batch, splitting it on failure to isolate the offending chunk."""
+        try:
+            return await self._embed_with_retry(client, batch, first_index, total_chunks)
+        except OllamaEmbeddingError as e:
+            # Network failures are not chunk-specific, so splitting would not help
+            if len(batch) == 1 or e.response_body is None:
+                raise
+
+        mid = len(batch) // 2
+        logger.warning(
+            f"Batch of {len(batch)} chunks starting at {first_index}/{total_chunks} failed, "
+            f"splitting into {mid} + {len(batch) - mid}"
+        )
+        left = await self._embed_batch(client, batch[:mid], first_index, total_chunks)
+        right = await self._embed_batch(client, batch[mid:], first_index + mid, total_chunks)
+        return left + right
+
     async def _embed_with_retry(
-        self, client: httpx.AsyncClient, text: str, chunk_index: int, total_chunks: int
-    ) -> list[float]:
-        last_error: Exception | None = None
+        self, client: httpx.AsyncClient, batch: list[str], first_index: int, total_chunks: int
+    ) -> list[list[float]]:
+        last_index = first_index + len(batch) - 1
+        label = (
+            f"chunk {first_index}/{total_chunks}"
+            if len(batch) == 1
+            else f"chunks {first_index}-{last_index}/{total_chunks}"
+        )
 
         for attempt in range(MAX_RETRIES):
             try:
@@ -62,13 +116,20 @@ class OllamaEmbedder:
                     f"{self.base_url}/api/embed",
                     json={
                         "model": self.model,
-                        "input": text,
+                        "input": batch,
                     },
                 )
 
                 if response.is_success:
-                    data = response.json()
-                    return data["embeddings"][0]
+                    embeddings = response.json()["embeddings"]
+                    if len(embeddings) != len(batch):
+                        raise OllamaEmbeddingError(
+                            f"Ollama returned {len(embeddings)} embeddings "
+                            f"for {len(batch)} inputs ({label})",
+                            chunk_index=first_index,
+                            response_body=response.text,
+                        )
+                    return embeddings
 
                 response_body = response.text
 
@@ -76,43 +137,42 @@ class OllamaEmbedder:
                 if response.status_code >= 500 and attempt < MAX_RETRIES - 1:
                     delay = RETRY_DELAY_SECONDS * (2 ** attempt)
                     logger.warning(
-                        f"Ollama error for chunk {chunk_index}/{total_chunks} (attempt {attempt + 1}): "
+                        f"Ollama error for {label} (attempt {attempt + 1}): "
                         f"{response_body[:200]}. Retrying in {delay}s..."
                     )
                     await asyncio.sleep(delay)
                     continue
 
                 logger.error(
-                    f"Ollama embedding failed for chunk {chunk_index}/{total_chunks}: "
+                    f"Ollama embedding failed for {label}: "
                     f"status={response.status_code}, body={response_body[:500]}"
                 )
                 raise OllamaEmbeddingError(
-                    f"Ollama returned {response.status_code} for chunk {chunk_index}/{total_chunks}: {response_body[:500]}",
-                    chunk_index=chunk_index,
+                    f"Ollama returned {response.status_code} for {label}: {response_body[:500]}",
+                    chunk_index=first_index,
                     response_body=response_body,
                 )
 
             except httpx.RequestError as e:
-                last_error = e
                 if attempt < MAX_RETRIES - 1:
                     delay = RETRY_DELAY_SECONDS * (2 ** attempt)
                     logger.warning(
-                        f"Network error for chunk {chunk_index}/{total_chunks} (attempt {attempt + 1}): "
+                        f"Network error for {label} (attempt {attempt + 1}): "
                         f"{e}. Retrying in {delay}s..."
                     )
                     await asyncio.sleep(delay)
                     continue
 
-                logger.error(f"Network error during embedding chunk {chunk_index}/{total_chunks}: {e}")
+                logger.error(f"Network error during embedding {label}: {e}")
                 raise OllamaEmbeddingError(
-                    f"Network error embedding chunk {chunk_index}/{total_chunks}: {e}",
-                    chunk_index=chunk_index,
+                    f"Network error embedding {label}: {e}",
+                    chunk_index=first_index,
                 ) from e
 
         # Should not reach here, but just in case
         raise OllamaEmbeddingError(
-            f"Failed to embed chunk {chunk_index}/{total_chunks} after {MAX_RETRIES} attempts",
-            chunk_index=chunk_index,
+            f"Failed to embed {label} after {MAX_RETRIES} attempts",
+            chunk_index=first_index,
         )
 
     async def embed_single(self, text: str) -> list[float]:
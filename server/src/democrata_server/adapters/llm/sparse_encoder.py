@@ -0,0 +1,65 @@
+"""BM25-style sparse encoder for keyword matching in hybrid retrieval."""
+
+import re
+import zlib
+from collections import Counter
+
+from democrata_server.domain.ingestion.entities import SparseVector
+
+# Keeps identifiers such as "C2024-117", "s.44" and "division 12" searchable
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have how in is it its of on or that the
+    their this to was were what when which who will with
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def term_index(term: str) -> int:
+    """Stable 31-bit index for a term (hash() is salted per process)."""
+    return zlib.crc32(term.encode()) & 0x7FFFFFFF
+
+
+class BM25SparseEncoder:
+    """
+    Encodes text into BM25 term-frequency vectors.
+
+    Document vectors carry the saturated, length-normalised TF component of
+    BM25; the IDF component is applied by the vector store (Qdrant's IDF
+    modifier), so it stays correct as the corpus grows. Query vectors weight
+    each distinct term equally.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 150.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def encode_documents(self, texts: list[str]) -> list[SparseVector]:
+        return [self._encode_document(text) for text in texts]
+
+    def encode_query(self, text: str) -> SparseVector:
+        indices = sorted({term_index(term) for term in tokenize(text)})
+        return SparseVector(indices=indices, values=[1.0] * len(indices))
+
+    def _encode_document(self, text: str) -> SparseVector:
+        terms = tokenize(text)
+        if not terms:
+            return SparseVector(indices=[], values=[])
+
+        length_norm = 1 - self.b + self.b * len(terms) / self.avg_doc_length
+        weights: dict[int, float] = {}
+        for term, tf in Counter(terms).items():
+            index = term_index(term)
+            weight = tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+            # Hash collisions are rare; keep the larger weight if they happen
+            weights[index] = max(weights.get(index, 0.0), weight)
+
+        indices = sorted(weights)
+        return SparseVector(indices=indices, values=[weights[i] for i in indices])
@@ -41,6 +41,12 @@ def parse_source_config(raw: dict) -> SourceConfig:
     )
 
 
+def get_source_configs(jurisdiction: str | None = None) -> list[SourceConfig]:
+    """Get every source config in the scrape config."""
+    config = load_scrape_config(jurisdiction)
+    return [parse_source_config(raw) for raw in config.get("sources", [])]
+
+
 def get_source_config(source_id: str, jurisdiction: str | None = None) -> SourceConfig | None:
     """Get source config by id from the scrape config."""
     config = load_scrape_config(jurisdiction)
@@ -50,6 +56,24 @@ def get_source_config(source_id: str, jurisdiction: str | None = None) -> Source
     return None
 
 
+# arq queues: crawls spend their time fetching, single large documents embedding
+FETCH_QUEUE = "democrata:scrape:fetch"
+EMBED_QUEUE = "democrata:scrape:embed"
+
+
+def scrape_queue(config: SourceConfig) -> str:
+    """The queue a source's scrape runs go to: its `queue` option, else fetch for crawls."""
+    queue = config.options.get("queue")
+    if queue is None:
+        queue = "fetch" if config.options.get("link_selector") else "embed"
+    return EMBED_QUEUE if queue == "embed" else FETCH_QUEUE
+
+
+def scrape_lock_key(source_id: str) -> str:
+    """Redis key held while a scrape run of the source is in progress."""
+    return f"democrata:scrape:running:{source_id}"
+
+
 _FETCHER_REGISTRY: dict[str, type] = {}
 
 
@@ -1,4 +1,8 @@
 import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from dataclasses import dataclass
 from urllib.parse import urljoin, urlparse
 
 import httpx
@@ -8,11 +12,30 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from democrata_server.domain.ingestion.entities import (
     DocumentMetadata,
     DocumentType,
+    RegisteredDocument,
     ScrapedDocument,
     SourceConfig,
+    content_hash,
 )
+from democrata_server.domain.ingestion.ports import DocumentRegistry
 
 from . import register_fetcher
+from .politeness import CrawlPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "DemocrataBot/1.0"
+DEFAULT_MAX_CONCURRENCY = 8
+_END = object()  # Marks the end of crawl results
+
+
+@dataclass
+class _Fetched:
+    content: bytes
+    content_type: str
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
 
 
 def _extract_text_from_html(html: str, selector: str | None) -> str:
@@ -39,97 +62,223 @@ def _filename_from_url(url: str, content_type: str) -> str:
 
 @register_fetcher("configurable_http")
 class ConfigurableHttpFetcher:
-    """Config-driven HTTP fetcher for HTML and PDF. Uses tenacity retries and configurable delay."""
+    """
+    Config-driven HTTP fetcher for HTML and PDF. Uses tenacity retries and configurable delay.
+
+    Links found by `link_selector` are crawled concurrently, up to the
+    `max_concurrency` option, over HTTP/2 where the server supports it.
+    Requests to each host are spaced by `delay_seconds` (or the host's
+    robots.txt Crawl-delay, if longer), allowing bursts of up to `burst`, and
+    URLs robots.txt disallows are skipped unless `respect_robots` is false.
+    Documents are yielded as they are fetched, so their order may differ
+    from the listing's.
 
-    def __init__(self):
-        self._client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+    With a document registry, documents are fetched conditionally using the
+    ETag and Last-Modified they were last ingested with. A 304 response yields
+    a content-less document marked `not_modified` instead of fetching it
+    again. Listing pages are always fetched in full, since their links are
+    needed.
+    """
+
+    def __init__(
+        self,
+        document_registry: DocumentRegistry | None = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self._client = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            http2=True,
+            headers={"User-Agent": user_agent},
+        )
+        self._registry = document_registry
+        self._user_agent = user_agent
 
     async def close(self) -> None:
         await self._client.aclose()
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
-    async def _fetch_url(self, url: str) -> tuple[bytes, str]:
-        """Fetch URL with retries. Returns (content, content_type)."""
-        response = await self._client.get(url)
+    async def _fetch_url(
+        self, url: str, policy: CrawlPolicy, registered: RegisteredDocument | None = None
+    ) -> _Fetched | None:
+        """
+        Fetch URL with retries, waiting for the host's turn.
+
+        Returns None when robots.txt disallows the URL, and a not-modified
+        result when the registered version is still current.
+        """
+        if not await policy.wait(url):
+            return None
+        headers = {}
+        if registered is not None:
+            if registered.etag:
+                headers["If-None-Match"] = registered.etag
+            if registered.last_modified:
+                headers["If-Modified-Since"] = registered.last_modified
+        response = await self._client.get(url, headers=headers)
+        if response.status_code == 304 and headers:
+            logger.info(f"Not modified since last ingested: {url}")
+            return _Fetched(content=b"", content_type="", not_modified=True)
         response.raise_for_status()
         content_type = response.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
-        return response.content, content_type
+        return _Fetched(
+            content=response.content,
+            content_type=content_type,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+
+    async def _registered(self, url: str) -> RegisteredDocument | None:
+        if self._registry is None:
+            return None
+        try:
+            return await self._registry.get(url)
+        except Exception as e:
+            logger.warning(f"Document registry lookup failed for {url}: {e}")
+            return None
+
+    async def _pdf_has_text(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str,
+        registered: RegisteredDocument | None,
+    ) -> bool:
+        if registered is not None and registered.content_hash == content_hash(content):
+            # Unchanged, though the server ignored the validators; ingestion will skip it
+            return True
+        from democrata_server.adapters.extraction import ContentTypeExtractor
+        extractor = ContentTypeExtractor()
+        # Parsing is CPU-bound; keep it off the event loop so other fetches proceed
+        text = await asyncio.to_thread(extractor.extract, content, content_type, filename)
+        return bool(text.strip())
+
+    async def _scrape(
+        self,
+        url: str,
+        config: SourceConfig,
+        policy: CrawlPolicy,
+        fetched: _Fetched | None = None,
+        registered: RegisteredDocument | None = None,
+    ) -> ScrapedDocument | None:
+        """Fetch a document URL (unless already fetched) and turn it into a ScrapedDocument."""
+        if fetched is None:
+            registered = await self._registered(url)
+            if (fetched := await self._fetch_url(url, policy, registered)) is None:
+                return None
 
-    async def fetch(self, config: SourceConfig):
+        metadata = DocumentMetadata(
+            document_type=config.document_type,
+            source=config.id,
+            source_url=url,
+        )
+        if fetched.not_modified:
+            # Passed on so the run can count it as skipped
+            return ScrapedDocument(content="", metadata=metadata, not_modified=True)
+
+        content_type = fetched.content_type
+        filename = _filename_from_url(url, content_type)
+        metadata.title = url.split("/")[-1] or filename
+        payload: str | bytes
+        if "text/html" in content_type or "application/xhtml" in content_type:
+            payload = _extract_text_from_html(
+                fetched.content.decode("utf-8", errors="replace"),
+                config.options.get("content_selector"),
+            )
+            has_text = bool(payload.strip())
+        elif "pdf" in content_type.lower():
+            payload = fetched.content
+            has_text = await self._pdf_has_text(payload, content_type, filename, registered)
+        else:
+            payload = fetched.content.decode("utf-8", errors="replace")
+            has_text = bool(payload.strip())
+        if not has_text:
+            return None
+
+        return ScrapedDocument(
+            content=payload,
+            metadata=metadata,
+            content_type=content_type,
+            filename=filename,
+            etag=fetched.etag,
+            last_modified=fetched.last_modified,
+        )
+
+    async def _crawl(
+        self,
+        urls: list[str],
+        scrape: Callable[[str], Awaitable[ScrapedDocument | None]],
+        max_concurrency: int,
+    ) -> AsyncIterator[ScrapedDocument]:
+        """Scrape URLs with bounded concurrency, yielding documents as they complete."""
+        # Bounded, so a slow consumer holds back further fetching
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+        remaining = iter(urls)
+
+        async def worker() -> None:
+            for url in remaining:
+                try:
+                    document = await scrape(url)
+                except Exception as e:
+                    logger.warning(f"Failed to scrape {url}: {e}")
+                    continue
+                if document is not None:
+                    await results.put(document)
+
+        async def run() -> None:
+            await asyncio.gather(*(worker() for _ in range(min(max_concurrency, len(urls)))))
+            # Only reached if not cancelled, so the consumer is still draining
+            await results.put(_END)
+
+        crawl = asyncio.create_task(run())
+        try:
+            while (document := await results.get()) is not _END:
+                yield document
+        finally:
+            crawl.cancel()
+            await asyncio.gather(crawl, return_exceptions=True)
+
+    async def fetch(self, config: SourceConfig) -> AsyncIterator[ScrapedDocument]:
         """Fetch documents from config URL(s). Yields ScrapedDocument per document."""
         urls = config.urls or [config.url]
-        delay = float(config.options.get("delay_seconds", 1.0))
-        content_selector = config.options.get("content_selector")
         link_selector = config.options.get("link_selector")
+        max_concurrency = int(config.options.get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+        policy = CrawlPolicy(
+            self._client,
+            user_agent=self._user_agent,
+            min_interval_seconds=float(config.options.get("delay_seconds", 1.0)),
+            burst=int(config.options.get("burst", 1)),
+            respect_robots=bool(config.options.get("respect_robots", True)),
+        )
 
         for url in urls:
-            await asyncio.sleep(delay)
-            content, content_type = await self._fetch_url(url)
-
-            if "text/html" in content_type or "application/xhtml" in content_type:
-                html = content.decode("utf-8", errors="replace")
-                if link_selector:
-                    parser = HTMLParser(html)
-                    for node in parser.css(link_selector):
-                        href = node.attributes.get("href")
-                        if href:
-                            doc_url = urljoin(url, href)
-                            await asyncio.sleep(delay)
-                            try:
-                                doc_content, doc_type = await self._fetch_url(doc_url)
-                                if "text/html" in doc_type:
-                                    text = _extract_text_from_html(
-                                        doc_content.decode("utf-8", errors="replace"),
-                                        content_selector,
-                                    )
-                                elif "pdf" in doc_type.lower():
-                                    text = ""
-                                    from democrata_server.adapters.extraction import ContentTypeExtractor
-                                    extractor = ContentTypeExtractor()
-                                    text = extractor.extract(doc_content, doc_type, _filename_from_url(doc_url, doc_type))
-                                else:
-                                    text = doc_content.decode("utf-8", errors="replace")
-                                if text.strip():
-                                    yield ScrapedDocument(
-                                        content=doc_content if "pdf" in doc_type.lower() else text,
-                                        metadata=DocumentMetadata(
-                                            document_type=config.document_type,
-                                            source=config.id,
-                                            source_url=doc_url,
-                                            title=doc_url.split("/")[-1] or "document",
-                                        ),
-                                        content_type=doc_type,
-                                        filename=_filename_from_url(doc_url, doc_type),
-                                    )
-                            except Exception:
-                                continue
-                else:
-                    text = _extract_text_from_html(html, content_selector)
-                    if text.strip():
-                        yield ScrapedDocument(
-                            content=text,
-                            metadata=DocumentMetadata(
-                                document_type=config.document_type,
-                                source=config.id,
-                                source_url=url,
-                                title=url.split("/")[-1] or "document",
-                            ),
-                            content_type="text/html",
-                            filename=_filename_from_url(url, content_type),
-                        )
-            elif "pdf" in content_type.lower():
-                from democrata_server.adapters.extraction import ContentTypeExtractor
-                extractor = ContentTypeExtractor()
-                text = extractor.extract(content, content_type, _filename_from_url(url, content_type))
-                if text.strip():
-                    yield ScrapedDocument(
-                        content=content,
-                        metadata=DocumentMetadata(
-                            document_type=config.document_type,
-                            source=config.id,
-                            source_url=url,
-                            title=_filename_from_url(url, content_type),
-                        ),
-                        content_type=content_type,
-                        filename=_filename_from_url(url, content_type),
-                    )
+            if not link_selector:
+                # The URL is itself the document
+                if (document := await self._scrape(url, config, policy)) is not None:
+                    yield document
+                continue
+
+            fetched = await self._fetch_url(url, policy)
+            if fetched is None:
+                continue
+            content_type = fetched.content_type
+            if "text/html" not in content_type and "application/xhtml" not in content_type:
+                if (document := await self._scrape(url, config, policy, fetched)) is not None:
+                    yield document
+                continue
+
+            parser = HTMLParser(fetched.content.decode("utf-8", errors="replace"))
+            doc_urls = list(
+                dict.fromkeys(
+                    urljoin(url, href)
+                    for node in parser.css(link_selector)
+                    if (href := node.attributes.get("href"))
+                )
+            )
+            crawl = self._crawl(
+                doc_urls, lambda doc_url: self._scrape(doc_url, config, policy), max_concurrency
+            )
+            # Closed with this generator, so a consumer stopping early stops the crawl
+            async with aclosing(crawl) as documents:
+                async for document in documents:
+                    yield document
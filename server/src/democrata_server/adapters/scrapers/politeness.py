@@ -0,0 +1,101 @@
+"""Per-host rate limits and robots.txt rules for crawling."""
+
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CrawlPolicy:
+    """
+    Decides when a URL may be fetched.
+
+    Each host gets its own token bucket, allowing one request per
+    `min_interval_seconds` (or the host's robots.txt Crawl-delay, if longer)
+    with bursts of up to `burst`. robots.txt is fetched once per host; if it
+    cannot be fetched, every path is allowed.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        user_agent: str,
+        min_interval_seconds: float = 1.0,
+        burst: int = 1,
+        respect_robots: bool = True,
+    ):
+        self.client = client
+        self.user_agent = user_agent
+        self.min_interval_seconds = min_interval_seconds
+        self.burst = burst
+        self.respect_robots = respect_robots
+        self._hosts: dict[str, tuple[RobotFileParser | None, TokenBucket | None]] = {}
+        self._host_locks: dict[str, asyncio.Lock] = {}
+
+    async def wait(self, url: str) -> bool:
+        """Wait for the host's turn. Returns False if robots.txt disallows the URL."""
+        robots, bucket = await self._host(url)
+        if robots is not None and not robots.can_fetch(self.user_agent, url):
+            logger.info(f"Disallowed by robots.txt: {url}")
+            return False
+        if bucket is not None:
+            await bucket.acquire()
+        return True
+
+    async def _host(self, url: str) -> tuple[RobotFileParser | None, TokenBucket | None]:
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        if host in self._hosts:
+            return self._hosts[host]
+        async with self._host_locks.setdefault(host, asyncio.Lock()):
+            if host not in self._hosts:
+                robots = await self._load_robots(host) if self.respect_robots else None
+                interval = self.min_interval_seconds
+                if robots is not None and (delay := robots.crawl_delay(self.user_agent)):
+                    interval = max(interval, float(delay))
+                bucket = TokenBucket(1 / interval, self.burst) if interval > 0 else None
+                self._hosts[host] = (robots, bucket)
+        return self._hosts[host]
+
+    async def _load_robots(self, host: str) -> RobotFileParser | None:
+        robots = RobotFileParser(f"{host}/robots.txt")
+        try:
+            response = await self.client.get(f"{host}/robots.txt")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not fetch robots.txt for {host}: {e}")
+            return None
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            return None
+        else:
+            robots.parse(response.text.splitlines())
+        return robots
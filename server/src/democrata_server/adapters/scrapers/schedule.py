@@ -0,0 +1,56 @@
+"""Cron expressions from scrape config, in the form arq's cron jobs take."""
+
+# Field name in arq's cron(), and the range of values, for each cron field in order
+_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+]
+
+
+def _parse_field(field: str, low: int, high: int) -> set[int] | None:
+    """Parse one cron field (`*`, `5`, `1-5`, `*/15`, `1,15`) into its values; None means any."""
+    if field == "*":
+        return None
+    values: set[int] = set()
+    for part in field.split(","):
+        spec, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start_text, end_text = spec.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(spec)
+            end = high if step_text else start
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expression: str) -> dict[str, set[int] | None]:
+    """
+    Convert a five-field cron expression (minute hour day month weekday) to arq cron kwargs.
+
+    Cron counts weekdays from Sunday (0 or 7); arq counts them from Monday (0).
+
+    Cron runs on either the day of month or the weekday when both are
+    restricted, but arq requires both to match, so such expressions are
+    rejected rather than run on fewer days than intended.
+    """
+    fields = expression.split()
+    if len(fields) != len(_FIELDS):
+        raise ValueError(f"Expected 5 cron fields, got {expression!r}")
+    if not fields[2].startswith("*") and not fields[4].startswith("*"):
+        raise ValueError(f"Cron expression restricts both day of month and weekday: {expression!r}")
+    kwargs = {
+        name: _parse_field(field, low, high)
+        for field, (name, low, high) in zip(fields, _FIELDS)
+    }
+    if kwargs["weekday"] is not None:
+        kwargs["weekday"] = {(day - 1) % 7 for day in kwargs["weekday"]}
+    return kwargs
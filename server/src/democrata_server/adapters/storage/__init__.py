@@ -3,6 +3,7 @@ from .s3 import S3BlobStore
 from .postgres import (
     PostgresBillingAccountRepository,
     PostgresConnectionPool,
+    PostgresDocumentRegistry,
     PostgresInvitationRepository,
     PostgresMembershipRepository,
     PostgresOrganizationRepository,
@@ -17,6 +18,7 @@ __all__ = [
     "S3BlobStore",
     "PostgresBillingAccountRepository",
     "PostgresConnectionPool",
+    "PostgresDocumentRegistry",
     "PostgresInvitationRepository",
     "PostgresMembershipRepository",
     "PostgresOrganizationRepository",
@@ -1,4 +1,4 @@
-"""PostgreSQL repository adapters for users, organizations, and billing."""
+"""PostgreSQL repository adapters for users, organizations, billing, and ingested documents."""
 
 import json
 import logging
@@ -14,6 +14,7 @@ from democrata_server.domain.billing.entities import (
     CreditTransaction,
     TransactionType,
 )
+from democrata_server.domain.ingestion.entities import RegisteredDocument
 from democrata_server.domain.usage.entities import (
     CostBreakdown,
     UsageEvent,
@@ -748,6 +749,7 @@ class PostgresUsageEventRepository:
             margin_cents=cost_data.get("margin_cents", 0),
             total_cents=cost_data.get("total_cents", 0),
             total_credits=cost_data.get("total_credits", 0),
+            llm_input_tokens_saved=cost_data.get("llm_input_tokens_saved", 0),
         )
         return UsageEvent(
             id=row["id"],
@@ -928,3 +930,54 @@ class PostgresUsageEventRepository:
                     query_hash,
                 )
             return self._row_to_usage_event(row) if row else None
+
+
+class PostgresDocumentRegistry:
+    """PostgreSQL implementation of DocumentRegistry."""
+
+    def __init__(self, pool: PostgresConnectionPool):
+        self._pool = pool
+
+    def _row_to_registered_document(self, row: asyncpg.Record) -> RegisteredDocument:
+        """Convert a database row to a RegisteredDocument entity."""
+        return RegisteredDocument(
+            source_url=row["source_url"],
+            document_id=row["document_id"],
+            content_hash=row["content_hash"],
+            chunk_count=row["chunk_count"],
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            updated_at=row["updated_at"],
+        )
+
+    async def get(self, source_url: str) -> RegisteredDocument | None:
+        """Get the registered document for a source URL."""
+        async with self._pool.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT * FROM public.document_registry WHERE source_url = $1",
+                source_url,
+            )
+            return self._row_to_registered_document(row) if row else None
+
+    async def register(self, entry: RegisteredDocument) -> None:
+        """Record the document now holding a source URL's content."""
+        async with self._pool.pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO public.document_registry
+                (source_url, document_id, content_hash, chunk_count, etag, last_modified)
+                VALUES ($1, $2, $3, $4, $5, $6)
+                ON CONFLICT (source_url) DO UPDATE SET
+                    document_id = EXCLUDED.document_id,
+                    content_hash = EXCLUDED.content_hash,
+                    chunk_count = EXCLUDED.chunk_count,
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified
+                """,
+                entry.source_url,
+                entry.document_id,
+                entry.content_hash,
+                entry.chunk_count,
+                entry.etag,
+                entry.last_modified,
+            )
@@ -1,129 +1,317 @@
+import asyncio
+import calendar
+import logging
+import re
+from datetime import date, datetime
+from typing import Any
 from uuid import UUID
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
+    DatetimeRange,
     Distance,
     FieldCondition,
     Filter,
+    FilterSelector,
+    Fusion,
+    FusionQuery,
     MatchAny,
+    MatchValue,
+    Modifier,
+    PayloadSchemaType,
     PointStruct,
-    Range,
+    Prefetch,
+    QueryRequest,
+    ScoredPoint,
+    SparseVectorParams,
     VectorParams,
 )
+from qdrant_client.models import SparseVector as QdrantSparseVector
 
-from democrata_server.domain.ingestion.entities import Chunk
+from democrata_server.domain.ingestion.entities import Chunk, SparseVector
+
+logger = logging.getLogger(__name__)
+
+SPARSE_VECTOR_NAME = "bm25"
+HYBRID_PREFETCH_MULTIPLIER = 2
+
+# Payload fields used in filters and deletes. `date` is indexed as a datetime
+# so range filters compare dates, not strings.
+PAYLOAD_INDEXES = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "document_type": PayloadSchemaType.KEYWORD,
+    "source": PayloadSchemaType.KEYWORD,
+    "source_name": PayloadSchemaType.KEYWORD,
+    "date": PayloadSchemaType.DATETIME,
+}
+
+_PARTIAL_DATE = re.compile(r"(\d{4})(?:-(\d{1,2}))?")
+
+
+def _date_bound(value: Any, end: bool) -> str | None:
+    """
+    Normalise a date filter to YYYY-MM-DD, or None if it cannot be parsed.
+
+    A year or year-month covers the whole period, so it is expanded to its
+    first day for a lower bound and its last day for an upper bound.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if match := _PARTIAL_DATE.fullmatch(value):
+        year = int(match.group(1))
+        month = int(match.group(2)) if match.group(2) else (12 if end else 1)
+        if not 1 <= month <= 12:
+            return None
+        day = calendar.monthrange(year, month)[1] if end else 1
+        return date(year, month, day).isoformat()
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        logger.debug(f"Ignoring unparseable date filter: {value!r}")
+        return None
 
 
 class QdrantVectorStore:
+    """
+    Vector store backed by Qdrant's async client.
+
+    One instance owns one client (and its connection pool) and should be shared
+    across requests. The collection is checked lazily on first use rather than
+    at construction, so creating the store never blocks the event loop.
+
+    Chunks carrying a sparse (BM25) vector are also indexed for keyword search.
+    When a query supplies a sparse vector, dense and sparse candidates are
+    fused server-side with reciprocal rank fusion.
+
+    Filtered fields carry payload indexes, so filtered searches and
+    `delete_by_document` do not scan the whole collection.
+    """
+
     def __init__(
         self,
         url: str = "http://localhost:6333",
         collection: str = "democrata_chunks",
         vector_size: int = 768,
+        prefer_grpc: bool = False,
+        timeout: int | None = None,
     ):
-        self.client = QdrantClient(url=url)
+        self.client = AsyncQdrantClient(url=url, prefer_grpc=prefer_grpc, timeout=timeout)
         self.collection = collection
         self.vector_size = vector_size
-        self._ensure_collection()
-
-    def _ensure_collection(self) -> None:
-        collections = self.client.get_collections().collections
-        if not any(c.name == self.collection for c in collections):
-            self.client.create_collection(
-                collection_name=self.collection,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE,
-                ),
-            )
+        self._collection_ready = False
+        self._collection_lock = asyncio.Lock()
+        self._sparse_enabled = False
+
+    async def _ensure_collection(self) -> None:
+        if self._collection_ready:
+            return
+        async with self._collection_lock:
+            if self._collection_ready:
+                return
+            if not await self.client.collection_exists(self.collection):
+                await self.client.create_collection(
+                    collection_name=self.collection,
+                    vectors_config=VectorParams(
+                        size=self.vector_size,
+                        distance=Distance.COSINE,
+                    ),
+                    sparse_vectors_config={
+                        SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF),
+                    },
+                )
+                self._sparse_enabled = True
+                existing_indexes: set[str] = set()
+            else:
+                info = await self.client.get_collection(self.collection)
+                sparse_vectors = info.config.params.sparse_vectors or {}
+                self._sparse_enabled = SPARSE_VECTOR_NAME in sparse_vectors
+                if not self._sparse_enabled:
+                    logger.warning(
+                        f"Collection {self.collection} has no '{SPARSE_VECTOR_NAME}' sparse "
+                        "vector; hybrid search is disabled until it is recreated"
+                    )
+                existing_indexes = set(info.payload_schema or {})
+
+            for field_name, schema in PAYLOAD_INDEXES.items():
+                if field_name not in existing_indexes:
+                    await self.client.create_payload_index(
+                        collection_name=self.collection,
+                        field_name=field_name,
+                        field_schema=schema,
+                    )
+            self._collection_ready = True
 
     async def upsert(self, chunks: list[Chunk]) -> None:
         if not chunks:
             return
 
+        await self._ensure_collection()
+
         points = [
             PointStruct(
                 id=str(chunk.id),
-                vector=chunk.embedding or [],
-                payload={
-                    "document_id": str(chunk.document_id),
-                    "text": chunk.text,
-                    "position": chunk.position,
-                    **chunk.metadata,
-                },
+                vector=self._point_vector(chunk),
+                payload=self._payload(chunk),
             )
             for chunk in chunks
             if chunk.embedding
         ]
 
         if points:
-            self.client.upsert(collection_name=self.collection, points=points)
+            await self.client.upsert(collection_name=self.collection, points=points)
 
     async def search(
-        self, vector: list[float], k: int = 10, filters: dict | None = None
+        self,
+        vector: list[float],
+        k: int = 10,
+        filters: dict | None = None,
+        sparse_vector: SparseVector | None = None,
     ) -> list[Chunk]:
-        query_filter = None # TODO: Enable filters when they dont restrict results too much
-        # query_filter = self._build_filter(filters) if filters else None
+        query_filter = self._build_filter(filters) if filters else None
 
-        results = self.client.query_points(
+        await self._ensure_collection()
+        results = await self.client.query_points(
             collection_name=self.collection,
-            query=vector,
             limit=k,
             query_filter=query_filter,
+            **self._query_params(vector, sparse_vector, k, query_filter),
         )
 
-        chunks = []
-        for result in results.points:
-            payload = result.payload or {}
-            chunk_id = result.id
-            chunks.append(
-                Chunk(
-                    id=UUID(chunk_id) if isinstance(chunk_id, str) else UUID(int=chunk_id),
-                    document_id=UUID(payload.get("document_id", "")),
-                    text=payload.get("text", ""),
-                    position=payload.get("position", 0),
-                    metadata={
-                        key: value
-                        for key, value in payload.items()
-                        if key not in ("document_id", "text", "position")
-                    },
+        return [self._to_chunk(point) for point in results.points]
+
+    async def search_batch(
+        self,
+        vectors: list[list[float]],
+        k: int = 10,
+        filters: dict | None = None,
+        sparse_vectors: list[SparseVector] | None = None,
+    ) -> list[list[Chunk]]:
+        if not vectors:
+            return []
+
+        query_filter = self._build_filter(filters) if filters else None
+
+        await self._ensure_collection()
+        sparse = sparse_vectors or [None] * len(vectors)
+        responses = await self.client.query_batch_points(
+            collection_name=self.collection,
+            requests=[
+                QueryRequest(
+                    limit=k,
+                    filter=query_filter,
+                    with_payload=True,
+                    **self._query_params(vector, sparse_vector, k, query_filter),
                 )
-            )
-        return chunks
+                for vector, sparse_vector in zip(vectors, sparse)
+            ],
+        )
+        return [[self._to_chunk(point) for point in response.points] for response in responses]
+
+    def _query_params(
+        self,
+        vector: list[float],
+        sparse_vector: SparseVector | None,
+        k: int,
+        query_filter: Filter | None,
+    ) -> dict[str, Any]:
+        """Dense query, or dense + sparse prefetches fused with RRF when hybrid is available."""
+        if not (self._sparse_enabled and sparse_vector and sparse_vector.indices):
+            return {"query": vector}
+
+        limit = k * HYBRID_PREFETCH_MULTIPLIER
+        return {
+            "prefetch": [
+                Prefetch(query=vector, filter=query_filter, limit=limit),
+                Prefetch(
+                    query=QdrantSparseVector(
+                        indices=sparse_vector.indices, values=sparse_vector.values
+                    ),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=query_filter,
+                    limit=limit,
+                ),
+            ],
+            "query": FusionQuery(fusion=Fusion.RRF),
+        }
+
+    def _point_vector(self, chunk: Chunk) -> list[float] | dict[str, Any]:
+        sparse = chunk.sparse_embedding
+        if not (self._sparse_enabled and sparse and sparse.indices):
+            return chunk.embedding or []
+        return {
+            "": chunk.embedding or [],
+            SPARSE_VECTOR_NAME: QdrantSparseVector(indices=sparse.indices, values=sparse.values),
+        }
+
+    def _payload(self, chunk: Chunk) -> dict[str, Any]:
+        payload = {
+            "document_id": str(chunk.document_id),
+            "text": chunk.text,
+            "position": chunk.position,
+            **chunk.metadata,
+        }
+        # An empty date cannot be parsed by the datetime index; leave it unset instead
+        if not payload.get("date"):
+            payload.pop("date", None)
+        return payload
+
+    def _to_chunk(self, point: ScoredPoint) -> Chunk:
+        """Convert a scored Qdrant point back into a Chunk."""
+        payload = point.payload or {}
+        chunk_id = point.id
+        return Chunk(
+            id=UUID(chunk_id) if isinstance(chunk_id, str) else UUID(int=chunk_id),
+            document_id=UUID(payload.get("document_id", "")),
+            text=payload.get("text", ""),
+            position=payload.get("position", 0),
+            metadata={
+                key: value
+                for key, value in payload.items()
+                if key not in ("document_id", "text", "position")
+            },
+            score=point.score,
+        )
 
     def _build_filter(self, filters: dict) -> Filter | None:
         """Build Qdrant filter from filter dictionary."""
-        conditions: list[FieldCondition] = []
-
-        # Document type filter (match any of the specified types)
-        if document_types := filters.get("document_type"):
-            if isinstance(document_types, list) and document_types:
-                conditions.append(
-                    FieldCondition(
-                        key="document_type",
-                        match=MatchAny(any=document_types),
-                    )
-                )
-            elif isinstance(document_types, str):
-                conditions.append(
-                    FieldCondition(
-                        key="document_type",
-                        match=MatchAny(any=[document_types]),
-                    )
+        conditions: list[FieldCondition | Filter] = []
+
+        document_types = filters.get("document_type")
+        if isinstance(document_types, str):
+            document_types = [document_types]
+        if document_types:
+            conditions.append(
+                FieldCondition(key="document_type", match=MatchAny(any=document_types))
+            )
+
+        # Sources may be given by id (`source`, e.g. a scrape source) or by name;
+        # chunks stored before `source` was written only have `source_name`
+        sources = filters.get("sources")
+        if isinstance(sources, str):
+            sources = [sources]
+        if sources:
+            conditions.append(
+                Filter(
+                    should=[
+                        FieldCondition(key=key, match=MatchAny(any=sources))
+                        for key in ("source", "source_name")
+                    ]
                 )
+            )
 
-        # Date range filters (assumes 'date' field in payload as YYYY-MM-DD string)
-        date_range_params: dict[str, str | None] = {}
-        if date_from := filters.get("date_from"):
+        # The datetime index compares dates; unparseable bounds are dropped
+        date_range_params: dict[str, str] = {}
+        if date_from := _date_bound(filters.get("date_from"), end=False):
             date_range_params["gte"] = date_from
-        if date_to := filters.get("date_to"):
+        if date_to := _date_bound(filters.get("date_to"), end=True):
             date_range_params["lte"] = date_to
 
         if date_range_params:
             conditions.append(
                 FieldCondition(
                     key="date",
-                    range=Range(**date_range_params),
+                    range=DatetimeRange(**date_range_params),
                 )
             )
 
@@ -133,9 +321,17 @@ class QdrantVectorStore:
         return Filter(must=conditions)
 
     async def delete_by_document(self, document_id: UUID) -> None:
-        self.client.delete(
+        await self._ensure_collection()
+        await self.client.delete(
             collection_name=self.collection,
-            points_selector={
-                "filter": {"must": [{"key": "document_id", "match": {"value": str(document_id)}}]}
-            },
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[
+                        FieldCondition(key="document_id", match=MatchValue(value=str(document_id)))
+                    ]
+                )
+            ),
         )
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -19,6 +19,9 @@ def _job_to_dict(job: Job) -> dict:
         "progress_percent": job.progress_percent,
         "documents_processed": job.documents_processed,
         "chunks_created": job.chunks_created,
+        "documents_skipped": job.documents_skipped,
+        "documents_failed": job.documents_failed,
+        "failures": job.failures,
         "error_message": job.error_message,
         "created_at": job.created_at.isoformat() if job.created_at else None,
         "completed_at": job.completed_at.isoformat() if job.completed_at else None,
@@ -34,6 +37,9 @@ def _dict_to_job(data: dict) -> Job:
         progress_percent=data.get("progress_percent", 0),
         documents_processed=data.get("documents_processed", 0),
         chunks_created=data.get("chunks_created", 0),
+        documents_skipped=data.get("documents_skipped", 0),
+        documents_failed=data.get("documents_failed", 0),
+        failures=data.get("failures", []),
         error_message=data.get("error_message"),
         created_at=datetime.fromisoformat(data["created_at"].replace("Z", "+00:00")) if data.get("created_at") else datetime.now(UTC),
         completed_at=datetime.fromisoformat(data["completed_at"].replace("Z", "+00:00")) if data.get("completed_at") else None,
@@ -9,6 +9,7 @@ from fastapi import Depends, Header, HTTPException, Request, status
 
 from democrata_server.adapters.agents import (
     AgentConfig,
+    create_context_compressor,
     create_context_retriever,
     create_data_extractor,
     create_query_planner,
@@ -17,15 +18,20 @@ from democrata_server.adapters.agents import (
 )
 from democrata_server.adapters.auth.supabase import SupabaseAuthProvider
 from democrata_server.adapters.billing.stripe import StripePaymentProvider
+from democrata_server.adapters.cache.corpus import RedisCorpusVersions
 from democrata_server.adapters.cache.redis import RedisCache
+from democrata_server.adapters.cache.semantic import QdrantSemanticCache
+from democrata_server.adapters.cache.single_flight import RedisSingleFlight
 from democrata_server.adapters.llm.token_counter import count_tokens
-from democrata_server.adapters.extraction import ContentTypeExtractor
+from democrata_server.adapters.extraction import ContentTypeExtractor, PdfExtractor
 from democrata_server.adapters.llm.factory import Embedder, create_embedder
+from democrata_server.adapters.llm.sparse_encoder import BM25SparseEncoder
 from democrata_server.adapters.storage.local import LocalBlobStore
 from democrata_server.adapters.storage.s3 import S3BlobStore
 from democrata_server.adapters.storage.postgres import (
     PostgresBillingAccountRepository,
     PostgresConnectionPool,
+    PostgresDocumentRegistry,
     PostgresInvitationRepository,
     PostgresMembershipRepository,
     PostgresOrganizationRepository,
@@ -52,7 +58,7 @@ from democrata_server.domain.usage.entities import AnonymousSession
 from democrata_server.domain.usage.ports import AnonymousSessionStore
 from democrata_server.domain.ingestion.scrape_use_cases import ExecuteScrapeRun
 from democrata_server.domain.ingestion.use_cases import IngestDocument
-from democrata_server.domain.rag.ports import ContextRetriever
+from democrata_server.domain.rag.ports import ContextCompressor, ContextRetriever
 from democrata_server.domain.rag.use_cases import ExecuteQuery
 
 
@@ -75,6 +81,7 @@ def get_vector_store() -> QdrantVectorStore:
         url=os.getenv("QDRANT_URL", "http://localhost:6333"),
         collection=os.getenv("QDRANT_COLLECTION", "democrata_chunks"),
         vector_size=int(os.getenv("EMBEDDING_DIMENSIONS", "768")),
+        prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
     )
 
 
@@ -83,11 +90,46 @@ def get_embedder() -> Embedder:
     return create_embedder()
 
 
+@lru_cache
+def get_sparse_encoder() -> BM25SparseEncoder:
+    return BM25SparseEncoder()
+
+
 @lru_cache
 def get_cache() -> RedisCache:
     return RedisCache(url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 
 
+@lru_cache
+def get_corpus_versions() -> RedisCorpusVersions:
+    return RedisCorpusVersions(url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+
+@lru_cache
+def get_semantic_cache() -> QdrantSemanticCache | None:
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    return QdrantSemanticCache(
+        url=os.getenv("QDRANT_URL", "http://localhost:6333"),
+        collection=os.getenv("SEMANTIC_CACHE_COLLECTION", "democrata_query_cache"),
+        vector_size=int(os.getenv("EMBEDDING_DIMENSIONS", "768")),
+        similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")),
+        corpus_versions=get_corpus_versions(),
+        prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+    )
+
+
+@lru_cache
+def get_query_coalescer() -> RedisSingleFlight | None:
+    if os.getenv("QUERY_COALESCING_ENABLED", "true").lower() != "true":
+        return None
+    return RedisSingleFlight(
+        url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        lock_ttl_seconds=int(os.getenv("QUERY_COALESCING_LOCK_TTL", "60")),
+    )
+
+
 @lru_cache
 def get_job_store() -> RedisJobStore:
     return RedisJobStore()
@@ -108,7 +150,14 @@ def get_billing_account_store() -> InMemoryBillingAccountStore:
 
 @lru_cache
 def get_text_extractor() -> ContentTypeExtractor:
-    return ContentTypeExtractor()
+    return ContentTypeExtractor(
+        pdf_extractor=PdfExtractor(
+            max_workers=int(os.getenv("PDF_EXTRACTION_WORKERS", "0")) or None,
+            pages_per_task=int(os.getenv("PDF_PAGES_PER_TASK", "16")),
+            max_memory_mb=int(os.getenv("PDF_MAX_MEMORY_MB", "1024")),
+            max_file_mb=int(os.getenv("PDF_MAX_FILE_MB", "100")),
+        )
+    )
 
 
 # --- Agent Dependencies ---
@@ -121,12 +170,12 @@ def get_agent_config() -> AgentConfig:
 
 @lru_cache
 def get_query_planner() -> QueryPlanner:
-    return create_query_planner(get_agent_config())
+    return create_query_planner(get_agent_config(), cache=get_cache())
 
 
 @lru_cache
 def get_data_extractor() -> DataExtractor:
-    return create_data_extractor(get_agent_config())
+    return create_data_extractor(get_agent_config(), cache=get_cache())
 
 
 @lru_cache
@@ -148,6 +197,11 @@ def get_context_retriever() -> ContextRetriever:
     )
 
 
+@lru_cache
+def get_context_compressor() -> ContextCompressor | None:
+    return create_context_compressor(get_agent_config())
+
+
 # --- Use Cases ---
 
 
@@ -158,6 +212,11 @@ def get_ingest_document_use_case() -> IngestDocument:
         vector_store=get_vector_store(),
         job_store=get_job_store(),
         text_extractor=get_text_extractor(),
+        sparse_encoder=get_sparse_encoder(),
+        corpus_versions=get_corpus_versions(),
+        batch_size=int(os.getenv("INGEST_BATCH_SIZE", "64")),
+        queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "4")),
+        document_registry=get_document_registry(),
     )
 
 
@@ -165,6 +224,7 @@ def get_execute_scrape_run_use_case() -> ExecuteScrapeRun:
     return ExecuteScrapeRun(
         ingest_use_case=get_ingest_document_use_case(),
         job_store=get_job_store(),
+        max_concurrent_documents=int(os.getenv("SCRAPE_INGEST_CONCURRENCY", "4")),
     )
 
 
@@ -176,8 +236,18 @@ def get_execute_query_use_case() -> ExecuteQuery:
         composer=get_response_composer(),
         verifier=get_response_verifier(),
         cache=get_cache(),
+        context_compressor=get_context_compressor(),
         token_counter=count_tokens,
         cost_margin=float(os.getenv("COST_MARGIN", "0.4")),
+        verify_in_background=get_agent_config().verifier_background,
+        fuse_extractions=get_agent_config().extractor_fused,
+        semantic_cache=get_semantic_cache(),
+        embedder=get_embedder(),
+        coalescer=get_query_coalescer(),
+        corpus_versions=get_corpus_versions(),
+        stale_while_revalidate_seconds=int(
+            os.getenv("QUERY_CACHE_STALE_WHILE_REVALIDATE_SECONDS", "3600")
+        ),
     )
 
 
@@ -414,6 +484,13 @@ def get_usage_event_repository() -> PostgresUsageEventRepository:
     return PostgresUsageEventRepository(get_postgres_pool())
 
 
+def get_document_registry() -> PostgresDocumentRegistry | None:
+    """Get the document registry used for incremental re-ingestion, if enabled."""
+    if os.getenv("DOCUMENT_REGISTRY_ENABLED", "true").lower() != "true":
+        return None
+    return PostgresDocumentRegistry(get_postgres_pool())
+
+
 async def get_rag_billing_context(
     request: Request,
     session_id: str = Depends(get_session_id),
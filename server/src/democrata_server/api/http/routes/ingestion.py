@@ -7,7 +7,7 @@ from arq.connections import RedisSettings
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
 from pydantic import BaseModel
 
-from democrata_server.adapters.scrapers import get_source_config
+from democrata_server.adapters.scrapers import get_source_config, scrape_lock_key, scrape_queue
 from democrata_server.adapters.usage.redis_job_store import RedisJobStore
 from democrata_server.api.http.deps import get_ingest_document_use_case, get_job_store, get_upload_auth
 from democrata_server.domain.ingestion.entities import DocumentMetadata, DocumentType, Job, JobType
@@ -37,6 +37,9 @@ class JobStatusResponse(BaseModel):
     progress_percent: int
     documents_processed: int
     chunks_created: int
+    documents_skipped: int = 0
+    documents_failed: int = 0
+    failures: list[str] = []
     error_message: str | None = None
 
 
@@ -88,12 +91,20 @@ async def trigger_scrape(
     if not config:
         raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
 
-    job = Job.create(job_type=JobType.SCRAPE, source_id=source_id)
-    await job_store.save(job)
-
     redis = await create_pool(RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
-    await redis.enqueue_job("run_scrape_job", str(job.id), source_id)
-    await redis.close()
+    try:
+        if await redis.exists(scrape_lock_key(source_id)):
+            raise HTTPException(
+                status_code=409, detail=f"Source {source_id} is already being scraped"
+            )
+
+        job = Job.create(job_type=JobType.SCRAPE, source_id=source_id)
+        await job_store.save(job)
+        await redis.enqueue_job(
+            "run_scrape_job", str(job.id), source_id, _queue_name=scrape_queue(config)
+        )
+    finally:
+        await redis.close()
 
     return JobResponse(
         job_id=str(job.id),
@@ -123,5 +134,8 @@ async def get_job_status(
         progress_percent=job.progress_percent,
         documents_processed=job.documents_processed,
         chunks_created=job.chunks_created,
+        documents_skipped=job.documents_skipped,
+        documents_failed=job.documents_failed,
+        failures=job.failures,
         error_message=job.error_message,
     )
@@ -1,7 +1,9 @@
+import json
 from dataclasses import fields, is_dataclass
 from enum import Enum
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from democrata_server.api.http.deps import (
@@ -9,6 +11,7 @@ from democrata_server.api.http.deps import (
     UserBillingContext,
     get_anonymous_session_store,
     get_billing_account_repository,
+    get_data_extractor,
     get_execute_query_use_case,
     get_rag_billing_context,
     get_session_id,
@@ -19,8 +22,17 @@ from democrata_server.domain.billing.entities import (
     CreditTransaction,
     ESTIMATED_MAX_QUERY_CREDITS,
 )
-from democrata_server.domain.rag.entities import Query, QueryFilters
-from democrata_server.domain.rag.use_cases import ExecuteQuery
+from democrata_server.domain.rag.entities import (
+    Component,
+    Layout,
+    Query,
+    QueryEvent,
+    QueryEventType,
+    QueryFilters,
+    SourceReference,
+    VerificationOutcome,
+)
+from democrata_server.domain.rag.use_cases import ExecuteQuery, ExecuteQueryResult
 from democrata_server.domain.usage.entities import UsageEvent
 
 router = APIRouter()
@@ -56,6 +68,7 @@ class CostBreakdownData(BaseModel):
     llm_output_tokens: int
     total_cents: int
     total_credits: int
+    llm_input_tokens_saved: int = 0
 
 
 class QueryMetadataData(BaseModel):
@@ -72,6 +85,22 @@ class SourceReferenceData(BaseModel):
     source_date: str | None = None
 
 
+class VerificationData(BaseModel):
+    id: str
+    status: str
+    notices: list[ComponentData] = []
+
+
+class CacheStatsData(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class CacheStatsResponse(BaseModel):
+    extraction: CacheStatsData | None = None
+
+
 class QueryResponse(BaseModel):
     layout: LayoutData
     components: list[ComponentData]
@@ -81,6 +110,7 @@ class QueryResponse(BaseModel):
     sources: list[SourceReferenceData]
     credits_charged: int = 0
     balance_remaining: int | None = None
+    verification: VerificationData | None = None
 
 
 @router.post("/query", response_model=QueryResponse)
@@ -94,6 +124,108 @@ async def query(
     transaction_repo=Depends(get_transaction_repository),
     anonymous_store=Depends(get_anonymous_session_store),
 ) -> QueryResponse:
+    _check_can_query(billing_context)
+    query_obj = _build_query(request, session_id)
+
+    try:
+        result = await execute_query.execute(query_obj)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    credits_charged, balance_remaining = await _charge_for_query(
+        result,
+        request.query,
+        session_id,
+        billing_context,
+        billing_repo,
+        usage_event_repo,
+        transaction_repo,
+        anonymous_store,
+    )
+    return _build_response(result, credits_charged, balance_remaining)
+
+
+@router.post("/query/stream")
+async def query_stream(
+    request: QueryRequest,
+    session_id: str = Depends(get_session_id),
+    billing_context: UserBillingContext | AnonymousBillingContext = Depends(
+        get_rag_billing_context
+    ),
+    execute_query: ExecuteQuery = Depends(get_execute_query_use_case),
+    billing_repo=Depends(get_billing_account_repository),
+    usage_event_repo=Depends(get_usage_event_repository),
+    transaction_repo=Depends(get_transaction_repository),
+    anonymous_store=Depends(get_anonymous_session_store),
+) -> StreamingResponse:
+    """
+    Streaming variant of /query that returns newline-delimited JSON events.
+
+    Each line is {"event": ..., "data": ...}. Events are emitted as pipeline
+    stages finish: plan, sources, layout, component (one per component) and
+    notice, then a "done" event carrying the full QueryResponse after
+    billing. If verification runs in the background, "done" is followed by any
+    "notice" events and a "verification" event with the outcome. Pipeline
+    failures (reported by /query as a 500) and billing failures end the
+    stream with an "error" event carrying status_code and detail.
+    """
+    _check_can_query(billing_context)
+    query_obj = _build_query(request, session_id)
+
+    async def events():
+        try:
+            async for event in execute_query.stream(query_obj):
+                if event.type != QueryEventType.RESULT:
+                    yield _ndjson(event.type.value, _serialize_event(event))
+                    continue
+
+                try:
+                    credits_charged, balance_remaining = await _charge_for_query(
+                        event.data,
+                        request.query,
+                        session_id,
+                        billing_context,
+                        billing_repo,
+                        usage_event_repo,
+                        transaction_repo,
+                        anonymous_store,
+                    )
+                except HTTPException as e:
+                    yield _ndjson("error", {"status_code": e.status_code, "detail": e.detail})
+                    return
+                response = _build_response(event.data, credits_charged, balance_remaining)
+                yield _ndjson("done", response.model_dump())
+        except Exception as e:
+            # Headers are already sent, so the failure is reported in-band
+            yield _ndjson("error", {"status_code": 500, "detail": str(e)})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.get("/verifications/{verification_id}", response_model=VerificationData)
+async def get_verification(
+    verification_id: str,
+    execute_query: ExecuteQuery = Depends(get_execute_query_use_case),
+) -> VerificationData:
+    """Poll the outcome of a background verification."""
+    outcome = await execute_query.get_verification(verification_id)
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Verification not found")
+    return _verification_data(outcome)
+
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats(extractor=Depends(get_data_extractor)) -> CacheStatsResponse:
+    """Hit and miss counts of this worker's agent caches since it started."""
+    stats = getattr(extractor, "stats", None)
+    if stats is None:
+        return CacheStatsResponse()
+    return CacheStatsResponse(
+        extraction=CacheStatsData(hits=stats.hits, misses=stats.misses, hit_rate=stats.hit_rate)
+    )
+
+
+def _build_query(request: QueryRequest, session_id: str) -> Query:
     filters = None
     if request.filters:
         filters = QueryFilters(
@@ -104,6 +236,14 @@ async def query(
             member_ids=request.filters.get("member_ids"),
         )
 
+    return Query(
+        text=request.query,
+        session_id=session_id,
+        filters=filters,
+    )
+
+
+def _check_can_query(billing_context: UserBillingContext | AnonymousBillingContext) -> None:
     if isinstance(billing_context, AnonymousBillingContext):
         if not billing_context.session.can_query():
             raise HTTPException(
@@ -120,17 +260,18 @@ async def query(
                 detail="Insufficient credits. Add credits to continue.",
             )
 
-    query_obj = Query(
-        text=request.query,
-        session_id=session_id,
-        filters=filters,
-    )
-
-    try:
-        result = await execute_query.execute(query_obj)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
+async def _charge_for_query(
+    result: ExecuteQueryResult,
+    query_text: str,
+    session_id: str,
+    billing_context: UserBillingContext | AnonymousBillingContext,
+    billing_repo,
+    usage_event_repo,
+    transaction_repo,
+    anonymous_store,
+) -> tuple[int, int | None]:
+    """Apply billing for a completed query. Returns (credits_charged, balance_remaining)."""
     credits_charged = 0
     balance_remaining = None
 
@@ -166,7 +307,7 @@ async def query(
 
         usage_event = UsageEvent.create_query_event(
             billing_account_id=account.id,
-            query=request.query,
+            query=query_text,
             cost=result.cost,
             cached=cached,
             user_id=billing_context.user.id,
@@ -185,28 +326,14 @@ async def query(
             )
             await transaction_repo.create(transaction)
 
-    # Convert domain objects to response format
-    components_data = []
-    for comp in result.result.components:
-        comp_type = type(comp.content).__name__.lower()
-        comp_dict = {
-            "id": comp.id,
-            "type": comp_type,
-            "data": _serialize_component(comp.content),
-            "size": comp.size,
-        }
-        components_data.append(ComponentData(**comp_dict))
+    return credits_charged, balance_remaining
 
-    sections_data = [
-        SectionData(title=s.title, component_ids=s.component_ids, layout=s.layout)
-        for s in result.result.layout.sections
-    ]
 
-    layout_data = LayoutData(
-        title=result.result.layout.title,
-        subtitle=result.result.layout.subtitle,
-        sections=sections_data,
-    )
+def _build_response(
+    result: ExecuteQueryResult, credits_charged: int, balance_remaining: int | None
+) -> QueryResponse:
+    # Convert domain objects to response format
+    components_data = [_component_data(comp) for comp in result.result.components]
 
     cost_data = CostBreakdownData(
         embedding_tokens=result.cost.embedding_tokens,
@@ -214,6 +341,7 @@ async def query(
         llm_output_tokens=result.cost.llm_output_tokens,
         total_cents=result.cost.total_cents,
         total_credits=result.cost.total_credits,
+        llm_input_tokens_saved=result.cost.llm_input_tokens_saved,
     )
 
     metadata_data = QueryMetadataData(
@@ -223,28 +351,86 @@ async def query(
         model=result.result.metadata.model,
     )
 
-    sources_data = [
+    return QueryResponse(
+        layout=_layout_data(result.result.layout),
+        components=components_data,
+        cost=cost_data,
+        cached=result.result.cached,
+        metadata=metadata_data,
+        sources=_sources_data(result.result.sources),
+        credits_charged=credits_charged,
+        balance_remaining=balance_remaining,
+        verification=(
+            _verification_data(result.result.verification)
+            if result.result.verification
+            else None
+        ),
+    )
+
+
+def _component_data(comp: Component) -> ComponentData:
+    return ComponentData(
+        id=comp.id,
+        type=type(comp.content).__name__.lower(),
+        data=_serialize_component(comp.content),
+        size=comp.size,
+    )
+
+
+def _layout_data(layout: Layout) -> LayoutData:
+    sections_data = [
+        SectionData(title=s.title, component_ids=s.component_ids, layout=s.layout)
+        for s in layout.sections
+    ]
+    return LayoutData(
+        title=layout.title,
+        subtitle=layout.subtitle,
+        sections=sections_data,
+    )
+
+
+def _sources_data(sources: list[SourceReference]) -> list[SourceReferenceData]:
+    return [
         SourceReferenceData(
             document_id=s.document_id,
             source_name=s.source_name,
             source_url=s.source_url,
             source_date=s.source_date,
         )
-        for s in result.result.sources
+        for s in sources
     ]
 
-    return QueryResponse(
-        layout=layout_data,
-        components=components_data,
-        cost=cost_data,
-        cached=result.result.cached,
-        metadata=metadata_data,
-        sources=sources_data,
-        credits_charged=credits_charged,
-        balance_remaining=balance_remaining,
+
+def _verification_data(outcome: VerificationOutcome) -> VerificationData:
+    return VerificationData(
+        id=outcome.id,
+        status=outcome.status.value,
+        notices=[_component_data(notice) for notice in outcome.notices],
     )
 
 
+def _serialize_event(event: QueryEvent) -> dict | list:
+    if event.type == QueryEventType.PLAN:
+        intent = event.data
+        return {
+            "query_type": intent.query_type.value,
+            "response_depth": intent.response_depth.value,
+            "expected_components": intent.expected_components,
+            "retrieval_strategy": intent.retrieval_strategy.value,
+        }
+    if event.type == QueryEventType.SOURCES:
+        return [s.model_dump() for s in _sources_data(event.data)]
+    if event.type == QueryEventType.LAYOUT:
+        return _layout_data(event.data).model_dump()
+    if event.type == QueryEventType.VERIFICATION:
+        return _verification_data(event.data).model_dump()
+    return _component_data(event.data).model_dump()
+
+
+def _ndjson(event: str, data) -> str:
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
 def _serialize_component(content) -> dict:
     if is_dataclass(content):
         result = {}
@@ -49,6 +49,26 @@ class DataExtractor(Protocol):
         """
         ...
 
+    async def extract_many(
+        self,
+        component_types: list[str],
+        context: list[str],
+        intent: IntentResult,
+    ) -> tuple[list[ExtractionResult], dict[str, Any]]:
+        """
+        Extract structured data for several component types from the same context.
+
+        Args:
+            component_types: The types of component to extract data for.
+            context: List of text chunks from retrieval.
+            intent: The classified intent from the planner.
+
+        Returns:
+            Tuple of (one ExtractionResult per component type, in order, and the
+            combined token_usage dict).
+        """
+        ...
+
 
 class ResponseComposer(Protocol):
     """Composes extracted data into a structured response with layout."""
@@ -6,10 +6,20 @@ from .entities import (
     Job,
     JobStatus,
     JobType,
+    RegisteredDocument,
     ScrapedDocument,
     SourceConfig,
+    SparseVector,
+)
+from .ports import (
+    BlobStore,
+    ChunkStore,
+    CorpusVersions,
+    DocumentRegistry,
+    Embedder,
+    SparseEncoder,
+    VectorStore,
 )
-from .ports import BlobStore, ChunkStore, Embedder, VectorStore
 
 __all__ = [
     "Chunk",
@@ -19,10 +29,15 @@ __all__ = [
     "Job",
     "JobStatus",
     "JobType",
+    "RegisteredDocument",
     "ScrapedDocument",
     "SourceConfig",
+    "SparseVector",
     "BlobStore",
     "ChunkStore",
+    "CorpusVersions",
+    "DocumentRegistry",
     "Embedder",
+    "SparseEncoder",
     "VectorStore",
 ]
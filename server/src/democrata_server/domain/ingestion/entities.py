@@ -1,13 +1,21 @@
+import hashlib
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
 from uuid import UUID, uuid4
 
+MAX_RECORDED_FAILURES = 50
+
 
 def utc_now() -> datetime:
     return datetime.now(UTC)
 
 
+def content_hash(content: str | bytes) -> str:
+    """SHA-256 of document content, as recorded in the document registry."""
+    return hashlib.sha256(content if isinstance(content, bytes) else content.encode()).hexdigest()
+
+
 class DocumentType(str, Enum):
     BILL = "bill"
     HANSARD = "hansard"
@@ -32,6 +40,11 @@ class ScrapedDocument:
     metadata: "DocumentMetadata"
     content_type: str = "text/plain"
     filename: str = "document"
+    # HTTP validators for conditional re-fetching, recorded once ingested
+    etag: str | None = None
+    last_modified: str | None = None
+    # Unchanged since it was last ingested (HTTP 304), so there is no content to ingest
+    not_modified: bool = False
 
 
 @dataclass
@@ -71,6 +84,27 @@ class Document:
         return cls(id=uuid4(), metadata=metadata, content=content)
 
 
+@dataclass
+class RegisteredDocument:
+    """The current ingested version of the document at a source URL."""
+
+    source_url: str
+    document_id: UUID
+    content_hash: str
+    chunk_count: int = 0
+    etag: str | None = None
+    last_modified: str | None = None
+    updated_at: datetime = field(default_factory=utc_now)
+
+
+@dataclass
+class SparseVector:
+    """Sparse term-weight vector (e.g. BM25) for keyword matching."""
+
+    indices: list[int]
+    values: list[float]
+
+
 @dataclass
 class Chunk:
     id: UUID
@@ -78,7 +112,9 @@ class Chunk:
     text: str
     position: int  # Order within document
     embedding: list[float] | None = None
+    sparse_embedding: SparseVector | None = None
     metadata: dict[str, str] = field(default_factory=dict)
+    score: float | None = None  # Similarity score when returned from a search
 
     @classmethod
     def create(cls, document_id: UUID, text: str, position: int) -> "Chunk":
@@ -97,6 +133,9 @@ class Job:
     progress_percent: int = 0
     documents_processed: int = 0
     chunks_created: int = 0
+    documents_skipped: int = 0  # Unchanged since they were last ingested
+    documents_failed: int = 0
+    failures: list[str] = field(default_factory=list)  # "source: error", first few only
     error_message: str | None = None
     created_at: datetime = field(default_factory=utc_now)
     completed_at: datetime | None = None
@@ -117,6 +156,12 @@ class Job:
         self.progress_percent = 100
         self.completed_at = utc_now()
 
+    def record_failure(self, source: str, error: str) -> None:
+        """Record a document that failed to ingest without failing the whole job."""
+        self.documents_failed += 1
+        if len(self.failures) < MAX_RECORDED_FAILURES:
+            self.failures.append(f"{source}: {error}")
+
     def fail(self, error: str) -> None:
         self.status = JobStatus.FAILED
         self.error_message = error
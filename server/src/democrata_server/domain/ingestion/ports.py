@@ -1,8 +1,16 @@
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from typing import Protocol
 from uuid import UUID
 
-from .entities import Chunk, DocumentMetadata, Job, ScrapedDocument, SourceConfig
+from .entities import (
+    Chunk,
+    DocumentMetadata,
+    Job,
+    RegisteredDocument,
+    ScrapedDocument,
+    SourceConfig,
+    SparseVector,
+)
 
 
 class BlobStore(Protocol):
@@ -29,15 +37,67 @@ class Embedder(Protocol):
         ...
 
 
+class SparseEncoder(Protocol):
+    """Encodes text into sparse keyword vectors for hybrid retrieval."""
+
+    def encode_documents(self, texts: list[str]) -> list[SparseVector]:
+        """Encode chunk texts for indexing."""
+        ...
+
+    def encode_query(self, text: str) -> SparseVector:
+        """Encode a query for sparse search."""
+        ...
+
+
+class CorpusVersions(Protocol):
+    """Counters that change whenever indexed content changes, globally and per scope."""
+
+    async def bump(self, document_type: str | None = None, source_name: str | None = None) -> int:
+        """Record a corpus change and return the new global version.
+
+        The counters of the given document type and source are bumped too.
+        """
+        ...
+
+    async def current(self) -> int:
+        """Return the current global corpus version."""
+        ...
+
+    async def snapshot(
+        self,
+        document_types: list[str] | None = None,
+        source_names: list[str] | None = None,
+    ) -> dict[str, int]:
+        """Return the counters for the given document types and sources.
+
+        With neither, returns the global counter alone.
+        """
+        ...
+
+
 class VectorStore(Protocol):
     async def upsert(self, chunks: list[Chunk]) -> None:
         """Insert or update chunks with their embeddings."""
         ...
 
     async def search(
-        self, vector: list[float], k: int = 10, filters: dict | None = None
+        self,
+        vector: list[float],
+        k: int = 10,
+        filters: dict | None = None,
+        sparse_vector: SparseVector | None = None,
     ) -> list[Chunk]:
-        """Find top-k similar chunks."""
+        """Find top-k similar chunks, fused with sparse results when a sparse vector is given."""
+        ...
+
+    async def search_batch(
+        self,
+        vectors: list[list[float]],
+        k: int = 10,
+        filters: dict | None = None,
+        sparse_vectors: list[SparseVector] | None = None,
+    ) -> list[list[Chunk]]:
+        """Find top-k similar chunks for each vector in a single round-trip."""
         ...
 
     async def delete_by_document(self, document_id: UUID) -> None:
@@ -55,6 +115,18 @@ class ChunkStore(Protocol):
     async def get_by_document(self, document_id: UUID) -> list[Chunk]: ...
 
 
+class DocumentRegistry(Protocol):
+    """Tracks which document currently holds the content of each source URL."""
+
+    async def get(self, source_url: str) -> RegisteredDocument | None:
+        """Get the registered document for a source URL."""
+        ...
+
+    async def register(self, entry: RegisteredDocument) -> None:
+        """Record the document now holding a source URL's content, replacing any previous one."""
+        ...
+
+
 class JobStore(Protocol):
     async def save(self, job: Job) -> None: ...
 
@@ -72,3 +144,18 @@ class TextExtractor(Protocol):
     def extract(self, content: bytes, content_type: str, filename: str) -> str:
         """Extract text from binary content based on content type."""
         ...
+
+    def extract_stream(
+        self,
+        content: bytes,
+        content_type: str,
+        filename: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield text in document order as it is extracted, without blocking the event loop.
+
+        Extractors that know how far through the document they are (e.g. PDF
+        pages) call `on_progress(done, total)` before yielding each part.
+        """
+        ...
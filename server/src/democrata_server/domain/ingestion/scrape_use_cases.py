@@ -1,21 +1,36 @@
+import asyncio
+import logging
 from typing import Any
 from uuid import UUID
 
-from democrata_server.domain.ingestion.entities import Job, SourceConfig
+from democrata_server.domain.ingestion.entities import Job, ScrapedDocument, SourceConfig
 from democrata_server.domain.ingestion.ports import JobStore
 from democrata_server.domain.ingestion.use_cases import IngestDocument
 
+logger = logging.getLogger(__name__)
+
 
 class ExecuteScrapeRun:
-    """Orchestrate a scrape run: fetch documents from source, ingest each via IngestDocument."""
+    """
+    Orchestrate a scrape run: fetch documents from source, ingest each via IngestDocument.
+
+    Up to `max_concurrent_documents` documents are ingested at once while the
+    fetcher continues; when every slot is busy, fetching waits. A document
+    that fails to ingest is recorded on the job and the run carries on. The
+    run only fails if fetching fails or no document could be ingested.
+    Documents the fetcher reports as not modified are counted as skipped
+    without being ingested.
+    """
 
     def __init__(
         self,
         ingest_use_case: IngestDocument,
         job_store: JobStore,
+        max_concurrent_documents: int = 4,
     ):
         self._ingest = ingest_use_case
         self._job_store = job_store
+        self._max_concurrent_documents = max_concurrent_documents
 
     async def execute(
         self,
@@ -31,22 +46,49 @@ class ExecuteScrapeRun:
         job.start()
         await self._job_store.save(job)
 
-        total_docs = 0
-        total_chunks = 0
+        slots = asyncio.Semaphore(self._max_concurrent_documents)
+        in_flight: set[asyncio.Task] = set()
 
-        try:
-            async for scraped in fetcher.fetch(config):
+        async def ingest(scraped: ScrapedDocument) -> None:
+            try:
                 await self._ingest.execute(
                     content=scraped.content,
                     filename=scraped.filename,
                     content_type=scraped.content_type,
                     metadata=scraped.metadata,
                     existing_job=job,
+                    etag=scraped.etag,
+                    last_modified=scraped.last_modified,
                 )
-                total_docs = job.documents_processed
-                total_chunks = job.chunks_created
+            except Exception as e:
+                source = scraped.metadata.source_url or scraped.filename
+                logger.warning(f"Failed to ingest {source}: {e}")
+                # Counters are only changed between awaits, so concurrent updates don't race
+                job.record_failure(source, str(e))
+                await self._job_store.save(job)
+            finally:
+                slots.release()
+
+        try:
+            try:
+                async for scraped in fetcher.fetch(config):
+                    if scraped.not_modified:
+                        job.documents_skipped += 1
+                        await self._job_store.save(job)
+                        continue
+                    await slots.acquire()
+                    task = asyncio.create_task(ingest(scraped))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+            finally:
+                # Let documents already fetched finish, even if fetching failed
+                await asyncio.gather(*in_flight)
+
+            ingested = job.documents_processed + job.documents_skipped
+            if job.documents_failed and not ingested:
+                raise RuntimeError(f"All {job.documents_failed} documents failed to ingest")
 
-            job.complete(documents=total_docs, chunks=total_chunks)
+            job.complete(documents=job.documents_processed, chunks=job.chunks_created)
             await self._job_store.save(job)
         except Exception as e:
             job.fail(str(e))
@@ -1,18 +1,54 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from uuid import UUID
 
-from .entities import Chunk, Document, DocumentMetadata, Job
-from .ports import BlobStore, Embedder, JobStore, TextExtractor, VectorStore
+from .entities import Chunk, Document, DocumentMetadata, Job, RegisteredDocument, content_hash
+from .ports import (
+    BlobStore,
+    CorpusVersions,
+    DocumentRegistry,
+    Embedder,
+    JobStore,
+    SparseEncoder,
+    TextExtractor,
+    VectorStore,
+)
+
+logger = logging.getLogger(__name__)
+
+_END = object()  # Marks the end of a pipeline stage's output
 
 
 @dataclass
 class IngestDocumentResult:
     job: Job
     document: Document
-    chunks: list[Chunk]
+    chunks_created: int
+    skipped: bool = False  # Content unchanged since the source URL was last ingested
 
 
 class IngestDocument:
+    """
+    Ingests a document through a staged pipeline: extract, chunk, embed, upsert.
+
+    Stages run concurrently and are connected by bounded queues, so chunks are
+    embedded and stored in batches of `batch_size` while later text is still
+    being extracted. A slow stage fills its input queue and pauses the stages
+    before it, back to the extractor, so memory is bounded by the queue sizes
+    rather than the document size.
+
+    A job created for the document has its progress updated as each batch is
+    stored. The total chunk count is estimated until chunking finishes: from
+    the share of pages extracted where the extractor reports it, otherwise
+    from the content length.
+
+    With a document registry, documents with a source URL are ingested
+    incrementally: content identical to the registered version is skipped,
+    and changed content replaces the registered document's chunks.
+    """
+
     def __init__(
         self,
         blob_store: BlobStore,
@@ -22,6 +58,11 @@ class IngestDocument:
         text_extractor: TextExtractor,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
+        sparse_encoder: SparseEncoder | None = None,
+        corpus_versions: CorpusVersions | None = None,
+        batch_size: int = 64,
+        queue_size: int = 4,
+        document_registry: DocumentRegistry | None = None,
     ):
         self.blob_store = blob_store
         self.embedder = embedder
@@ -30,6 +71,11 @@ class IngestDocument:
         self.text_extractor = text_extractor
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.sparse_encoder = sparse_encoder
+        self.corpus_versions = corpus_versions
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.document_registry = document_registry
 
     async def execute(
         self,
@@ -38,6 +84,8 @@ class IngestDocument:
         content_type: str,
         metadata: DocumentMetadata,
         existing_job: Job | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
     ) -> IngestDocumentResult:
         if existing_job is None:
             job = Job.create()
@@ -47,77 +95,262 @@ class IngestDocument:
             job = existing_job
 
         try:
-            blob_ref = None
-            text_content: str
-            if isinstance(content, bytes):
-                blob_ref = f"documents/{job.id}/{filename}"
-                await self.blob_store.put(blob_ref, content, content_type)
-                text_content = self.text_extractor.extract(content, content_type, filename)
-            else:
-                text_content = content
+            digest = content_hash(content)
+            registered = await self._registered(metadata.source_url)
+            if registered is not None and registered.content_hash == digest:
+                logger.info(f"Skipping unchanged document {metadata.source_url}")
+                if (etag, last_modified) != (registered.etag, registered.last_modified):
+                    # Same content under new validators; keep them for the next fetch
+                    registered.etag, registered.last_modified = etag, last_modified
+                    await self._register(registered)
+                if existing_job is None:
+                    job.complete(documents=0, chunks=0)
+                job.documents_skipped += 1
+                await self.job_store.save(job)
+                return IngestDocumentResult(
+                    job=job,
+                    document=Document(id=registered.document_id, metadata=metadata),
+                    chunks_created=0,
+                    skipped=True,
+                )
 
-            # Create document
-            document = Document.create(metadata=metadata, content=text_content)
-            document.blob_ref = blob_ref
+            # Extracted text is streamed through the pipeline rather than kept;
+            # the original bytes stay available from the blob store
+            document = Document.create(
+                metadata=metadata, content=content if isinstance(content, str) else None
+            )
+            if isinstance(content, bytes):
+                document.blob_ref = f"documents/{job.id}/{filename}"
+                await self.blob_store.put(document.blob_ref, content, content_type)
 
-            # Chunk the content with document metadata for source tracking
-            chunks = self._chunk_text(document.id, text_content, metadata)
+            chunks_created = await self._run_pipeline(
+                document,
+                content,
+                filename,
+                content_type,
+                job,
+                track_progress=existing_job is None,
+            )
 
-            # Embed chunks
-            if chunks:
-                texts = [c.text for c in chunks]
-                embeddings = await self.embedder.embed(texts)
-                for chunk, embedding in zip(chunks, embeddings):
-                    chunk.embedding = embedding
+            # The new version is searchable, so the previous one can go
+            if registered is not None:
+                await self.vector_store.delete_by_document(registered.document_id)
+            await self._register(
+                RegisteredDocument(
+                    source_url=metadata.source_url or "",
+                    document_id=document.id,
+                    content_hash=digest,
+                    chunk_count=chunks_created,
+                    etag=etag,
+                    last_modified=last_modified,
+                )
+            )
 
-                # Store in vector store
-                await self.vector_store.upsert(chunks)
+            # Let query caches know their results may be out of date
+            if chunks_created or registered is not None:
+                await self._bump_corpus(metadata)
 
             if existing_job is None:
-                job.complete(documents=1, chunks=len(chunks))
-                await self.job_store.save(job)
+                job.complete(documents=1, chunks=chunks_created)
             else:
                 job.documents_processed += 1
-                job.chunks_created += len(chunks)
-                await self.job_store.save(job)
+            await self.job_store.save(job)
 
-            return IngestDocumentResult(job=job, document=document, chunks=chunks)
+            return IngestDocumentResult(job=job, document=document, chunks_created=chunks_created)
 
         except Exception as e:
-            job.fail(str(e))
-            await self.job_store.save(job)
+            # A shared job belongs to the caller, which decides whether one document fails it
+            if existing_job is None:
+                job.fail(str(e))
+                await self.job_store.save(job)
             raise
 
-    def _chunk_text(
-        self, document_id: UUID, text: str, metadata: DocumentMetadata
-    ) -> list[Chunk]:
-        chunks: list[Chunk] = []
-        start = 0
-        position = 0
+    async def _registered(self, source_url: str | None) -> RegisteredDocument | None:
+        if self.document_registry is None or not source_url:
+            return None
+        try:
+            return await self.document_registry.get(source_url)
+        except Exception as e:
+            logger.warning(f"Document registry lookup failed for {source_url}: {e}")
+            return None
+
+    async def _register(self, entry: RegisteredDocument) -> None:
+        if self.document_registry is None or not entry.source_url:
+            return
+        try:
+            await self.document_registry.register(entry)
+        except Exception as e:
+            logger.warning(f"Document registry update failed for {entry.source_url}: {e}")
+
+    async def _bump_corpus(self, metadata: DocumentMetadata) -> None:
+        """Invalidate cached query results in the document's scope. Best-effort."""
+        if self.corpus_versions is None:
+            return
+        try:
+            await self.corpus_versions.bump(
+                document_type=metadata.document_type.value,
+                source_name=metadata.title or metadata.source,
+            )
+            # Source filters may name the source by id as well as by title
+            if metadata.title and metadata.title != metadata.source:
+                await self.corpus_versions.bump(source_name=metadata.source)
+        except Exception as e:
+            logger.warning(f"Corpus version bump failed for {metadata.source}: {e}")
 
+    async def _discard(self, document: Document) -> None:
+        """Remove the chunks a failed ingestion had already stored."""
+        try:
+            await self.vector_store.delete_by_document(document.id)
+        except Exception as e:
+            logger.warning(f"Could not remove partial chunks of document {document.id}: {e}")
+
+    async def _run_pipeline(
+        self,
+        document: Document,
+        content: bytes | str,
+        filename: str,
+        content_type: str,
+        job: Job,
+        track_progress: bool,
+    ) -> int:
+        """Run the pipeline stages concurrently and return the number of chunks stored."""
+        texts: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # Counters for estimating the total chunk count while it is still unknown
+        progress = {"produced": 0, "stored": 0, "extracted": 0.0, "chunked": False}
+
+        def on_extract_progress(done: int, total: int) -> None:
+            progress["extracted"] = done / total if total else 1.0
+
+        def expected_chunks() -> int:
+            if progress["chunked"]:
+                return progress["produced"]
+            if progress["extracted"]:
+                # Extrapolate from the share of the document (e.g. PDF pages) extracted
+                return max(1, int(progress["produced"] / progress["extracted"]))
+            # Text the extractor reports no progress for is about as long as its bytes
+            step = max(1, self.chunk_size - self.chunk_overlap)
+            return max(1, len(content) // step, progress["produced"])
+
+        async def extract() -> None:
+            if isinstance(content, str):
+                await texts.put(content)
+            else:
+                async for part in self.text_extractor.extract_stream(
+                    content, content_type, filename, on_extract_progress
+                ):
+                    await texts.put(part)
+            await texts.put(_END)
+
+        async def chunk() -> None:
+            batch: list[Chunk] = []
+            async for c in self._chunk_stream(document.id, _drain(texts), document.metadata):
+                batch.append(c)
+                progress["produced"] += 1
+                if len(batch) >= self.batch_size:
+                    await batches.put(batch)
+                    batch = []
+            progress["chunked"] = True
+            if batch:
+                await batches.put(batch)
+            await batches.put(_END)
+
+        async def embed() -> None:
+            async for batch in _drain(batches):
+                batch_texts = [c.text for c in batch]
+                embeddings = await self.embedder.embed(batch_texts)
+                for c, embedding in zip(batch, embeddings):
+                    c.embedding = embedding
+
+                # Keyword vectors for hybrid search
+                if self.sparse_encoder:
+                    sparse_vectors = self.sparse_encoder.encode_documents(batch_texts)
+                    for c, sparse_vector in zip(batch, sparse_vectors):
+                        c.sparse_embedding = sparse_vector
+                await embedded.put(batch)
+            await embedded.put(_END)
+
+        async def upsert() -> None:
+            async for batch in _drain(embedded):
+                await self.vector_store.upsert(batch)
+                progress["stored"] += len(batch)
+                job.chunks_created += len(batch)
+                if track_progress:
+                    # Estimates may shrink as more is known; progress never goes back
+                    estimate = min(99, progress["stored"] * 100 // max(1, expected_chunks()))
+                    job.progress_percent = max(job.progress_percent, estimate)
+                await self.job_store.save(job)
+
+        try:
+            async with asyncio.TaskGroup() as stages:
+                for stage in (extract, chunk, embed, upsert):
+                    stages.create_task(stage())
+        except ExceptionGroup as e:
+            # Don't leave a partial document searchable
+            job.chunks_created -= progress["stored"]
+            await self._discard(document)
+            # Surface the failing stage's own error rather than the group
+            raise e.exceptions[0] from e
+        return progress["stored"]
+
+    async def _chunk_stream(
+        self, document_id: UUID, parts: AsyncIterator[str], metadata: DocumentMetadata
+    ) -> AsyncIterator[Chunk]:
+        """
+        Split streamed text parts, joined by blank lines, into overlapping chunks.
+
+        Produces the same chunks as splitting the whole joined text, while only
+        holding the text that has not yet been emitted as a chunk.
+        """
         chunk_metadata = {
+            "source": metadata.source,
             "source_name": metadata.title or metadata.source,
             "source_url": metadata.source_url or "",
             "source_date": metadata.date or "",
             "document_type": metadata.document_type.value,
             "date": metadata.date or "",
         }
+        position = 0
 
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk_text = text[start:end]
+        def make_chunk(chunk_text: str) -> Chunk | None:
+            nonlocal position
+            if not chunk_text.strip():
+                return None
+            chunk = Chunk.create(document_id, chunk_text, position)
+            chunk.metadata = chunk_metadata.copy()
+            position += 1
+            return chunk
+
+        buffer = ""
+        started = False
+        async for part in parts:
+            buffer = buffer + "\n\n" + part if started else part
+            started = True
+            # A chunk ending before the buffer's end is complete and not the last one
+            start = 0
+            while start + self.chunk_size < len(buffer):
+                end = start + self.chunk_size
+                if (chunk := make_chunk(buffer[start:end])) is not None:
+                    yield chunk
+                start = end - self.chunk_overlap
+            buffer = buffer[start:]
 
-            if chunk_text.strip():
-                chunk = Chunk.create(document_id, chunk_text, position)
-                chunk.metadata = chunk_metadata.copy()
-                chunks.append(chunk)
-                position += 1
+        start = 0
+        while start < len(buffer):
+            end = start + self.chunk_size
+            if (chunk := make_chunk(buffer[start:end])) is not None:
+                yield chunk
 
             start = end - self.chunk_overlap
-            if start >= len(text) - self.chunk_overlap:
+            if start >= len(buffer) - self.chunk_overlap:
                 break
 
-        return chunks
+
+async def _drain(queue: asyncio.Queue) -> AsyncIterator:
+    """Iterate over a pipeline queue until its producer marks the end."""
+    while (item := await queue.get()) is not _END:
+        yield item
 
 
 class GetJobStatus:
@@ -3,18 +3,24 @@ from .entities import (
     ChartType,
     Comparison,
     Component,
+    CompressedContext,
     DataTable,
+    Flight,
     Layout,
     MemberProfiles,
     Notice,
     NoticeLevel,
     Query,
+    QueryEvent,
+    QueryEventType,
     QueryFilters,
     RAGResult,
     Section,
     TextBlock,
     TextFormat,
     Timeline,
+    VerificationOutcome,
+    VerificationStatus,
     VotingBreakdown,
 )
 from .ports import Cache
@@ -23,19 +29,25 @@ __all__ = [
     "Chart",
     "ChartType",
     "Comparison",
+    "CompressedContext",
     "Component",
     "DataTable",
+    "Flight",
     "Layout",
     "MemberProfiles",
     "Notice",
     "NoticeLevel",
     "Query",
+    "QueryEvent",
+    "QueryEventType",
     "QueryFilters",
     "RAGResult",
     "Section",
     "TextBlock",
     "TextFormat",
     "Timeline",
+    "VerificationOutcome",
+    "VerificationStatus",
     "VotingBreakdown",
     "Cache",
 ]
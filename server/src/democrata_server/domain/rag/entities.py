@@ -1,5 +1,6 @@
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Any
 from uuid import uuid4
 
@@ -24,6 +25,23 @@ class NoticeLevel(str, Enum):
     IMPORTANT = "important"
 
 
+class QueryEventType(StrEnum):
+    PLAN = "plan"
+    SOURCES = "sources"
+    LAYOUT = "layout"
+    COMPONENT = "component"
+    NOTICE = "notice"
+    RESULT = "result"
+    VERIFICATION = "verification"
+
+
+class VerificationStatus(StrEnum):
+    PENDING = "pending"
+    PASSED = "passed"
+    FLAGGED = "flagged"
+    FAILED = "failed"
+
+
 # --- Component Types ---
 
 
@@ -237,6 +255,15 @@ class QueryMetadata:
     model: str
 
 
+@dataclass
+class VerificationOutcome:
+    """State of a background verification, pollable by id."""
+
+    id: str
+    status: VerificationStatus = VerificationStatus.PENDING
+    notices: list[Component] = field(default_factory=list)
+
+
 @dataclass
 class RAGResult:
     layout: Layout
@@ -245,6 +272,50 @@ class RAGResult:
     sources: list[SourceReference] = field(default_factory=list)
     cached: bool = False
     cost: Any = None  # CostBreakdown from usage domain
+    verification: VerificationOutcome | None = None  # Set when verification runs in the background
+    corpus_versions: dict[str, int] = field(default_factory=dict)  # Counters it was built against
+    computed_at: float = 0.0  # Unix time the pipeline run started
+
+
+@dataclass
+class CompressedContext:
+    """Context texts after compression, with token counts before and after."""
+
+    texts: list[str]
+    original_tokens: int = 0
+    compressed_tokens: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.compressed_tokens)
+
+
+@dataclass
+class QueryEvent:
+    """A pipeline stage output, emitted as soon as the stage finishes."""
+
+    type: QueryEventType
+    data: Any = None
+
+
+@dataclass
+class Flight:
+    """
+    A request's role in a coalesced query.
+
+    The leader runs the pipeline and publishes its result; a follower is
+    handed that result instead of running the pipeline itself.
+    """
+
+    leader: bool
+    result: Any = None  # RAGResult
+    # Called on publish, so followers need not wait for the leader to exit the flight
+    on_publish: Callable[[Any], None] | None = field(default=None, repr=False, compare=False)
+
+    def publish(self, result: Any) -> None:
+        self.result = result
+        if self.on_publish is not None:
+            self.on_publish(result)
 
 
 @dataclass
@@ -1,6 +1,16 @@
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
 from typing import Any, Protocol
 
-from .entities import Component, Layout, Query, RetrievalResult
+from .entities import (
+    Component,
+    CompressedContext,
+    Flight,
+    Layout,
+    Query,
+    QueryFilters,
+    RetrievalResult,
+)
 
 
 class ContextRetriever(Protocol):
@@ -10,6 +20,7 @@ class ContextRetriever(Protocol):
         self,
         query: str,
         intent: Any,  # IntentResult from agents domain
+        filters: QueryFilters | None = None,
     ) -> RetrievalResult:
         """
         Retrieve context chunks based on query and classified intent.
@@ -17,6 +28,7 @@ class ContextRetriever(Protocol):
         Args:
             query: The user's natural language query.
             intent: The classified intent with entities and retrieval strategy.
+            filters: Explicit request filters; these take precedence over intent entities.
 
         Returns:
             RetrievalResult with chunks and coverage metrics.
@@ -24,6 +36,32 @@ class ContextRetriever(Protocol):
         ...
 
 
+class ContextCompressor(Protocol):
+    """Shrinks retrieved context before it is sent to the extractor and verifier."""
+
+    def compress(
+        self,
+        query: str,
+        intent: Any,  # IntentResult from agents domain
+        chunks: list[Any],  # list[Chunk] from ingestion domain
+        component_type: str | None = None,
+    ) -> CompressedContext:
+        """
+        Compress chunks into context texts for one consumer.
+
+        Args:
+            query: The user's query, used to judge relevance.
+            intent: The classified intent.
+            chunks: Retrieved chunks, most relevant first.
+            component_type: The component being extracted, which sets the
+                token budget, or None for the verifier.
+
+        Returns:
+            CompressedContext with the texts and token counts before and after.
+        """
+        ...
+
+
 class Cache(Protocol):
     async def get(self, key: str) -> Any | None:
         """Get cached value by key."""
@@ -40,3 +78,36 @@ class Cache(Protocol):
     def query_key(self, query: Query) -> str:
         """Generate a cache key for a query."""
         ...
+
+
+class SemanticCache(Protocol):
+    """Finds cached results for queries that are worded differently but mean the same."""
+
+    async def lookup(self, embedding: list[float], scope: str) -> str | None:
+        """Return the exact cache key of the most similar cached query in scope, if any."""
+        ...
+
+    async def store(self, embedding: list[float], scope: str, cache_key: str) -> None:
+        """Index a query embedding against the cache key of its result."""
+        ...
+
+
+class QueryCoalescer(Protocol):
+    """Deduplicates identical queries that are running at the same time."""
+
+    def flight(
+        self, key: str, load_result: Callable[[], Awaitable[Any | None]]
+    ) -> AbstractAsyncContextManager[Flight]:
+        """
+        Join the flight for `key`, leading it if no identical query is running.
+
+        Args:
+            key: The query cache key.
+            load_result: Reads the cached result, for followers of a leader
+                running in another process.
+
+        Returns:
+            Context manager yielding a Flight. Leadership is held until the
+            leader publishes its result or exits.
+        """
+        ...
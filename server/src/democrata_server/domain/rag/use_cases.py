@@ -1,8 +1,12 @@
+import hashlib
 import logging
 import time
 import asyncio
-from collections.abc import Callable
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from functools import partial
+from uuid import uuid4
 
 from democrata_server.domain.agents.entities import IntentResult, RetrievalStrategy
 from democrata_server.domain.agents.ports import (
@@ -11,26 +15,39 @@ from democrata_server.domain.agents.ports import (
     ResponseComposer,
     ResponseVerifier,
 )
-from democrata_server.domain.ingestion.ports import Embedder, VectorStore
+from democrata_server.domain.ingestion.ports import CorpusVersions, Embedder, VectorStore
 from democrata_server.domain.usage.entities import CostBreakdown
 
 from .entities import (
     Component,
+    CompressedContext,
     Layout,
     Notice,
     NoticeLevel,
     Query,
+    QueryEvent,
+    QueryEventType,
     QueryMetadata,
     RAGResult,
+    RetrievalResult,
     Section,
     SourceReference,
     TextBlock,
     TextFormat,
+    VerificationOutcome,
+    VerificationStatus,
 )
-from .ports import Cache, ContextRetriever
+from .ports import Cache, ContextCompressor, ContextRetriever, QueryCoalescer, SemanticCache
 
 logger = logging.getLogger(__name__)
 
+VERIFICATION_KEY_PREFIX = "verification:"
+
+# Strong references to detached verification and refresh tasks so they are not garbage collected
+_background_tasks: set[asyncio.Task] = set()
+# Cache keys with a refresh already running in this process
+_revalidating: set[str] = set()
+
 
 @dataclass
 class ExecuteQueryResult:
@@ -45,9 +62,32 @@ class ExecuteQuery:
     The pipeline consists of:
     1. Planner: Classifies query intent and extracts entities
     2. Retriever: Retrieves context using intent-driven strategies
-    3. Extractor: Extracts grounded data from context for each component
-    4. Composer: Formats extracted data into a structured response
-    5. Verifier (optional): Validates response claims against context
+    3. Compressor (optional): Trims context to what each component needs
+    4. Extractor: Extracts grounded data from context for each component
+    5. Composer: Formats extracted data into a structured response
+    6. Verifier (optional): Validates response claims against context
+
+    With `verify_in_background`, the result is returned as soon as it is
+    composed and verification runs as a detached task. Its outcome is stored
+    under the result's verification id, patched into the cached result, and
+    emitted as follow-up events on the stream.
+
+    With a `semantic_cache` and `embedder`, an exact-cache miss falls back to
+    the result of the most similar earlier query with the same filters.
+
+    With `fuse_extractions`, all expected components are extracted in one
+    LLM call over a shared context rather than one call each.
+
+    With a `coalescer`, concurrent identical queries share one pipeline run.
+    Followers receive the leader's result marked as cached, so they are not
+    charged for it.
+
+    With `corpus_versions`, each result records the corpus counters in scope
+    for its filters, and stops being fresh once ingestion bumps one of them.
+    Results also stop being fresh after `cache_ttl_seconds`. For a further
+    `stale_while_revalidate_seconds`, a stale result is still served at once
+    while a background run refreshes it. Without that window, a stale result
+    is a miss.
     """
 
     def __init__(
@@ -61,6 +101,14 @@ class ExecuteQuery:
         token_counter: Callable[[list[str]], int] | None = None,
         cache_ttl_seconds: int = 3600,
         cost_margin: float = 0.4,
+        verify_in_background: bool = False,
+        semantic_cache: SemanticCache | None = None,
+        embedder: Embedder | None = None,
+        coalescer: QueryCoalescer | None = None,
+        corpus_versions: CorpusVersions | None = None,
+        stale_while_revalidate_seconds: int = 0,
+        context_compressor: ContextCompressor | None = None,
+        fuse_extractions: bool = False,
     ):
         self.planner = planner
         self.retriever = retriever
@@ -71,25 +119,86 @@ class ExecuteQuery:
         self._token_counter = token_counter or (lambda texts: sum(max(1, len(t.split())) for t in texts))
         self.cache_ttl_seconds = cache_ttl_seconds
         self.cost_margin = cost_margin
+        self.verify_in_background = verify_in_background
+        self.semantic_cache = semantic_cache if embedder else None
+        self.embedder = embedder
+        self.coalescer = coalescer
+        self.corpus_versions = corpus_versions
+        self.stale_while_revalidate_seconds = stale_while_revalidate_seconds
+        self.context_compressor = context_compressor
+        self.fuse_extractions = fuse_extractions
 
     async def execute(self, query: Query) -> ExecuteQueryResult:
         """Execute the agent-based RAG pipeline."""
+        async with aclosing(self.stream(query)) as events:
+            async for event in events:
+                if event.type == QueryEventType.RESULT:
+                    return event.data
+        raise RuntimeError("Query pipeline ended without a result")
+
+    async def stream(self, query: Query) -> AsyncIterator[QueryEvent]:
+        """
+        Execute the pipeline, yielding each stage's output as soon as it is ready.
+
+        Yields the plan, the sources, the layout, each component and any
+        verification notice, then RESULT carrying the complete
+        ExecuteQueryResult. When verification runs in the background, RESULT
+        is followed by any verification notices and a VERIFICATION event.
+        """
         start_time = time.time()
         cache_key = self.cache.query_key(query)
 
         cached_result = await self.cache.get(cache_key)
+        if cached_result is not None and not await self._is_fresh(query, cached_result):
+            if self.stale_while_revalidate_seconds > 0:
+                logger.info(f"Serving stale result while refreshing: {query.text[:80]}")
+                self._schedule_revalidation(query, cache_key)
+            else:
+                cached_result = None
+        query_embedding = None
+        if cached_result is None and self.semantic_cache:
+            cached_result, query_embedding = await self._semantic_lookup(query, cache_key)
         if cached_result is not None:
-            cached_result.cached = True
-            return ExecuteQueryResult(
-                result=cached_result,
-                cost=CostBreakdown.zero(),
-            )
-
+            for event in self._cached_events(cached_result):
+                yield event
+            return
+
+        if self.coalescer is None:
+            async for event in self._run_pipeline(query, cache_key, query_embedding, start_time):
+                yield event
+            return
+
+        # Identical queries already running here or on another worker are
+        # awaited rather than recomputed
+        load_result = partial(self._load_fresh, query, cache_key)
+        async with self.coalescer.flight(cache_key, load_result) as flight:
+            if not flight.leader:
+                logger.info(f"Coalesced with in-flight query: {query.text[:80]}")
+                for event in self._cached_events(flight.result):
+                    yield event
+                return
+
+            async for event in self._run_pipeline(query, cache_key, query_embedding, start_time):
+                if event.type == QueryEventType.RESULT:
+                    flight.publish(event.data.result)
+                yield event
+
+    async def _run_pipeline(
+        self,
+        query: Query,
+        cache_key: str,
+        query_embedding: list[float] | None,
+        start_time: float,
+    ) -> AsyncIterator[QueryEvent]:
         total_input_tokens = 0
         total_output_tokens = 0
         model_used = "unknown"
+        verification_task: asyncio.Task | None = None
 
         try:
+            # Taken before retrieval, so content ingested mid-run marks the result stale
+            corpus_snapshot = await self._corpus_snapshot(query)
+
             # Step 1: Plan - Classify intent and extract entities
             intent, planner_usage = await self.planner.analyze(query.text)
             total_input_tokens += planner_usage.get("input_tokens", 0)
@@ -99,9 +208,10 @@ class ExecuteQuery:
                 f"Intent: {intent.query_type}, depth: {intent.response_depth.value}, "
                 f"components: {intent.expected_components}"
             )
+            yield QueryEvent(QueryEventType.PLAN, intent)
 
             # Step 2: Retrieve - Get context using intent-driven strategy
-            retrieval = await self.retriever.retrieve(query.text, intent)
+            retrieval = await self.retriever.retrieve(query.text, intent, query.filters)
 
             # Step 3: Check sufficiency
             if not retrieval.is_sufficient:
@@ -113,33 +223,69 @@ class ExecuteQuery:
                     processing_time_ms=processing_time_ms,
                     model=model_used,
                 )
-                return ExecuteQueryResult(
-                    result=result,
-                    cost=CostBreakdown.zero(),
+                for event in self._result_events(result):
+                    yield event
+                yield QueryEvent(
+                    QueryEventType.RESULT,
+                    ExecuteQueryResult(result=result, cost=CostBreakdown.zero()),
                 )
+                return
+
+            # Aggregate sources from retrieved chunks
+            sources = self._aggregate_sources(retrieval.chunks)
+            yield QueryEvent(QueryEventType.SOURCES, sources)
 
-            # Step 4: Extract - Grounded extraction for each component type
+            # Step 4: Compress - Cut each consumer's context down to its token budget
             context_texts = retrieval.context_texts
-            extraction_tasks = [
-                self.extractor.extract(
-                    component_type,
-                    context_texts,
-                    intent,
+            component_contexts = {
+                ct: self._compress(query, intent, retrieval, ct)
+                for ct in intent.expected_components
+            }
+            tokens_saved = 0
+            if self.verifier:
+                verifier_context = self._compress(query, intent, retrieval, None)
+                context_texts = verifier_context.texts
+                tokens_saved += verifier_context.tokens_saved
+
+            # Step 5: Extract - Grounded extraction for each component type
+            fuse = self.fuse_extractions and len(component_contexts) > 1
+            if fuse:
+                # One call sees one context, so give it the largest component's
+                shared_context = max(
+                    component_contexts.values(), key=lambda c: c.compressed_tokens
+                )
+                tokens_saved += shared_context.tokens_saved
+                extractions, extract_usage = await self.extractor.extract_many(
+                    intent.expected_components, shared_context.texts, intent
+                )
+                extract_usages = [extract_usage]
+            else:
+                extraction_results = await asyncio.gather(
+                    *(
+                        self.extractor.extract(
+                            component_type,
+                            component_contexts[component_type].texts,
+                            intent,
+                        )
+                        for component_type in intent.expected_components
+                    )
+                )
+                tokens_saved += sum(
+                    component_contexts[ct].tokens_saved for ct in intent.expected_components
                 )
-                for component_type in intent.expected_components
-            ]
-            extraction_results = await asyncio.gather(*extraction_tasks)
-            extractions = []
-            for extraction, extract_usage in extraction_results:
-                extractions.append(extraction)
+                extractions = [extraction for extraction, _ in extraction_results]
+                extract_usages = [usage for _, usage in extraction_results]
+
+            for extract_usage in extract_usages:
                 total_input_tokens += extract_usage.get("input_tokens", 0)
                 total_output_tokens += extract_usage.get("output_tokens", 0)
                 model_used = extract_usage.get("model", model_used)
+            for extraction in extractions:
                 logger.debug(
                     f"Extracted {extraction.component_type}: completeness={extraction.completeness}"
                 )
 
-            # Step 5: Compose - Format extracted data into response
+            # Step 6: Compose - Format extracted data into response
             layout, components, composer_usage = await self.composer.compose(
                 query.text,
                 intent,
@@ -149,8 +295,15 @@ class ExecuteQuery:
             total_output_tokens += composer_usage.get("output_tokens", 0)
             model_used = composer_usage.get("model", model_used)
 
-            # Step 6: Verify (optional) - Check claims against context
-            if self.verifier and context_texts:
+            yield QueryEvent(QueryEventType.LAYOUT, layout)
+            for component in components:
+                yield QueryEvent(QueryEventType.COMPONENT, component)
+
+            # Step 7: Verify (optional) - Check claims against context
+            pending_verification = None
+            if self.verifier and context_texts and self.verify_in_background:
+                pending_verification = VerificationOutcome(id=str(uuid4()))
+            elif self.verifier and context_texts:
                 verification, verifier_usage = await self.verifier.verify(layout, components, context_texts)
                 total_input_tokens += verifier_usage.get("input_tokens", 0)
                 total_output_tokens += verifier_usage.get("output_tokens", 0)
@@ -159,15 +312,16 @@ class ExecuteQuery:
                     logger.warning(
                         f"Verification found issues: {len(verification.unsupported_claims)} claims"
                     )
+                    before = {component.id for component in components}
                     components = self._filter_unsupported_claims(
                         components, verification
                     )
+                    for component in components:
+                        if component.id not in before:
+                            yield QueryEvent(QueryEventType.NOTICE, component)
 
             processing_time_ms = int((time.time() - start_time) * 1000)
 
-            # Aggregate sources from retrieved chunks
-            sources = self._aggregate_sources(retrieval.chunks)
-
             # Build result
             result = RAGResult(
                 layout=layout,
@@ -182,6 +336,9 @@ class ExecuteQuery:
                 ),
                 sources=sources,
                 cached=False,
+                verification=pending_verification,
+                corpus_versions=corpus_snapshot,
+                computed_at=start_time,
             )
 
             # Calculate cost - embedding tokens from texts that get embedded
@@ -198,18 +355,223 @@ class ExecuteQuery:
                 llm_output_tokens=total_output_tokens,
                 vector_queries=vector_queries,
                 margin=self.cost_margin,
+                llm_input_tokens_saved=tokens_saved,
             )
 
             result.cost = cost
 
             # Cache result
-            await self.cache.set(cache_key, result, self.cache_ttl_seconds)
+            await self.cache.set(cache_key, result, self._cache_expiry_seconds)
+            if self.semantic_cache and query_embedding is not None:
+                await self._semantic_store(query, query_embedding, cache_key)
+
+            if pending_verification is not None:
+                await self.cache.set(
+                    self._verification_key(pending_verification.id),
+                    pending_verification,
+                    self.cache_ttl_seconds,
+                )
+                verification_task = asyncio.create_task(
+                    self._verify_in_background(cache_key, result, context_texts)
+                )
+                _background_tasks.add(verification_task)
+                verification_task.add_done_callback(_background_tasks.discard)
 
-            return ExecuteQueryResult(result=result, cost=cost)
+            final = ExecuteQueryResult(result=result, cost=cost)
 
         except Exception as e:
             logger.exception(f"Pipeline error: {e}")
-            return self._error_response(query, str(e), start_time)
+            final = self._error_response(query, str(e), start_time)
+
+        yield QueryEvent(QueryEventType.RESULT, final)
+
+        if verification_task is not None:
+            # Shielded so a disconnecting client does not cancel the cache patch
+            outcome = await asyncio.shield(verification_task)
+            for notice in outcome.notices:
+                yield QueryEvent(QueryEventType.NOTICE, notice)
+            yield QueryEvent(QueryEventType.VERIFICATION, outcome)
+
+    async def _semantic_lookup(
+        self, query: Query, cache_key: str
+    ) -> tuple[RAGResult | None, list[float] | None]:
+        """Find the result of a similar earlier query. Also returns the query embedding to store."""
+        try:
+            embedding = await self.embedder.embed_single(query.text)
+            similar_key = await self.semantic_cache.lookup(embedding, self._semantic_scope(query))
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None, None
+
+        if similar_key is None or similar_key == cache_key:
+            return None, embedding
+        # A stale neighbour is not refreshed on this query's behalf
+        result = await self._load_fresh(query, similar_key)
+        if result is not None:
+            logger.info(f"Semantic cache hit for query: {query.text[:80]}")
+        return result, embedding
+
+    async def _semantic_store(self, query: Query, embedding: list[float], cache_key: str) -> None:
+        try:
+            await self.semantic_cache.store(embedding, self._semantic_scope(query), cache_key)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def _semantic_scope(self, query: Query) -> str:
+        """Queries only share results when their filters match exactly."""
+        if not query.filters:
+            return "unfiltered"
+        return hashlib.sha256(repr(query.filters).encode()).hexdigest()[:16]
+
+    def _compress(
+        self,
+        query: Query,
+        intent: IntentResult,
+        retrieval: RetrievalResult,
+        component_type: str | None,
+    ) -> CompressedContext:
+        """Context for one extraction (or the verifier, with no component type)."""
+        if self.context_compressor is None:
+            return CompressedContext(texts=retrieval.context_texts)
+        return self.context_compressor.compress(
+            query.text, intent, retrieval.chunks, component_type
+        )
+
+    @property
+    def _cache_expiry_seconds(self) -> int:
+        """Stale results must outlive the freshness TTL to be served while revalidating."""
+        return self.cache_ttl_seconds + self.stale_while_revalidate_seconds
+
+    async def _corpus_snapshot(self, query: Query) -> dict[str, int]:
+        """Corpus counters a result for this query depends on, narrowed by its filters."""
+        if not self.corpus_versions:
+            return {}
+        filters = query.filters
+        try:
+            return await self.corpus_versions.snapshot(
+                document_types=filters.document_types if filters else None,
+                source_names=filters.sources if filters else None,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read corpus versions: {e}")
+            return {}
+
+    async def _is_fresh(self, query: Query, result: RAGResult) -> bool:
+        if time.time() - result.computed_at > self.cache_ttl_seconds:
+            return False
+        if not result.corpus_versions:
+            return True
+        return await self._corpus_snapshot(query) == result.corpus_versions
+
+    async def _load_fresh(self, query: Query, cache_key: str) -> RAGResult | None:
+        result = await self.cache.get(cache_key)
+        if result is not None and await self._is_fresh(query, result):
+            return result
+        return None
+
+    def _schedule_revalidation(self, query: Query, cache_key: str) -> None:
+        if cache_key in _revalidating:
+            return
+        _revalidating.add(cache_key)
+        task = asyncio.create_task(self._revalidate(query, cache_key))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _revalidate(self, query: Query, cache_key: str) -> None:
+        """Recompute a stale result in the background; the run caches it as usual."""
+        try:
+            if self.coalescer is None:
+                await self._refresh(query, cache_key)
+                return
+            # Other workers refreshing the same key wait for this run's result
+            async with self.coalescer.flight(
+                cache_key, lambda: self._load_fresh(query, cache_key)
+            ) as flight:
+                if flight.leader:
+                    flight.publish(await self._refresh(query, cache_key))
+        except Exception as e:
+            logger.warning(f"Failed to refresh cached result {cache_key}: {e}")
+        finally:
+            _revalidating.discard(cache_key)
+
+    async def _refresh(self, query: Query, cache_key: str) -> RAGResult | None:
+        result = None
+        async with aclosing(self._run_pipeline(query, cache_key, None, time.time())) as events:
+            async for event in events:
+                if event.type == QueryEventType.RESULT:
+                    result = event.data.result
+        logger.info(f"Refreshed cached result for query: {query.text[:80]}")
+        return result
+
+    async def get_verification(self, verification_id: str) -> VerificationOutcome | None:
+        """Look up the outcome of a background verification."""
+        return await self.cache.get(self._verification_key(verification_id))
+
+    async def _verify_in_background(
+        self,
+        cache_key: str,
+        result: RAGResult,
+        context_texts: list[str],
+    ) -> VerificationOutcome:
+        """Verify a returned result, then patch the cached copy and publish the outcome."""
+        assert self.verifier is not None and result.verification is not None
+        outcome = VerificationOutcome(id=result.verification.id)
+        components = list(result.components)
+
+        try:
+            verification, verifier_usage = await self.verifier.verify(
+                result.layout, components, context_texts
+            )
+            logger.debug(
+                f"Background verification {outcome.id} used "
+                f"{verifier_usage.get('input_tokens', 0)} input tokens"
+            )
+            if verification.is_valid:
+                outcome.status = VerificationStatus.PASSED
+            else:
+                logger.warning(
+                    f"Verification found issues: {len(verification.unsupported_claims)} claims"
+                )
+                before = {component.id for component in components}
+                components = self._filter_unsupported_claims(components, verification)
+                outcome.notices = [c for c in components if c.id not in before]
+                outcome.status = (
+                    VerificationStatus.FLAGGED if outcome.notices else VerificationStatus.PASSED
+                )
+        except Exception as e:
+            logger.warning(f"Background verification {outcome.id} failed: {e}")
+            outcome.status = VerificationStatus.FAILED
+
+        try:
+            patched = replace(result, components=components, verification=outcome)
+            await self.cache.set(cache_key, patched, self._cache_expiry_seconds)
+            await self.cache.set(
+                self._verification_key(outcome.id), outcome, self.cache_ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store verification {outcome.id}: {e}")
+        return outcome
+
+    def _verification_key(self, verification_id: str) -> str:
+        return f"{VERIFICATION_KEY_PREFIX}{verification_id}"
+
+    def _cached_events(self, result: RAGResult) -> list[QueryEvent]:
+        """Replay a result computed by an earlier or concurrent request; it is free of charge."""
+        result = replace(result, cached=True)
+        return [
+            *self._result_events(result),
+            QueryEvent(
+                QueryEventType.RESULT,
+                ExecuteQueryResult(result=result, cost=CostBreakdown.zero()),
+            ),
+        ]
+
+    def _result_events(self, result: RAGResult) -> list[QueryEvent]:
+        """Events for a result that is already complete (cached or short-circuited)."""
+        events = [QueryEvent(QueryEventType.SOURCES, result.sources)] if result.sources else []
+        events.append(QueryEvent(QueryEventType.LAYOUT, result.layout))
+        events.extend(QueryEvent(QueryEventType.COMPONENT, c) for c in result.components)
+        return events
 
     def _insufficient_data_response(
         self,
@@ -32,6 +32,7 @@ class CostBreakdown:
     margin_cents: int = 0
     total_cents: int = 0
     total_credits: int = 0  # 1 credit = 1 cent
+    llm_input_tokens_saved: int = 0  # Context tokens removed by compression (not charged)
 
     @classmethod
     def zero(cls) -> "CostBreakdown":
@@ -45,6 +46,7 @@ class CostBreakdown:
         llm_output_tokens: int = 0,
         vector_queries: int = 0,
         margin: float = 0.4,
+        llm_input_tokens_saved: int = 0,
     ) -> "CostBreakdown":
         # Use float arithmetic then round at the end to avoid losing small values
         embedding_cost_f = (embedding_tokens / 1000) * EMBEDDING_RATE_CENTS
@@ -75,6 +77,7 @@ class CostBreakdown:
             margin_cents=margin_cents,
             total_cents=total,
             total_credits=total,
+            llm_input_tokens_saved=llm_input_tokens_saved,
         )
 
     def to_dict(self) -> dict:
@@ -90,6 +93,7 @@ class CostBreakdown:
             "margin_cents": self.margin_cents,
             "total_cents": self.total_cents,
             "total_credits": self.total_credits,
+            "llm_input_tokens_saved": self.llm_input_tokens_saved,
         }
 
 
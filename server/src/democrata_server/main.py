@@ -10,7 +10,13 @@ project_root = Path(__file__).parent.parent.parent.parent
 load_dotenv(project_root / ".env")
 
 from democrata_server.api.http import router
-from democrata_server.api.http.deps import get_postgres_pool
+from democrata_server.api.http.deps import (
+    get_postgres_pool,
+    get_query_coalescer,
+    get_semantic_cache,
+    get_text_extractor,
+    get_vector_store,
+)
 from democrata_server.api.http.middleware.cors import setup_cors
 from democrata_server.api.http.middleware.rate_limit import RateLimitMiddleware
 
@@ -42,6 +48,18 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
 
+    for getter in (
+        get_vector_store,
+        get_semantic_cache,
+        get_query_coalescer,
+        get_text_extractor,
+    ):
+        if getter.cache_info().currsize and (client := getter()) is not None:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
 
 app = FastAPI(
     title="Demócrata",
@@ -1,24 +1,55 @@
 """
-Arq worker for scrape ingestion jobs.
+Arq workers for scrape ingestion jobs.
 
-Run with: arq democrata_server.worker.WorkerSettings
+Scrape runs go to one of two queues (see `scrape_queue`): crawls spend their
+time fetching, while single large documents spend it embedding. Run a worker
+per queue, each with its own concurrency:
+
+    arq democrata_server.worker.WorkerSettings       # fetch queue, plus cron schedules
+    arq democrata_server.worker.EmbedWorkerSettings  # embed queue
+
+Sources with a `schedule` in the scrape config are run on that cron schedule,
+each run delayed by up to SCRAPE_SCHEDULE_JITTER_SECONDS so sources sharing a
+schedule don't all start at once. A source is never scraped by two runs at once.
 """
 import logging
 import os
+import random
+from functools import partial
 from pathlib import Path
 from uuid import UUID
 
+from arq import cron
 from arq.connections import RedisSettings
+from arq.cron import CronJob
 from dotenv import load_dotenv
 
-from democrata_server.adapters.scrapers import get_fetcher, get_source_config
-from democrata_server.api.http.deps import get_execute_scrape_run_use_case
+from democrata_server.adapters.scrapers import (
+    EMBED_QUEUE,
+    FETCH_QUEUE,
+    get_fetcher,
+    get_source_config,
+    get_source_configs,
+    scrape_lock_key,
+    scrape_queue,
+)
+from democrata_server.adapters.scrapers.schedule import parse_cron
+from democrata_server.api.http.deps import (
+    get_document_registry,
+    get_execute_scrape_run_use_case,
+    get_job_store,
+    get_postgres_pool,
+    get_text_extractor,
+)
+from democrata_server.domain.ingestion.entities import Job, JobType
 
 project_root = Path(__file__).parent.parent.parent
 load_dotenv(project_root / ".env")
 
 logger = logging.getLogger(__name__)
 
+JOB_TIMEOUT_SECONDS = 3600
+
 
 async def run_scrape_job(ctx: dict, job_id: str, source_id: str) -> None:
     """Arq task: run scrape for source_id, updating job in Redis."""
@@ -35,7 +66,21 @@ async def run_scrape_job(ctx: dict, job_id: str, source_id: str) -> None:
         logger.error("Unknown scraper: %s", config.scraper)
         return
 
-    fetcher = fetcher_cls()
+    # Held for at most the job timeout, so a crashed worker cannot block the source for good
+    redis = ctx["redis"]
+    lock = scrape_lock_key(source_id)
+    if not await redis.set(lock, job_id, nx=True, ex=JOB_TIMEOUT_SECONDS):
+        logger.warning("Source %s is already being scraped; skipping job %s", source_id, job_id)
+        job_store = get_job_store()
+        if job := await job_store.get(UUID(job_id)):
+            job.fail(f"Source {source_id} is already being scraped")
+            await job_store.save(job)
+        return
+
+    fetcher = fetcher_cls(
+        document_registry=get_document_registry(),
+        user_agent=os.getenv("SCRAPE_USER_AGENT", "DemocrataBot/1.0"),
+    )
     uuid_id = UUID(job_id)
 
     try:
@@ -43,16 +88,98 @@ async def run_scrape_job(ctx: dict, job_id: str, source_id: str) -> None:
         logger.info("Scrape job %s completed for source %s", job_id, source_id)
     except Exception as e:
         logger.exception("Scrape job %s failed: %s", job_id, e)
+    finally:
+        holder = await redis.get(lock)
+        if holder in (job_id, job_id.encode()):
+            await redis.delete(lock)
+
+
+async def scheduled_scrape(ctx: dict, source_id: str) -> None:
+    """Cron task: create a scrape job for source_id and enqueue it after a random delay."""
+    config = get_source_config(source_id, os.getenv("JURISDICTION", "au"))
+    if not config:
+        logger.error("Scheduled source %s not found in config", source_id)
+        return
+
+    redis = ctx["redis"]
+    if await redis.exists(scrape_lock_key(source_id)):
+        logger.info("Source %s is still being scraped; skipping scheduled run", source_id)
+        return
+
+    job = Job.create(job_type=JobType.SCRAPE, source_id=source_id)
+    await get_job_store().save(job)
+    jitter = float(os.getenv("SCRAPE_SCHEDULE_JITTER_SECONDS", "300"))
+    await redis.enqueue_job(
+        "run_scrape_job",
+        str(job.id),
+        source_id,
+        _queue_name=scrape_queue(config),
+        _defer_by=random.uniform(0, jitter),
+    )
+    logger.info("Scheduled scrape job %s for source %s", job.id, source_id)
+
+
+def scheduled_scrape_jobs(jurisdiction: str | None = None) -> list[CronJob]:
+    """A cron job for every source with a schedule in the scrape config."""
+    jobs = []
+    for config in get_source_configs(jurisdiction):
+        if not config.schedule:
+            continue
+        try:
+            fields = parse_cron(config.schedule)
+        except ValueError as e:
+            logger.error("Invalid schedule for source %s: %s", config.id, e)
+            continue
+        jobs.append(
+            cron(
+                partial(scheduled_scrape, source_id=config.id),
+                name=f"scheduled_scrape:{config.id}",
+                **fields,
+            )
+        )
+    return jobs
 
 
 async def startup(ctx: dict) -> None:
     """Inject dependencies into worker context."""
+    # The document registry lives in PostgreSQL
+    try:
+        await get_postgres_pool().connect()
+    except Exception as e:
+        logger.warning("PostgreSQL connection failed (may not be configured): %s", e)
     ctx["execute_scrape_run"] = get_execute_scrape_run_use_case()
 
 
+async def shutdown(ctx: dict) -> None:
+    """Stop the PDF extraction worker processes and close the PostgreSQL pool."""
+    if get_text_extractor.cache_info().currsize:
+        await get_text_extractor().close()
+    await get_postgres_pool().disconnect()
+
+
+_redis_settings = RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+
 class WorkerSettings:
+    """Fetch queue worker. Also enqueues scheduled runs, so start at least one."""
+
+    functions = [run_scrape_job]
+    cron_jobs = scheduled_scrape_jobs()
+    queue_name = FETCH_QUEUE
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = _redis_settings
+    job_timeout = JOB_TIMEOUT_SECONDS
+    max_jobs = int(os.getenv("SCRAPE_FETCH_MAX_JOBS", "4"))
+
+
+class EmbedWorkerSettings:
+    """Embed queue worker."""
+
     functions = [run_scrape_job]
+    queue_name = EMBED_QUEUE
     on_startup = startup
-    redis_settings = RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-    job_timeout = 3600
-    max_jobs = 1
+    on_shutdown = shutdown
+    redis_settings = _redis_settings
+    job_timeout = JOB_TIMEOUT_SECONDS
+    max_jobs = int(os.getenv("SCRAPE_EMBED_MAX_JOBS", "2"))
@@ -1,5 +1,6 @@
 """Tests for the agent pipeline components."""
 
+import json
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
@@ -14,11 +15,19 @@ from democrata_server.domain.agents.entities import (
     UnsupportedClaim,
     VerificationResult,
 )
-from democrata_server.domain.rag.entities import RetrievalResult
+from democrata_server.domain.ingestion.entities import Chunk
+from democrata_server.domain.rag.entities import QueryFilters, RetrievalResult
 from democrata_server.adapters.agents.config import AgentConfig
+from democrata_server.adapters.agents.cached_extractor import CachedDataExtractor
+from democrata_server.adapters.agents.compressor import SentenceContextCompressor
+from democrata_server.adapters.agents.fast_planner import (
+    CachedQueryPlanner,
+    FastPathQueryPlanner,
+    RuleBasedClassifier,
+)
 from democrata_server.adapters.agents.planner import LLMQueryPlanner
 from democrata_server.adapters.agents.extractor import LLMDataExtractor
-from democrata_server.adapters.agents.retriever import IntentDrivenRetriever
+from democrata_server.adapters.agents.retriever import IntentDrivenRetriever, reciprocal_rank_fusion
 
 
 class TestIntentResult:
@@ -203,6 +212,186 @@ class TestLLMQueryPlanner:
         assert result.rewritten_queries == ["original query"]
 
 
+class TestRuleBasedClassifier:
+    @pytest.fixture
+    def classifier(self):
+        return RuleBasedClassifier()
+
+    def test_voting_query_on_named_bill(self, classifier):
+        result = classifier.classify("How did Labor vote on the Climate Change Bill 2022?")
+
+        assert result.query_type == QueryType.VOTING
+        assert result.entities.parties == ["Labor"]
+        assert result.entities.bills == ["Climate Change Bill 2022"]
+        assert result.entities.date_from is None
+        assert result.expected_components == ["voting_breakdown", "text_block"]
+        assert result.confidence >= 0.85
+
+    def test_comparative_query_rewrites_per_party(self, classifier):
+        result = classifier.classify("Compare the major parties on housing since 2019")
+
+        assert result.query_type == QueryType.COMPARATIVE
+        assert result.retrieval_strategy == RetrievalStrategy.MULTI_ENTITY
+        assert result.rewritten_queries == [
+            "Labor housing since 2019",
+            "Liberal housing since 2019",
+        ]
+        assert result.entities.date_from == "2019-01-01"
+
+    def test_leaves_ambiguous_queries_to_the_llm(self, classifier):
+        assert classifier.classify("Why did the carbon tax fail?") is None
+        assert classifier.classify("Compare housing policy") is None
+        assert classifier.classify("What did Anthony Albanese say about housing?").confidence < 0.85
+
+
+class TestPlannerShortcuts:
+    @pytest.mark.asyncio
+    async def test_fast_path_skips_llm_only_when_confident(self):
+        llm = AsyncMock()
+        llm.analyze = AsyncMock(
+            return_value=(IntentResult.default_factual("q"), {"input_tokens": 5})
+        )
+        planner = FastPathQueryPlanner(llm)
+
+        intent, usage = await planner.analyze("How did the Greens vote on the Housing Bill?")
+        assert intent.query_type == QueryType.VOTING
+        assert usage["input_tokens"] == 0
+        llm.analyze.assert_not_called()
+
+        await planner.analyze("Why did the carbon tax fail?")
+        llm.analyze.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_reuses_intents_for_normalized_query(self):
+        cache = MagicMock()
+        stored = {}
+        cache.get = AsyncMock(side_effect=lambda key: stored.get(key))
+        cache.set = AsyncMock(side_effect=lambda key, value, ttl: stored.__setitem__(key, value))
+        llm = AsyncMock()
+        llm.analyze = AsyncMock(
+            return_value=(IntentResult.default_factual("q"), {"input_tokens": 5})
+        )
+        planner = CachedQueryPlanner(llm, cache, namespace="gpt-4o-mini")
+
+        await planner.analyze("Why did the carbon tax fail?")
+        _, usage = await planner.analyze("  why did the CARBON tax fail ")
+
+        llm.analyze.assert_called_once()
+        assert usage["input_tokens"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_skips_planner_fallbacks(self):
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock()
+        llm = AsyncMock()
+        llm.analyze = AsyncMock(
+            return_value=(IntentResult.default_factual("q"), {"input_tokens": 0})
+        )
+
+        await CachedQueryPlanner(llm, cache).analyze("q")
+
+        cache.set.assert_not_called()
+
+
+class TestCachedDataExtractor:
+    @pytest.fixture
+    def inner(self):
+        inner = AsyncMock()
+        inner.extract = AsyncMock(
+            return_value=(
+                ExtractionResult(component_type="timeline", extracted_data={"events": []}),
+                {"input_tokens": 100, "output_tokens": 20},
+            )
+        )
+        return inner
+
+    @pytest.fixture
+    def extractor(self, inner):
+        stored = {}
+        cache = MagicMock()
+        cache.get = AsyncMock(side_effect=lambda key: stored.get(key))
+        cache.set = AsyncMock(side_effect=lambda key, value, ttl: stored.__setitem__(key, value))
+        return CachedDataExtractor(inner, cache, namespace="gpt-4o")
+
+    @pytest.mark.asyncio
+    async def test_same_chunks_in_any_order_hit(self, extractor, inner):
+        intent = IntentResult.default_factual("q")
+        intent.entities.bills = ["Housing Bill"]
+
+        await extractor.extract("timeline", ["chunk a", "chunk b"], intent)
+        result, usage = await extractor.extract("timeline", ["chunk b", "chunk a"], intent)
+
+        inner.extract.assert_called_once()
+        assert result.extracted_data == {"events": []}
+        assert usage["input_tokens"] == 0
+        assert (extractor.stats.hits, extractor.stats.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_component_type_context_and_focus_are_part_of_key(self, extractor, inner):
+        intent = IntentResult.default_factual("q")
+        other_focus = IntentResult.default_factual("q")
+        other_focus.entities.parties = ["Greens"]
+
+        await extractor.extract("timeline", ["chunk a"], intent)
+        await extractor.extract("chart", ["chunk a"], intent)
+        await extractor.extract("timeline", ["chunk a", "chunk c"], intent)
+        await extractor.extract("timeline", ["chunk a"], other_focus)
+
+        assert inner.extract.call_count == 4
+        assert extractor.stats.hit_rate == 0.0
+
+
+def _word_count(texts):
+    return sum(len(t.split()) for t in texts)
+
+
+class TestSentenceContextCompressor:
+    @pytest.fixture
+    def intent(self):
+        intent = IntentResult.default_factual("q")
+        intent.entities.bills = ["Housing Bill"]
+        return intent
+
+    def test_removes_overlap_between_adjacent_chunks(self, intent):
+        document_id = uuid4()
+        overlap = "The Housing Bill passed the Senate after a long debate on amendments."
+        chunks = [
+            Chunk(uuid4(), document_id, text=f"Housing Bill opened. {overlap}", position=0),
+            Chunk(uuid4(), document_id, text=f"{overlap} Housing Bill closed.", position=1),
+        ]
+
+        compressed = SentenceContextCompressor(_word_count).compress("housing", intent, chunks)
+
+        assert " ".join(compressed.texts).count(overlap) == 1
+        assert compressed.tokens_saved == len(overlap.split())
+
+    def test_keeps_relevant_sentences_or_whole_chunk(self, intent):
+        chunks = [
+            Chunk.create(
+                uuid4(), "Weather was mild. The Housing Bill passed. Lunch was served.", 0
+            ),
+            Chunk.create(uuid4(), "Nothing here matches. Still retrieved by vectors.", 0),
+        ]
+
+        compressed = SentenceContextCompressor(_word_count).compress("housing", intent, chunks)
+
+        assert compressed.texts == [
+            "The Housing Bill passed.",
+            "Nothing here matches. Still retrieved by vectors.",
+        ]
+
+    def test_budget_depends_on_component_type(self, intent):
+        chunks = [Chunk.create(uuid4(), "Housing " * 10 + "end.", i) for i in range(10)]
+        compressor = SentenceContextCompressor(_word_count, component_token_budget=40)
+
+        text_block = compressor.compress("housing", intent, chunks, "text_block")
+        chart = compressor.compress("housing", intent, chunks, "chart")
+
+        assert text_block.compressed_tokens <= 40 and len(text_block.texts) == 3
+        assert chart.compressed_tokens <= 20 and len(chart.texts) == 1
+
+
 class TestLLMDataExtractor:
     @pytest.fixture
     def extractor(self):
@@ -232,6 +421,37 @@ class TestLLMDataExtractor:
         assert "Liberal" in prompt
         assert "climate" in prompt
 
+    @pytest.mark.asyncio
+    async def test_extract_many_retries_invalid_components_alone(self, extractor):
+        from types import SimpleNamespace
+
+        def response(content):
+            return SimpleNamespace(
+                content=content,
+                response_metadata={},
+                usage_metadata={"input_tokens": 100, "output_tokens": 10},
+            )
+
+        fused = {
+            "timeline": {"events": [{"date": "2024-01-01", "label": "Introduced"}]},
+            "chart": {"series": []},  # Missing the required chart_type
+        }
+        single = {"chart_type": "bar", "series": [{"name": "Votes", "data": []}]}
+        extractor.llm = MagicMock()
+        extractor.llm.ainvoke = AsyncMock(
+            side_effect=[response(json.dumps(fused)), response(json.dumps(single))]
+        )
+
+        results, usage = await extractor.extract_many(
+            ["timeline", "chart"], ["context"], IntentResult.default_factual("q")
+        )
+
+        assert [r.component_type for r in results] == ["timeline", "chart"]
+        assert results[0].extracted_data["events"][0]["label"] == "Introduced"
+        assert results[1].extracted_data["chart_type"] == "bar"
+        assert extractor.llm.ainvoke.call_count == 2
+        assert usage["input_tokens"] == 200
+
     def test_parse_extraction_valid(self, extractor):
         response = '''
         {
@@ -328,23 +548,26 @@ class TestIntentDrivenRetriever:
 
     @pytest.mark.asyncio
     async def test_retrieve_multi_entity(self, mock_embedder):
-        # Create mock vector store with unique chunks for each search
+        mock_embedder.embed = AsyncMock(return_value=[[0.1] * 768, [0.2] * 768])
+
+        # Create mock vector store with unique chunks for each query in the batch
         mock_vector_store = AsyncMock()
-        call_count = [0]
-
-        async def mock_search(*args, **kwargs):
-            chunks = []
-            for i in range(3):  # Return 3 chunks per search
-                chunk = MagicMock()
-                chunk.id = uuid4()  # Unique ID for each chunk
-                chunk.text = f"Chunk {call_count[0]}-{i}"
-                chunk.document_id = uuid4()
-                chunk.metadata = {}
-                chunks.append(chunk)
-            call_count[0] += 1
-            return chunks
-
-        mock_vector_store.search = mock_search
+
+        async def mock_search_batch(vectors, k, filters, sparse_vectors=None):
+            results = []
+            for q in range(len(vectors)):
+                chunks = []
+                for i in range(3):  # Return 3 chunks per query
+                    chunk = MagicMock()
+                    chunk.id = uuid4()  # Unique ID for each chunk
+                    chunk.text = f"Chunk {q}-{i}"
+                    chunk.document_id = uuid4()
+                    chunk.metadata = {}
+                    chunks.append(chunk)
+                results.append(chunks)
+            return results
+
+        mock_vector_store.search_batch = AsyncMock(side_effect=mock_search_batch)
 
         retriever = IntentDrivenRetriever(
             embedder=mock_embedder,
@@ -365,11 +588,60 @@ class TestIntentDrivenRetriever:
 
         assert result.is_sufficient
         assert result.strategy_used == "multi_entity"
-        # Should have called embed for each rewritten query
-        assert mock_embedder.embed_single.call_count == 2
+        # Should embed all rewritten queries in one call and search in one batch
+        mock_embedder.embed.assert_called_once_with(["Labor policy", "Liberal policy"])
+        mock_embedder.embed_single.assert_not_called()
+        mock_vector_store.search_batch.assert_called_once()
+        mock_vector_store.search.assert_not_called()
         # Should have 6 unique chunks (3 from each search)
         assert len(result.chunks) == 6
 
+    @pytest.mark.asyncio
+    async def test_retrieve_multi_entity_falls_back_per_entity(self, mock_embedder):
+        vectors = {"Labor policy": [0.1] * 768, "Liberal policy": [0.2] * 768}
+        mock_embedder.embed = AsyncMock(return_value=list(vectors.values()))
+        mock_embedder.embed_single = AsyncMock(side_effect=lambda q: vectors[q])
+
+        labor_chunks = []
+        for i in range(3):
+            chunk = MagicMock()
+            chunk.id = uuid4()
+            chunk.text = f"Labor chunk {i}"
+            chunk.document_id = uuid4()
+            chunk.metadata = {}
+            labor_chunks.append(chunk)
+
+        async def mock_search(vector, k, filters=None, sparse_vector=None):
+            if vector == vectors["Liberal policy"]:
+                raise RuntimeError("shard unavailable")
+            return labor_chunks
+
+        mock_vector_store = AsyncMock()
+        mock_vector_store.search_batch = AsyncMock(side_effect=RuntimeError("batch failed"))
+        mock_vector_store.search = AsyncMock(side_effect=mock_search)
+
+        retriever = IntentDrivenRetriever(
+            embedder=mock_embedder,
+            vector_store=mock_vector_store,
+            default_top_k=10,
+            min_chunks_for_sufficiency=3,
+        )
+
+        intent = IntentResult(
+            query_type=QueryType.COMPARATIVE,
+            entities=ExtractedEntities(parties=["Labor", "Liberal"]),
+            expected_components=["comparison"],
+            retrieval_strategy=RetrievalStrategy.MULTI_ENTITY,
+            rewritten_queries=["Labor policy", "Liberal policy"],
+        )
+
+        result = await retriever.retrieve("compare policies", intent)
+
+        # The failing entity is dropped; the other entity's chunks survive
+        assert mock_vector_store.search.call_count == 2
+        assert [c.text for c in result.chunks] == [c.text for c in labor_chunks]
+        assert result.coverage == {"Labor policy": 0.3, "Liberal policy": 0.0}
+
     @pytest.mark.asyncio
     async def test_build_filters(self, retriever):
         intent = IntentResult(
@@ -388,3 +660,82 @@ class TestIntentDrivenRetriever:
         assert filters["document_type"] == ["vote", "bill"]
         assert filters["date_from"] == "2024-01-01"
         assert filters["date_to"] == "2024-12-31"
+
+        explicit = retriever._build_filters(
+            intent, QueryFilters(document_types=["hansard"], sources=["Senate Hansard"])
+        )
+
+        assert explicit["document_type"] == ["hansard"]
+        assert explicit["sources"] == ["Senate Hansard"]
+        assert explicit["date_from"] == "2024-01-01"
+
+    @pytest.mark.asyncio
+    async def test_filtered_search_falls_back_to_unfiltered(self, retriever, mock_vector_store):
+        filtered_chunk = MagicMock()
+        filtered_chunk.id = uuid4()
+        filtered_chunk.text = "Filtered match"
+        wider = []
+        for i in range(4):
+            chunk = MagicMock()
+            chunk.id = uuid4()
+            chunk.text = f"Wider match {i}"
+            wider.append(chunk)
+
+        async def mock_search(vector, k, filters, sparse_vector=None):
+            return [filtered_chunk] if filters else [wider[0], filtered_chunk, *wider[1:]]
+
+        mock_vector_store.search = AsyncMock(side_effect=mock_search)
+        intent = IntentResult(
+            query_type=QueryType.FACTUAL,
+            entities=ExtractedEntities(document_types=["bill"]),
+            expected_components=["text_block"],
+            retrieval_strategy=RetrievalStrategy.SINGLE_FOCUS,
+        )
+
+        result = await retriever.retrieve("test query", intent)
+
+        assert mock_vector_store.search.call_count == 2
+        assert result.is_sufficient
+        assert result.chunks[0] is filtered_chunk
+        assert len(result.chunks) == 5
+
+
+class TestRankFusion:
+    @staticmethod
+    def _chunk(text: str):
+        chunk = MagicMock()
+        chunk.id = uuid4()
+        chunk.text = text
+        chunk.metadata = {}
+        return chunk
+
+    def test_rrf_ranks_chunks_found_by_several_queries_first(self):
+        a, b, c, d = (self._chunk(t) for t in "abcd")
+
+        fused = reciprocal_rank_fusion([[a, b, c], [d, c]])
+
+        # c appears in both lists, so it outranks the single-list leaders
+        assert fused[0] is c
+        assert set(fused) == {a, b, c, d}
+        assert len(fused) == 4
+
+    @pytest.mark.asyncio
+    async def test_context_token_budget_drops_lowest_ranked_chunks(self):
+        embedder = AsyncMock()
+        embedder.embed_single = AsyncMock(return_value=[0.1] * 768)
+        store = AsyncMock()
+        store.search = AsyncMock(
+            return_value=[self._chunk("one two three") for _ in range(5)]
+        )
+        retriever = IntentDrivenRetriever(
+            embedder=embedder,
+            vector_store=store,
+            min_chunks_for_sufficiency=3,
+            context_token_budget=7,
+        )
+
+        result = await retriever.retrieve("query", IntentResult.default_factual("query"))
+
+        assert len(result.chunks) == 2
+        # Sufficiency is judged on what was found, not what fit the budget
+        assert result.is_sufficient
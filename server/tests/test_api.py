@@ -1,9 +1,31 @@
+import json
 import os
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from fastapi.testclient import TestClient
 
 from democrata_server.adapters.usage.memory_store import InMemoryJobStore
-from democrata_server.api.http.deps import get_job_store, get_upload_auth
+from democrata_server.api.http.deps import (
+    AnonymousBillingContext,
+    get_anonymous_session_store,
+    get_execute_query_use_case,
+    get_job_store,
+    get_rag_billing_context,
+    get_upload_auth,
+)
+from democrata_server.domain.rag.entities import (
+    Component,
+    Layout,
+    QueryEvent,
+    QueryEventType,
+    QueryMetadata,
+    RAGResult,
+    Section,
+    TextBlock,
+)
+from democrata_server.domain.rag.use_cases import ExecuteQueryResult
+from democrata_server.domain.usage.entities import CostBreakdown
 from democrata_server.main import app
 
 
@@ -47,6 +69,70 @@ class TestIngestionEndpoints:
         assert response.status_code == 404
 
 
+def _override_stream(stream) -> MagicMock:
+    """Serve /rag/query/stream from `stream` for an anonymous session; returns the session."""
+    execute_query = MagicMock()
+    execute_query.stream = stream
+    session = MagicMock()
+    session.can_query.return_value = True
+
+    app.dependency_overrides[get_execute_query_use_case] = lambda: execute_query
+    app.dependency_overrides[get_rag_billing_context] = lambda: AnonymousBillingContext(
+        session_id="s", session=session
+    )
+    app.dependency_overrides[get_anonymous_session_store] = lambda: AsyncMock()
+    return session
+
+
+class TestRAGStreaming:
+    def test_query_stream_emits_ndjson_events(self, client):
+        component = Component.create(TextBlock(content="Answer"))
+        layout = Layout(sections=[Section(component_ids=[component.id])])
+        result = RAGResult(
+            layout=layout,
+            components=[component],
+            metadata=QueryMetadata(
+                documents_retrieved=1, chunks_used=1, processing_time_ms=5, model="test"
+            ),
+        )
+
+        async def stream(query):
+            yield QueryEvent(QueryEventType.LAYOUT, layout)
+            yield QueryEvent(QueryEventType.COMPONENT, component)
+            yield QueryEvent(
+                QueryEventType.RESULT,
+                ExecuteQueryResult(result=result, cost=CostBreakdown.zero()),
+            )
+
+        session = _override_stream(stream)
+
+        response = client.post("/rag/query/stream", json={"query": "What is a bill?"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [e["event"] for e in events] == ["layout", "component", "done"]
+        assert events[1]["data"]["data"]["content"] == "Answer"
+        assert events[2]["data"]["components"][0]["id"] == component.id
+        session.consume_query.assert_called_once()
+
+    def test_query_stream_reports_pipeline_failure_as_error_event(self, client):
+        layout = Layout(sections=[])
+
+        async def stream(query):
+            yield QueryEvent(QueryEventType.LAYOUT, layout)
+            raise RuntimeError("composer failed")
+
+        session = _override_stream(stream)
+
+        response = client.post("/rag/query/stream", json={"query": "What is a bill?"})
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [e["event"] for e in events] == ["layout", "error"]
+        assert events[-1]["data"] == {"status_code": 500, "detail": "composer failed"}
+        session.consume_query.assert_not_called()
+
+
 @pytest.mark.skipif(
     not os.getenv("OPENAI_API_KEY"),
     reason="Requires OPENAI_API_KEY environment variable"
@@ -0,0 +1,299 @@
+"""Tests for query cache adapters."""
+
+import asyncio
+import pickle
+
+import fakeredis
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from democrata_server.adapters.cache import codec
+from democrata_server.adapters.cache.corpus import RedisCorpusVersions
+from democrata_server.adapters.cache.redis import RedisCache
+from democrata_server.adapters.cache.semantic import QdrantSemanticCache
+from democrata_server.adapters.cache.single_flight import RedisSingleFlight
+from democrata_server.domain.rag.entities import (
+    Chart,
+    ChartDataPoint,
+    ChartSeries,
+    ChartType,
+    Comparison,
+    ComparisonAttribute,
+    ComparisonItem,
+    Component,
+    DataTable,
+    Layout,
+    MemberProfile,
+    MemberProfiles,
+    Notice,
+    NoticeLevel,
+    PartyVote,
+    QueryMetadata,
+    RAGResult,
+    Section,
+    SourceReference,
+    TableColumn,
+    TextBlock,
+    Timeline,
+    TimelineEvent,
+    VerificationOutcome,
+    VotingBreakdown,
+)
+from democrata_server.domain.usage.entities import CostBreakdown
+
+
+def _rag_result() -> RAGResult:
+    source = SourceReference(document_id="doc-1", source_name="Hansard", source_url="https://example.org")
+    components = [
+        Component.create(TextBlock(content="Labor voted for the bill. " * 40, sources=[source])),
+        Component.create(
+            Chart(
+                chart_type=ChartType.BAR,
+                series=[ChartSeries(name="Votes", data=[ChartDataPoint(label="For", value=76.0)])],
+            )
+        ),
+        Component.create(
+            Timeline(events=[TimelineEvent(date="2024-03-01", label="Second reading")])
+        ),
+        Component.create(
+            Comparison(
+                items=[ComparisonItem(name="Labor"), ComparisonItem(name="Liberal")],
+                attributes=[ComparisonAttribute(name="Position", values=["For", "Against"])],
+            )
+        ),
+        Component.create(
+            DataTable(
+                columns=[TableColumn(header="Party", key="party")], rows=[{"party": "Greens"}]
+            )
+        ),
+        Component.create(Notice(message="Check facts", level=NoticeLevel.WARNING)),
+        Component.create(
+            MemberProfiles(members=[MemberProfile(member_id="m1", name="A Member", party="IND")])
+        ),
+        Component.create(
+            VotingBreakdown(
+                total_for=76,
+                total_against=60,
+                party_breakdown=[PartyVote(party="Labor", votes_for=70, votes_against=0)],
+            ),
+            size="half",
+        ),
+    ]
+    return RAGResult(
+        layout=Layout(sections=[Section(component_ids=[c.id for c in components])], title="Votes"),
+        components=components,
+        metadata=QueryMetadata(
+            documents_retrieved=2, chunks_used=5, processing_time_ms=1200, model="gpt-4o"
+        ),
+        sources=[source],
+        cost=CostBreakdown.calculate(
+            embedding_tokens=10, llm_input_tokens=2000, llm_output_tokens=500, vector_queries=1
+        ),
+        verification=VerificationOutcome(id="v-1"),
+    )
+
+
+@pytest.fixture
+def corpus_versions():
+    versions = RedisCorpusVersions()
+    versions.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return versions
+
+
+@pytest.fixture
+def semantic_cache(corpus_versions):
+    cache = QdrantSemanticCache(
+        vector_size=3, similarity_threshold=0.9, corpus_versions=corpus_versions
+    )
+    cache.client = AsyncQdrantClient(location=":memory:")
+    return cache
+
+
+class TestQdrantSemanticCache:
+    @pytest.mark.asyncio
+    async def test_lookup_matches_similar_query_in_scope(self, semantic_cache):
+        await semantic_cache.store([1.0, 0.0, 0.0], "unfiltered", "rag:query:labor-vote")
+
+        similar = await semantic_cache.lookup([0.99, 0.05, 0.0], "unfiltered")
+        assert similar == "rag:query:labor-vote"
+        assert await semantic_cache.lookup([0.0, 1.0, 0.0], "unfiltered") is None
+        assert await semantic_cache.lookup([0.99, 0.05, 0.0], "bills-only") is None
+
+    @pytest.mark.asyncio
+    async def test_corpus_change_invalidates_entries(self, semantic_cache, corpus_versions):
+        await semantic_cache.store([1.0, 0.0, 0.0], "unfiltered", "rag:query:a")
+
+        await corpus_versions.bump()
+
+        assert await semantic_cache.lookup([1.0, 0.0, 0.0], "unfiltered") is None
+        await semantic_cache.evict()
+        assert (await semantic_cache.client.count(semantic_cache.collection)).count == 0
+
+    @pytest.mark.asyncio
+    async def test_evict_keeps_newest_entries_under_cap(self, semantic_cache):
+        semantic_cache.max_entries = 2
+        for i in range(4):
+            await semantic_cache.store([1.0, float(i), 0.0], "unfiltered", f"rag:query:{i}")
+
+        await semantic_cache.evict()
+
+        points, _ = await semantic_cache.client.scroll(semantic_cache.collection)
+        assert sorted(p.payload["cache_key"] for p in points) == ["rag:query:2", "rag:query:3"]
+
+
+class TestRedisCorpusVersions:
+    @pytest.mark.asyncio
+    async def test_bump_increments_version(self, corpus_versions):
+        assert await corpus_versions.current() == 0
+        assert await corpus_versions.bump() == 1
+        assert await corpus_versions.current() == 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_tracks_scopes_separately(self, corpus_versions):
+        await corpus_versions.bump(document_type="bill", source_name="Senate")
+        await corpus_versions.bump(document_type="hansard", source_name="Hansard")
+
+        assert await corpus_versions.snapshot() == {"rag:corpus:version": 2}
+        scoped = await corpus_versions.snapshot(document_types=["bill"], source_names=["Hansard"])
+        assert scoped == {
+            "rag:corpus:version:type:bill": 1,
+            "rag:corpus:version:source:Hansard": 1,
+        }
+        assert await corpus_versions.snapshot(source_names=["Unknown"]) == {
+            "rag:corpus:version:source:Unknown": 0
+        }
+
+
+class TestCacheCodec:
+    def test_round_trips_every_component_type(self):
+        result = _rag_result()
+
+        data = codec.encode(result)
+
+        assert codec.decode(data) == result
+        assert len(data) < len(pickle.dumps(result))
+
+    def test_small_values_are_not_compressed(self):
+        data = codec.encode({"status": "ok"})
+
+        assert data[3] == 0
+        assert codec.decode(data) == {"status": "ok"}
+
+    def test_rejects_other_format_versions(self):
+        data = bytearray(codec.encode(_rag_result()))
+        data[2] = codec.FORMAT_VERSION + 1
+
+        with pytest.raises(codec.CodecError):
+            codec.decode(bytes(data))
+
+    def test_refuses_unregistered_types(self):
+        with pytest.raises(TypeError):
+            codec.encode({"value": object()})
+
+
+class TestRedisCache:
+    @pytest.mark.asyncio
+    async def test_round_trip_and_legacy_pickle_entries_miss(self):
+        cache = RedisCache()
+        cache.client = fakeredis.FakeAsyncRedis()
+        result = _rag_result()
+
+        await cache.set("rag:query:a", result, ttl_seconds=60)
+        await cache.client.set("rag:query:legacy", pickle.dumps(result))
+
+        assert await cache.get("rag:query:a") == result
+        assert await cache.get("rag:query:legacy") is None
+
+
+def _single_flight(server: fakeredis.FakeServer) -> RedisSingleFlight:
+    coalescer = RedisSingleFlight(poll_interval_seconds=0.01, wait_timeout_seconds=2)
+    coalescer.client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return coalescer
+
+
+class TestRedisSingleFlight:
+    @pytest.mark.asyncio
+    async def test_in_process_followers_share_leader_result(self):
+        coalescer = _single_flight(fakeredis.FakeServer())
+        runs = 0
+
+        async def request():
+            nonlocal runs
+            async with coalescer.flight("rag:query:a", lambda: asyncio.sleep(0)) as flight:
+                if flight.leader:
+                    runs += 1
+                    await asyncio.sleep(0.05)
+                    flight.publish("answer")
+                return flight.result
+
+        results = await asyncio.gather(*(request() for _ in range(5)))
+
+        assert results == ["answer"] * 5
+        assert runs == 1
+        assert await coalescer.client.keys("rag:flight:*") == []
+
+    @pytest.mark.asyncio
+    async def test_followers_released_when_leader_publishes(self):
+        coalescer = _single_flight(fakeredis.FakeServer())
+        leader_done = asyncio.Event()
+
+        async def lead():
+            async with coalescer.flight("rag:query:a", lambda: asyncio.sleep(0)) as flight:
+                await asyncio.sleep(0.05)
+                flight.publish("answer")
+                await leader_done.wait()
+
+        async def follow():
+            await asyncio.sleep(0.01)
+            async with coalescer.flight("rag:query:a", lambda: asyncio.sleep(0)) as flight:
+                return flight.result
+
+        leader = asyncio.create_task(lead())
+        assert await asyncio.wait_for(follow(), timeout=1) == "answer"
+        assert await coalescer.client.keys("rag:flight:*") == []
+
+        leader_done.set()
+        await leader
+
+    @pytest.mark.asyncio
+    async def test_follower_on_another_worker_reads_cached_result(self):
+        server = fakeredis.FakeServer()
+        worker_a, worker_b = _single_flight(server), _single_flight(server)
+        cache: dict[str, str] = {}
+
+        async def load_result():
+            return cache.get("rag:query:a")
+
+        async def lead():
+            async with worker_a.flight("rag:query:a", load_result) as flight:
+                assert flight.leader
+                await asyncio.sleep(0.05)
+                cache["rag:query:a"] = "answer"
+                flight.publish("answer")
+
+        async def follow():
+            await asyncio.sleep(0.01)
+            async with worker_b.flight("rag:query:a", load_result) as flight:
+                return flight.leader, flight.result
+
+        _, followed = await asyncio.gather(lead(), follow())
+
+        assert followed == (False, "answer")
+
+    @pytest.mark.asyncio
+    async def test_follower_takes_over_when_leader_has_no_result(self):
+        server = fakeredis.FakeServer()
+        worker_a, worker_b = _single_flight(server), _single_flight(server)
+
+        async def lead():
+            async with worker_a.flight("rag:query:a", lambda: asyncio.sleep(0)):
+                await asyncio.sleep(0.05)
+
+        async def follow():
+            await asyncio.sleep(0.01)
+            async with worker_b.flight("rag:query:a", lambda: asyncio.sleep(0)) as flight:
+                return flight.leader
+
+        _, took_over = await asyncio.gather(lead(), follow())
+
+        assert took_over
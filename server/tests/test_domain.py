@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 from uuid import uuid4
+from unittest.mock import AsyncMock
 
 from democrata_server.domain.ingestion.entities import (
     Chunk,
@@ -8,7 +11,10 @@ from democrata_server.domain.ingestion.entities import (
     DocumentType,
     Job,
     JobStatus,
+    ScrapedDocument,
 )
+from democrata_server.domain.ingestion.scrape_use_cases import ExecuteScrapeRun
+from democrata_server.domain.ingestion.use_cases import IngestDocument
 from democrata_server.domain.usage.entities import CostBreakdown, UsageEvent
 
 
@@ -101,3 +107,229 @@ class TestCostBreakdown:
         )
 
         assert cost_with_margin.total_cents > cost_no_margin.total_cents
+
+
+class _InMemoryRegistry:
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, source_url):
+        return self.entries.get(source_url)
+
+    async def register(self, entry):
+        self.entries[entry.source_url] = entry
+
+
+class _PagedExtractor:
+    def __init__(self, pages: list[str]):
+        self.pages = pages
+
+    async def extract_stream(self, content, content_type, filename, on_progress=None):
+        for number, page in enumerate(self.pages, 1):
+            if on_progress is not None:
+                on_progress(number, len(self.pages))
+            yield page
+
+
+def _reference_chunks(text: str, size: int, overlap: int) -> list[str]:
+    chunks, start = [], 0
+    while start < len(text):
+        end = start + size
+        if text[start:end].strip():
+            chunks.append(text[start:end])
+        start = end - overlap
+        if start >= len(text) - overlap:
+            break
+    return chunks
+
+
+class TestIngestDocument:
+    def _use_case(self, pages: list[str], batch_size: int = 3) -> IngestDocument:
+        embedder = AsyncMock()
+        embedder.embed.side_effect = lambda texts: [[0.1] * 3 for _ in texts]
+        job_store = AsyncMock()
+        job_store.save.side_effect = lambda job: self.progress.append(job.progress_percent)
+        self.progress: list[int] = []
+        return IngestDocument(
+            blob_store=AsyncMock(),
+            embedder=embedder,
+            vector_store=AsyncMock(),
+            job_store=job_store,
+            text_extractor=_PagedExtractor(pages),
+            chunk_size=50,
+            chunk_overlap=10,
+            batch_size=batch_size,
+            queue_size=1,
+        )
+
+    @pytest.mark.asyncio
+    async def test_streamed_chunks_match_whole_text_chunking(self):
+        pages = [f"Page {i} " + "word " * (i * 7) for i in range(12)]
+        ingest = self._use_case(pages)
+        metadata = DocumentMetadata(document_type=DocumentType.BILL, source="test")
+
+        result = await ingest.execute(b"%PDF", "a.pdf", "application/pdf", metadata)
+
+        upserted = [c for call in ingest.vector_store.upsert.call_args_list for c in call.args[0]]
+        assert [c.text for c in upserted] == _reference_chunks("\n\n".join(pages), 50, 10)
+        assert [c.position for c in upserted] == list(range(len(upserted)))
+        assert all(c.embedding for c in upserted)
+        assert result.chunks_created == len(upserted)
+        assert result.job.chunks_created == len(upserted)
+
+    @pytest.mark.asyncio
+    async def test_upserts_in_batches_and_reports_progress(self):
+        ingest = self._use_case([], batch_size=4)
+        metadata = DocumentMetadata(document_type=DocumentType.BILL, source="test")
+
+        result = await ingest.execute("x" * 500, "a.txt", "text/plain", metadata)
+
+        batch_sizes = [len(call.args[0]) for call in ingest.vector_store.upsert.call_args_list]
+        assert batch_sizes == [4, 4, 4, 1]
+        assert result.job.status == JobStatus.SUCCESS
+        assert self.progress[1:-1] == sorted(self.progress[1:-1])
+        assert 0 < self.progress[1] < 100
+        assert self.progress[-1] == 100
+
+    @pytest.mark.asyncio
+    async def test_progress_is_estimated_from_pages_not_file_size(self):
+        # A large file with little text, as with most PDFs
+        ingest = self._use_case(["word " * 40 for _ in range(8)])
+        metadata = DocumentMetadata(document_type=DocumentType.BILL, source="test")
+
+        await ingest.execute(b"%PDF" + b"\0" * 1_000_000, "a.pdf", "application/pdf", metadata)
+
+        during = self.progress[1:-1]
+        assert during == sorted(during)
+        assert max(during) >= 50
+        assert self.progress[-1] == 100
+
+    @pytest.mark.asyncio
+    async def test_stage_failure_fails_the_job(self):
+        ingest = self._use_case([])
+        ingest.vector_store.upsert.side_effect = RuntimeError("qdrant down")
+        metadata = DocumentMetadata(document_type=DocumentType.BILL, source="test")
+
+        with pytest.raises(RuntimeError, match="qdrant down"):
+            await ingest.execute("x" * 500, "a.txt", "text/plain", metadata)
+
+        job = ingest.job_store.save.call_args.args[0]
+        assert job.status == JobStatus.FAILED
+        assert job.error_message == "qdrant down"
+        ingest.vector_store.delete_by_document.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_registry_skips_unchanged_and_replaces_changed_documents(self):
+        ingest = self._use_case([])
+        ingest.document_registry = _InMemoryRegistry()
+        metadata = DocumentMetadata(
+            document_type=DocumentType.BILL, source="test", source_url="https://aph.gov.au/b1"
+        )
+
+        first = await ingest.execute("x" * 100, "b1.html", "text/html", metadata)
+        unchanged = await ingest.execute("x" * 100, "b1.html", "text/html", metadata)
+        changed = await ingest.execute("y" * 100, "b1.html", "text/html", metadata)
+
+        assert unchanged.skipped
+        assert unchanged.document.id == first.document.id
+        assert unchanged.job.documents_skipped == 1
+        assert ingest.vector_store.upsert.call_count == 2
+        ingest.vector_store.delete_by_document.assert_awaited_once_with(first.document.id)
+        entry = ingest.document_registry.entries["https://aph.gov.au/b1"]
+        assert entry.document_id == changed.document.id
+        assert entry.chunk_count == changed.chunks_created
+
+    @pytest.mark.asyncio
+    async def test_corpus_version_failure_does_not_fail_ingested_document(self):
+        ingest = self._use_case([])
+        ingest.corpus_versions = AsyncMock()
+        ingest.corpus_versions.bump.side_effect = RuntimeError("redis down")
+        metadata = DocumentMetadata(document_type=DocumentType.BILL, source="test")
+
+        result = await ingest.execute("x" * 100, "a.txt", "text/plain", metadata)
+
+        assert result.job.status == JobStatus.SUCCESS
+        ingest.vector_store.delete_by_document.assert_not_called()
+
+
+class _ListFetcher:
+    def __init__(self, count: int):
+        self.count = count
+        self.closed = False
+
+    async def fetch(self, config):
+        for i in range(self.count):
+            yield ScrapedDocument(
+                content=f"Document {i}",
+                metadata=DocumentMetadata(
+                    document_type=DocumentType.BILL, source="bills", source_url=f"https://aph.gov.au/{i}"
+                ),
+            )
+
+    async def close(self):
+        self.closed = True
+
+
+class TestExecuteScrapeRun:
+    def _run(self, ingest) -> tuple[ExecuteScrapeRun, Job]:
+        job = Job.create()
+        job_store = AsyncMock()
+        job_store.get.return_value = job
+        return ExecuteScrapeRun(ingest, job_store, max_concurrent_documents=2), job
+
+    @pytest.mark.asyncio
+    async def test_ingests_concurrently_and_records_failures(self):
+        in_flight = max_in_flight = 0
+
+        async def execute(content, existing_job, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if content == "Document 2":
+                raise RuntimeError("embedding failed")
+            existing_job.documents_processed += 1
+            existing_job.chunks_created += 3
+
+        ingest = AsyncMock()
+        ingest.execute.side_effect = execute
+        run, job = self._run(ingest)
+        fetcher = _ListFetcher(5)
+
+        await run.execute(job.id, None, fetcher)
+
+        assert max_in_flight == 2
+        assert job.status == JobStatus.SUCCESS
+        assert (job.documents_processed, job.chunks_created, job.documents_failed) == (4, 12, 1)
+        assert job.failures == ["https://aph.gov.au/2: embedding failed"]
+        assert fetcher.closed
+
+    @pytest.mark.asyncio
+    async def test_not_modified_documents_count_as_skipped(self):
+        class NotModifiedFetcher(_ListFetcher):
+            async def fetch(self, config):
+                async for scraped in super().fetch(config):
+                    scraped.not_modified = True
+                    yield scraped
+
+        ingest = AsyncMock()
+        run, job = self._run(ingest)
+
+        await run.execute(job.id, None, NotModifiedFetcher(3))
+
+        ingest.execute.assert_not_called()
+        assert job.status == JobStatus.SUCCESS
+        assert (job.documents_processed, job.documents_skipped) == (0, 3)
+
+    @pytest.mark.asyncio
+    async def test_fails_when_every_document_fails(self):
+        ingest = AsyncMock()
+        ingest.execute.side_effect = RuntimeError("qdrant down")
+        run, job = self._run(ingest)
+
+        with pytest.raises(RuntimeError, match="All 3 documents failed"):
+            await run.execute(job.id, None, _ListFetcher(3))
+
+        assert job.status == JobStatus.FAILED
+        assert job.documents_failed == 3
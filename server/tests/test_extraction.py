@@ -0,0 +1,80 @@
+"""Tests for text extraction adapters."""
+
+from io import BytesIO
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from democrata_server.adapters.extraction import (
+    ContentTypeExtractor,
+    ExtractionError,
+    PdfExtractor,
+)
+
+
+def _pdf(page_texts: list[str]) -> bytes:
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for text in page_texts:
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+async def _collect(stream) -> list[str]:
+    return [part async for part in stream]
+
+
+class TestPdfExtractor:
+    @pytest.mark.asyncio
+    async def test_stream_yields_pages_in_order(self):
+        extractor = PdfExtractor(max_workers=2, pages_per_task=2)
+        content = _pdf([f"Page {i}" for i in range(7)])
+        reported: list[tuple[int, int]] = []
+        try:
+            pages = await _collect(
+                extractor.extract_stream(
+                    content, "application/pdf", "a.pdf", lambda *p: reported.append(p)
+                )
+            )
+        finally:
+            await extractor.close()
+
+        assert pages == [f"Page {i}" for i in range(7)]
+        assert reported == [(i, 7) for i in range(1, 8)]
+        assert "\n\n".join(pages) == extractor.extract(content, "application/pdf", "a.pdf")
+
+    @pytest.mark.asyncio
+    async def test_rejects_files_over_size_limit(self):
+        extractor = PdfExtractor(max_file_mb=1)
+
+        with pytest.raises(ExtractionError):
+            await _collect(
+                extractor.extract_stream(b"0" * (2 * 1024 * 1024), "application/pdf", "big.pdf")
+            )
+
+
+class TestContentTypeExtractor:
+    @pytest.mark.asyncio
+    async def test_stream_routes_plain_text(self):
+        extractor = ContentTypeExtractor()
+
+        parts = await _collect(extractor.extract_stream(b"Hello", "text/plain", "a.txt"))
+
+        assert parts == ["Hello"]
@@ -1,11 +1,18 @@
+import json
 import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 
+import fakeredis
+import httpx
 import pytest
 
+from democrata_server.adapters.llm.cached_embedder import CachedEmbedder, decode_vector
 from democrata_server.adapters.llm.config import EmbeddingConfig, EmbeddingProvider
-from democrata_server.adapters.llm.embedder import OpenAIEmbedder
+from democrata_server.adapters.llm.embedder import OpenAIEmbedder, pack_by_tokens
 from democrata_server.adapters.llm.factory import create_embedder
-from democrata_server.adapters.llm.ollama_embedder import OllamaEmbedder
+from democrata_server.adapters.llm.ollama_embedder import OllamaEmbedder, OllamaEmbeddingError
+from democrata_server.adapters.llm.sparse_encoder import BM25SparseEncoder, term_index
 
 
 class TestEmbeddingConfig:
@@ -52,6 +59,18 @@ class TestFactory:
 
         assert isinstance(embedder, OllamaEmbedder)
 
+    def test_create_cached_embedder(self):
+        config = EmbeddingConfig(
+            provider=EmbeddingProvider.OLLAMA,
+            model="nomic-embed-text",
+            cache_enabled=True,
+        )
+
+        embedder = create_embedder(config)
+
+        assert isinstance(embedder, CachedEmbedder)
+        assert isinstance(embedder.inner, OllamaEmbedder)
+
 
 class TestOllamaClients:
     def test_ollama_embedder_initialization(self):
@@ -62,3 +81,132 @@ class TestOllamaClients:
 
         assert embedder.base_url == "http://localhost:11434"
         assert embedder.model == "nomic-embed-text"
+
+
+class TestOllamaBatching:
+    @staticmethod
+    def _embedder(handler, batch_size: int = 2) -> OllamaEmbedder:
+        embedder = OllamaEmbedder(batch_size=batch_size, max_concurrency=2)
+        embedder._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return embedder
+
+    @pytest.mark.asyncio
+    async def test_embed_sends_micro_batches_in_order(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            inputs = json.loads(request.content)["input"]
+            requests.append(inputs)
+            return httpx.Response(200, json={"embeddings": [[float(t)] for t in inputs]})
+
+        embedder = self._embedder(handler)
+        embeddings = await embedder.embed(["1", "2", "3", "4", "5"])
+
+        assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert sorted(len(r) for r in requests) == [1, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_split_to_isolate_bad_chunk(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            inputs = json.loads(request.content)["input"]
+            if "bad" in inputs:
+                return httpx.Response(400, text="input too long")
+            return httpx.Response(200, json={"embeddings": [[1.0] for _ in inputs]})
+
+        embedder = self._embedder(handler, batch_size=4)
+
+        with pytest.raises(OllamaEmbeddingError) as exc_info:
+            await embedder.embed(["a", "b", "bad", "c"])
+
+        assert exc_info.value.chunk_index == 2
+
+
+class TestOpenAIBatching:
+    def test_pack_by_tokens_respects_budgets(self):
+        assert pack_by_tokens([3, 3, 3, 3], max_tokens=6, max_inputs=10) == [[0, 1], [2, 3]]
+        assert pack_by_tokens([1, 1, 1], max_tokens=100, max_inputs=2) == [[0, 1], [2]]
+        # Oversized inputs go on their own rather than being dropped
+        assert pack_by_tokens([1, 50, 1], max_tokens=10, max_inputs=10) == [[0], [1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_embed_reassembles_packs_in_input_order(self):
+        embedder = OpenAIEmbedder(api_key="test-key", max_batch_tokens=1, max_concurrency=3)
+
+        async def create(model, input):
+            # Return items out of order to check reassembly uses `index`
+            items = [
+                SimpleNamespace(index=i, embedding=[float(text)]) for i, text in enumerate(input)
+            ]
+            return SimpleNamespace(data=list(reversed(items)))
+
+        embedder.client = SimpleNamespace(
+            embeddings=SimpleNamespace(create=AsyncMock(side_effect=create))
+        )
+
+        embeddings = await embedder.embed(["1", "2", "3"])
+
+        assert embeddings == [[1.0], [2.0], [3.0]]
+        assert embedder.client.embeddings.create.call_count == 3
+
+
+class TestCachedEmbedder:
+    @pytest.fixture
+    def inner(self):
+        inner = AsyncMock()
+        inner.embed = AsyncMock(side_effect=lambda texts: [[float(len(t)), 0.5] for t in texts])
+        return inner
+
+    @pytest.fixture
+    def embedder(self, inner):
+        embedder = CachedEmbedder(inner=inner, model="test-model", redis_url="redis://fake")
+        embedder._client = fakeredis.FakeAsyncRedis()
+        return embedder
+
+    @pytest.mark.asyncio
+    async def test_embeds_each_distinct_text_once(self, embedder, inner):
+        first = await embedder.embed(["alpha", "beta", "alpha  "])
+        second = await embedder.embed(["beta", "gamma"])
+
+        assert first == [[5.0, 0.5], [4.0, 0.5], [5.0, 0.5]]
+        assert second == [[4.0, 0.5], [5.0, 0.5]]
+        assert [call.args[0] for call in inner.embed.call_args_list] == [
+            ["alpha", "beta"],
+            ["gamma"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_stores_float32_and_serves_other_processes(self, embedder, inner):
+        await embedder.embed(["alpha"])
+
+        raw = await embedder._client.get(embedder.cache_key("alpha"))
+        assert len(raw) == 2 * 4
+        assert decode_vector(raw) == [5.0, 0.5]
+
+        other = CachedEmbedder(inner=inner, model="test-model", redis_url="redis://fake")
+        other._client = embedder._client
+        assert await other.embed_single("alpha") == [5.0, 0.5]
+        assert inner.embed.call_count == 1
+
+    def test_key_depends_on_model(self, embedder):
+        other = CachedEmbedder(inner=None, model="other-model")
+        assert embedder.cache_key("text") != other.cache_key("text")
+
+
+class TestBM25SparseEncoder:
+    def test_query_and_document_share_term_indices(self):
+        encoder = BM25SparseEncoder()
+
+        doc = encoder.encode_documents(["The Climate Change Bill 2022, division 117"])[0]
+        query = encoder.encode_query("climate division 117")
+
+        assert set(query.indices) <= set(doc.indices)
+        assert term_index("the") not in doc.indices  # stopword
+        assert query.values == [1.0] * len(query.indices)
+
+    def test_repeated_terms_saturate(self):
+        encoder = BM25SparseEncoder()
+
+        doc = encoder.encode_documents(["housing housing housing housing"])[0]
+
+        assert doc.indices == [term_index("housing")]
+        assert 1.0 < doc.values[0] < encoder.k1 + 1
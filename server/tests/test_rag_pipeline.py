@@ -0,0 +1,397 @@
+"""Tests for the ExecuteQuery orchestration."""
+
+import asyncio
+import copy
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from democrata_server.domain.agents.entities import (
+    ExtractionResult,
+    IntentResult,
+    UnsupportedClaim,
+    VerificationResult,
+)
+from democrata_server.domain.rag import use_cases
+from democrata_server.domain.rag.entities import (
+    Component,
+    Layout,
+    Query,
+    QueryEventType,
+    QueryFilters,
+    RetrievalResult,
+    Section,
+    TextBlock,
+    VerificationStatus,
+)
+from democrata_server.domain.rag.use_cases import ExecuteQuery
+
+USAGE = {"input_tokens": 10, "output_tokens": 5, "model": "test-model"}
+
+
+class InMemoryCache:
+    """Copies values in and out, like a serialising cache would."""
+
+    def __init__(self):
+        self.values: dict = {}
+
+    async def get(self, key):
+        return copy.deepcopy(self.values.get(key))
+
+    async def set(self, key, value, ttl_seconds=None):
+        self.values[key] = copy.deepcopy(value)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    def query_key(self, query):
+        return f"query:{query.text}"
+
+
+def _chunk(text: str):
+    chunk = MagicMock()
+    chunk.id = uuid4()
+    chunk.document_id = uuid4()
+    chunk.text = text
+    chunk.metadata = {"source_name": "Hansard"}
+    return chunk
+
+
+@pytest.fixture
+def cache():
+    return InMemoryCache()
+
+
+@pytest.fixture
+def pipeline(cache):
+    planner = AsyncMock()
+    planner.analyze = AsyncMock(return_value=(IntentResult.default_factual("q"), USAGE))
+
+    retriever = AsyncMock()
+    retriever.retrieve = AsyncMock(
+        return_value=RetrievalResult(
+            chunks=[_chunk(f"chunk {i}") for i in range(3)], strategy_used="single_focus"
+        )
+    )
+
+    extractor = AsyncMock()
+    extractor.extract = AsyncMock(
+        return_value=(ExtractionResult(component_type="text_block", extracted_data={"a": 1}), USAGE)
+    )
+
+    component = Component.create(TextBlock(content="Answer"))
+    composer = AsyncMock()
+    composer.compose = AsyncMock(
+        return_value=(Layout(sections=[Section(component_ids=[component.id])]), [component], USAGE)
+    )
+
+    return ExecuteQuery(
+        planner=planner,
+        retriever=retriever,
+        extractor=extractor,
+        composer=composer,
+        cache=cache,
+    )
+
+
+class TestExecuteQueryStream:
+    @pytest.mark.asyncio
+    async def test_stream_emits_stages_in_order(self, pipeline):
+        events = [event async for event in pipeline.stream(Query(text="q"))]
+
+        assert [e.type for e in events] == [
+            QueryEventType.PLAN,
+            QueryEventType.SOURCES,
+            QueryEventType.LAYOUT,
+            QueryEventType.COMPONENT,
+            QueryEventType.RESULT,
+        ]
+        final = events[-1].data
+        assert final.result.components[0].content.content == "Answer"
+        assert final.cost.llm_input_tokens == 30
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_verification_notice(self, pipeline):
+        pipeline.verifier = AsyncMock()
+        pipeline.verifier.verify = AsyncMock(
+            return_value=(
+                VerificationResult(
+                    is_valid=False,
+                    unsupported_claims=[UnsupportedClaim(claim_text="x", severity="error")],
+                ),
+                USAGE,
+            )
+        )
+
+        events = [event async for event in pipeline.stream(Query(text="q"))]
+
+        notices = [e for e in events if e.type == QueryEventType.NOTICE]
+        assert len(notices) == 1
+        assert notices[0].data.content.title == "Verification Warning"
+        assert notices[0].data in events[-1].data.result.components
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_cached_result(self, pipeline):
+        first = await pipeline.execute(Query(text="q"))
+        second = await pipeline.execute(Query(text="q"))
+
+        assert not first.result.cached
+        assert second.result.cached
+        assert second.cost.total_credits == 0
+        pipeline.planner.analyze.assert_called_once()
+
+
+class TestSemanticCache:
+    @pytest.mark.asyncio
+    async def test_similar_query_reuses_cached_result(self, pipeline):
+        pipeline.embedder = AsyncMock()
+        pipeline.embedder.embed_single = AsyncMock(return_value=[1.0, 0.0])
+        pipeline.semantic_cache = AsyncMock()
+        pipeline.semantic_cache.lookup = AsyncMock(return_value=None)
+
+        await pipeline.execute(Query(text="how did Labor vote on the climate bill"))
+        pipeline.semantic_cache.store.assert_called_once_with(
+            [1.0, 0.0], "unfiltered", "query:how did Labor vote on the climate bill"
+        )
+
+        pipeline.semantic_cache.lookup = AsyncMock(
+            return_value="query:how did Labor vote on the climate bill"
+        )
+        result = await pipeline.execute(Query(text="Labor's vote on the climate bill?"))
+
+        assert result.result.cached
+        assert result.cost.total_credits == 0
+        pipeline.planner.analyze.assert_called_once()
+
+
+class TestContextCompression:
+    @pytest.mark.asyncio
+    async def test_components_get_compressed_context_and_savings_are_reported(self, pipeline):
+        from democrata_server.adapters.agents.compressor import SentenceContextCompressor
+        from democrata_server.domain.ingestion.entities import Chunk
+
+        chunks = [
+            Chunk.create(uuid4(), "The bill passed. Unrelated remark about weather.", 0),
+            Chunk.create(uuid4(), "Another bill fact.", 0),
+        ]
+        pipeline.retriever.retrieve = AsyncMock(
+            return_value=RetrievalResult(chunks=chunks, strategy_used="single_focus")
+        )
+        pipeline.context_compressor = SentenceContextCompressor(
+            lambda texts: sum(len(t.split()) for t in texts)
+        )
+
+        result = await pipeline.execute(Query(text="Has the bill passed?"))
+
+        context = pipeline.extractor.extract.call_args.args[1]
+        assert context == ["The bill passed.", "Another bill fact."]
+        assert result.cost.llm_input_tokens_saved == 4
+
+
+class TestFusedExtraction:
+    @pytest.mark.asyncio
+    async def test_components_are_extracted_in_one_call(self, pipeline):
+        intent = IntentResult.default_factual("q")
+        intent.expected_components = ["timeline", "text_block"]
+        pipeline.planner.analyze = AsyncMock(return_value=(intent, USAGE))
+        pipeline.extractor.extract_many = AsyncMock(
+            return_value=(
+                [
+                    ExtractionResult(component_type="timeline", extracted_data={"events": []}),
+                    ExtractionResult(component_type="text_block", extracted_data={"a": 1}),
+                ],
+                USAGE,
+            )
+        )
+        pipeline.fuse_extractions = True
+
+        result = await pipeline.execute(Query(text="q"))
+
+        pipeline.extractor.extract_many.assert_called_once()
+        pipeline.extractor.extract.assert_not_called()
+        extractions = pipeline.composer.compose.call_args.args[2]
+        assert [e.component_type for e in extractions] == ["timeline", "text_block"]
+        assert result.cost.llm_input_tokens == 30
+
+
+@pytest.fixture
+def corpus_versions():
+    import fakeredis
+
+    from democrata_server.adapters.cache.corpus import RedisCorpusVersions
+
+    versions = RedisCorpusVersions()
+    versions.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return versions
+
+
+class TestCacheFreshness:
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_then_refreshed(self, pipeline, corpus_versions):
+        pipeline.corpus_versions = corpus_versions
+        pipeline.stale_while_revalidate_seconds = 60
+        await pipeline.execute(Query(text="q"))
+
+        await corpus_versions.bump(document_type="hansard", source_name="Hansard")
+        stale = await pipeline.execute(Query(text="q"))
+        await asyncio.gather(*use_cases._background_tasks)
+
+        assert stale.result.cached
+        assert stale.result.corpus_versions == {"rag:corpus:version": 0}
+        assert pipeline.planner.analyze.call_count == 2
+        refreshed = await pipeline.execute(Query(text="q"))
+        assert refreshed.result.corpus_versions == {"rag:corpus:version": 1}
+        assert pipeline.planner.analyze.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_a_miss_without_revalidation_window(
+        self, pipeline, corpus_versions
+    ):
+        pipeline.corpus_versions = corpus_versions
+        await pipeline.execute(Query(text="q"))
+
+        await corpus_versions.bump(document_type="hansard", source_name="Hansard")
+        second = await pipeline.execute(Query(text="q"))
+
+        assert not second.result.cached
+        assert pipeline.planner.analyze.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_filtered_result_survives_unrelated_ingestion(self, pipeline, corpus_versions):
+        pipeline.corpus_versions = corpus_versions
+        query = Query(text="q", filters=QueryFilters(sources=["Hansard"]))
+        await pipeline.execute(query)
+
+        await corpus_versions.bump(document_type="bill", source_name="Senate")
+        second = await pipeline.execute(query)
+
+        assert second.result.cached
+        pipeline.planner.analyze.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_result_is_stale(self, pipeline, cache):
+        pipeline.stale_while_revalidate_seconds = 60
+        await pipeline.execute(Query(text="q"))
+        cache.values["query:q"].computed_at -= pipeline.cache_ttl_seconds + 1
+
+        stale = await pipeline.execute(Query(text="q"))
+        await asyncio.gather(*use_cases._background_tasks)
+
+        assert stale.result.cached
+        assert pipeline.planner.analyze.call_count == 2
+
+
+class TestQueryCoalescing:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_run_once(self, pipeline):
+        import fakeredis
+
+        from democrata_server.adapters.cache.single_flight import RedisSingleFlight
+
+        coalescer = RedisSingleFlight()
+        coalescer.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        pipeline.coalescer = coalescer
+
+        async def slow_analyze(text):
+            await asyncio.sleep(0.05)
+            return IntentResult.default_factual(text), USAGE
+
+        pipeline.planner.analyze = AsyncMock(side_effect=slow_analyze)
+
+        results = await asyncio.gather(*(pipeline.execute(Query(text="q")) for _ in range(3)))
+
+        pipeline.planner.analyze.assert_called_once()
+        assert [r.result.cached for r in results].count(False) == 1
+        followers = [r for r in results if r.result.cached]
+        assert all(r.cost.total_credits == 0 for r in followers)
+
+
+class TestBackgroundVerification:
+    @pytest.fixture
+    def release(self):
+        return asyncio.Event()
+
+    @pytest.fixture
+    def background_pipeline(self, pipeline, release):
+        async def verify(layout, components, context):
+            await release.wait()
+            return (
+                VerificationResult(
+                    is_valid=False,
+                    unsupported_claims=[UnsupportedClaim(claim_text="x", severity="error")],
+                ),
+                USAGE,
+            )
+
+        pipeline.verifier = AsyncMock()
+        pipeline.verifier.verify = AsyncMock(side_effect=verify)
+        pipeline.verify_in_background = True
+        return pipeline
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_before_verification(self, background_pipeline, cache, release):
+        result = await background_pipeline.execute(Query(text="q"))
+
+        verification = result.result.verification
+        assert verification.status == VerificationStatus.PENDING
+        assert len(result.result.components) == 1
+        pending = await background_pipeline.get_verification(verification.id)
+        assert pending.status == VerificationStatus.PENDING
+
+        release.set()
+        await asyncio.gather(*use_cases._background_tasks)
+
+        outcome = await background_pipeline.get_verification(verification.id)
+        assert outcome.status == VerificationStatus.FLAGGED
+        assert outcome.notices[0].content.title == "Verification Warning"
+        cached = await cache.get("query:q")
+        assert len(cached.components) == 2
+        assert cached.verification.status == VerificationStatus.FLAGGED
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_verification_after_result(self, background_pipeline, release):
+        release.set()
+
+        events = [event async for event in background_pipeline.stream(Query(text="q"))]
+
+        assert [e.type for e in events][-3:] == [
+            QueryEventType.RESULT,
+            QueryEventType.NOTICE,
+            QueryEventType.VERIFICATION,
+        ]
+        assert events[-1].data.status == VerificationStatus.FLAGGED
+
+    @pytest.mark.asyncio
+    async def test_coalesced_follower_does_not_wait_for_verification(
+        self, background_pipeline, release
+    ):
+        import fakeredis
+
+        from democrata_server.adapters.cache.single_flight import RedisSingleFlight
+
+        coalescer = RedisSingleFlight()
+        coalescer.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        background_pipeline.coalescer = coalescer
+
+        async def slow_analyze(text):
+            await asyncio.sleep(0.05)
+            return IntentResult.default_factual(text), USAGE
+
+        background_pipeline.planner.analyze = AsyncMock(side_effect=slow_analyze)
+
+        async def lead():
+            return [event async for event in background_pipeline.stream(Query(text="q"))]
+
+        leader = asyncio.create_task(lead())
+        await asyncio.sleep(0.01)
+
+        # Verification is still held back, but the follower has its result
+        followed = await asyncio.wait_for(background_pipeline.execute(Query(text="q")), timeout=1)
+        assert followed.result.cached
+        assert not leader.done()
+
+        release.set()
+        events = await leader
+        assert events[-1].type == QueryEventType.VERIFICATION
+        background_pipeline.planner.analyze.assert_called_once()
@@ -0,0 +1,203 @@
+"""Tests for scrape fetchers."""
+
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from democrata_server.adapters.scrapers import EMBED_QUEUE, FETCH_QUEUE, scrape_queue
+from democrata_server.adapters.scrapers.configurable_http import ConfigurableHttpFetcher
+from democrata_server.adapters.scrapers.politeness import TokenBucket
+from democrata_server.adapters.scrapers.schedule import parse_cron
+from democrata_server.domain.ingestion.entities import (
+    DocumentType,
+    RegisteredDocument,
+    SourceConfig,
+)
+
+
+class _Registry:
+    def __init__(self, entries: list[RegisteredDocument]):
+        self.entries = {entry.source_url: entry for entry in entries}
+
+    async def get(self, source_url):
+        return self.entries.get(source_url)
+
+    async def register(self, entry):
+        self.entries[entry.source_url] = entry
+
+
+def _fetcher(registry, handler) -> ConfigurableHttpFetcher:
+    fetcher = ConfigurableHttpFetcher(document_registry=registry)
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return fetcher
+
+
+def _html(body: str) -> httpx.Response:
+    return httpx.Response(
+        200, headers={"content-type": "text/html"}, text=f"<html><body>{body}</body></html>"
+    )
+
+
+def _config(*urls: str, **options) -> SourceConfig:
+    return SourceConfig(
+        id="bills",
+        document_type=DocumentType.BILL,
+        scraper="configurable_http",
+        url=urls[0],
+        urls=list(urls),
+        options={"delay_seconds": 0, **options},
+    )
+
+
+class TestConfigurableHttpFetcher:
+    @pytest.mark.asyncio
+    async def test_not_modified_documents_are_not_refetched(self):
+        registry = _Registry(
+            [
+                RegisteredDocument(
+                    source_url="https://aph.gov.au/old",
+                    document_id=uuid4(),
+                    content_hash="abc",
+                    etag='"v1"',
+                    last_modified="Mon, 06 Jan 2025 00:00:00 GMT",
+                )
+            ]
+        )
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(404)
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/html", "etag": '"v9"'},
+                text="<html><body>Bill text</body></html>",
+            )
+
+        fetcher = _fetcher(registry, handler)
+        config = _config("https://aph.gov.au/old", "https://aph.gov.au/new")
+
+        documents = [doc async for doc in fetcher.fetch(config)]
+
+        assert [(doc.metadata.source_url, doc.not_modified) for doc in documents] == [
+            ("https://aph.gov.au/old", True),
+            ("https://aph.gov.au/new", False),
+        ]
+        assert documents[1].etag == '"v9"'
+        assert requests[0].headers["if-modified-since"] == "Mon, 06 Jan 2025 00:00:00 GMT"
+        assert "if-none-match" not in requests[1].headers
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_crawls_links_concurrently_within_robots_rules(self):
+        in_flight = max_in_flight = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, max_in_flight
+            path = request.url.path
+            if path == "/robots.txt":
+                return httpx.Response(200, text="User-agent: *\nDisallow: /private/\n")
+            if path == "/bills":
+                links = "".join(f'<a class="bill" href="/bills/{i}">{i}</a>' for i in range(6))
+                links += '<a class="bill" href="/private/draft">draft</a>'
+                return _html(links)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return _html(f"Bill {path}")
+
+        fetcher = _fetcher(None, handler)
+        config = _config("https://aph.gov.au/bills", link_selector="a.bill", max_concurrency=3)
+
+        documents = [doc async for doc in fetcher.fetch(config)]
+
+        assert sorted(doc.metadata.source_url for doc in documents) == [
+            f"https://aph.gov.au/bills/{i}" for i in range(6)
+        ]
+        assert max_in_flight == 3
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_closing_crawl_early_stops_fetching(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(404)
+            if request.url.path == "/bills":
+                links = "".join(f'<a class="bill" href="/bills/{i}">{i}</a>' for i in range(20))
+                return _html(links)
+            return _html("Bill")
+
+        fetcher = _fetcher(None, handler)
+        config = _config("https://aph.gov.au/bills", link_selector="a.bill", max_concurrency=2)
+
+        documents = fetcher.fetch(config)
+        await anext(documents)
+        await asyncio.sleep(0.01)  # Let the crawl fill its result queue
+        await asyncio.wait_for(documents.aclose(), timeout=1)
+
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+        await fetcher.close()
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_spaces_requests_after_burst(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for _ in range(4):
+            await bucket.acquire()
+
+        # Two immediately, then one every 20ms
+        assert loop.time() - start >= 0.035
+
+
+class TestParseCron:
+    def test_daily_schedule(self):
+        assert parse_cron("0 2 * * *") == {
+            "minute": {0},
+            "hour": {2},
+            "day": None,
+            "month": None,
+            "weekday": None,
+        }
+
+    def test_steps_ranges_and_weekdays(self):
+        fields = parse_cron("*/15 9-17 * * 0,5-7")
+
+        assert fields["minute"] == {0, 15, 30, 45}
+        assert fields["hour"] == set(range(9, 18))
+        assert fields["day"] is None
+        # Cron Friday to Sunday, in arq's Monday-first numbering
+        assert fields["weekday"] == {4, 5, 6}
+        assert parse_cron("0 6 1,15 * *")["day"] == {1, 15}
+
+    def test_rejects_day_and_weekday_both_restricted(self):
+        # Cron means "the 1st or any Monday"; arq would only run on a Monday the 1st
+        with pytest.raises(ValueError, match="both day of month and weekday"):
+            parse_cron("0 6 1 * 1")
+
+    @pytest.mark.parametrize("expression", ["0 2 * *", "60 * * * *", "x * * * *", "*/0 * * * *"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            parse_cron(expression)
+
+
+class TestScrapeQueue:
+    def test_crawls_go_to_fetch_queue(self):
+        config = _config("https://aph.gov.au/bills", link_selector="a.bill")
+        assert scrape_queue(config) == FETCH_QUEUE
+
+    def test_single_documents_go_to_embed_queue(self):
+        assert scrape_queue(_config("https://aph.gov.au/bill.pdf")) == EMBED_QUEUE
+
+    def test_queue_option_overrides(self):
+        config = _config("https://aph.gov.au/bills", link_selector="a.bill", queue="embed")
+        assert scrape_queue(config) == EMBED_QUEUE
@@ -0,0 +1,150 @@
+from uuid import uuid4
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from democrata_server.adapters.llm.sparse_encoder import BM25SparseEncoder
+from democrata_server.adapters.storage.qdrant import QdrantVectorStore
+from democrata_server.domain.ingestion.entities import Chunk
+
+
+@pytest.fixture
+def store():
+    store = QdrantVectorStore(collection="test_chunks", vector_size=3)
+    store.client = AsyncQdrantClient(location=":memory:")
+    return store
+
+
+def _chunk(document_id, text: str, vector: list[float], position: int = 0) -> Chunk:
+    chunk = Chunk.create(document_id, text, position)
+    chunk.embedding = vector
+    chunk.metadata = {"document_type": "bill", "source_name": "Test Bill"}
+    return chunk
+
+
+class TestQdrantVectorStore:
+    @pytest.mark.asyncio
+    async def test_collection_is_created_lazily(self, store):
+        assert not await store.client.collection_exists("test_chunks")
+
+        await store.search([1.0, 0.0, 0.0], k=5)
+
+        assert await store.client.collection_exists("test_chunks")
+
+    @pytest.mark.asyncio
+    async def test_upsert_search_and_delete(self, store):
+        doc_id = uuid4()
+        await store.upsert(
+            [
+                _chunk(doc_id, "about climate", [1.0, 0.0, 0.0], 0),
+                _chunk(doc_id, "about housing", [0.0, 1.0, 0.0], 1),
+            ]
+        )
+
+        results = await store.search([1.0, 0.1, 0.0], k=2)
+
+        assert [c.text for c in results] == ["about climate", "about housing"]
+        assert results[0].document_id == doc_id
+        assert results[0].metadata["source_name"] == "Test Bill"
+        assert results[0].score > results[1].score
+
+        await store.delete_by_document(doc_id)
+        assert await store.search([1.0, 0.0, 0.0], k=2) == []
+
+    @pytest.mark.asyncio
+    async def test_search_batch_returns_results_per_vector(self, store):
+        doc_id = uuid4()
+        await store.upsert(
+            [
+                _chunk(doc_id, "about climate", [1.0, 0.0, 0.0], 0),
+                _chunk(doc_id, "about housing", [0.0, 1.0, 0.0], 1),
+            ]
+        )
+
+        results = await store.search_batch([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], k=1)
+
+        assert [[c.text for c in chunks] for chunks in results] == [
+            ["about climate"],
+            ["about housing"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_surfaces_exact_identifier_matches(self, store):
+        encoder = BM25SparseEncoder()
+        doc_id = uuid4()
+        chunks = [
+            _chunk(doc_id, "General debate on climate policy", [1.0, 0.0, 0.0], 0),
+            _chunk(doc_id, "Division 117 on the Housing Bill", [0.0, 1.0, 0.0], 1),
+        ]
+        for chunk, sparse in zip(chunks, encoder.encode_documents([c.text for c in chunks])):
+            chunk.sparse_embedding = sparse
+        await store.upsert(chunks)
+
+        dense_only = await store.search([1.0, 0.0, 0.0], k=1)
+        hybrid = await store.search(
+            [1.0, 0.0, 0.0], k=1, sparse_vector=encoder.encode_query("division 117")
+        )
+
+        assert dense_only[0].text.startswith("General debate")
+        assert hybrid[0].text.startswith("Division 117")
+
+    @pytest.mark.asyncio
+    async def test_search_applies_document_type_and_date_filters(self, store):
+        doc_id = uuid4()
+        bill = _chunk(doc_id, "2024 bill", [1.0, 0.0, 0.0], 0)
+        bill.metadata["date"] = "2024-03-01"
+        old_bill = _chunk(doc_id, "2019 bill", [1.0, 0.0, 0.0], 1)
+        old_bill.metadata["date"] = "2019-06-30"
+        hansard = _chunk(doc_id, "2024 debate", [1.0, 0.0, 0.0], 2)
+        hansard.metadata.update(document_type="hansard", date="2024-05-01")
+        undated = _chunk(doc_id, "undated bill", [1.0, 0.0, 0.0], 3)
+        undated.metadata["date"] = ""
+        await store.upsert([bill, old_bill, hansard, undated])
+
+        results = await store.search(
+            [1.0, 0.0, 0.0],
+            k=10,
+            filters={"document_type": ["bill"], "date_from": "2020-01-01", "date_to": "2024-12-31"},
+        )
+
+        assert [c.text for c in results] == ["2024 bill"]
+        by_source = await store.search([1.0, 0.0, 0.0], k=10, filters={"sources": ["Other Bill"]})
+        assert by_source == []
+
+    @pytest.mark.asyncio
+    async def test_search_expands_partial_dates_and_ignores_invalid_ones(self, store):
+        doc_id = uuid4()
+        bill = _chunk(doc_id, "2024 bill", [1.0, 0.0, 0.0], 0)
+        bill.metadata["date"] = "2024-12-31"
+        old_bill = _chunk(doc_id, "2019 bill", [1.0, 0.0, 0.0], 1)
+        old_bill.metadata["date"] = "2019-03-15"
+        await store.upsert([bill, old_bill])
+
+        by_year = await store.search(
+            [1.0, 0.0, 0.0], k=10, filters={"date_from": "2020", "date_to": "2024"}
+        )
+        by_month = await store.search(
+            [1.0, 0.0, 0.0], k=10, filters={"date_from": "2019-03", "date_to": "2019-03"}
+        )
+        unparsed = await store.search(
+            [1.0, 0.0, 0.0], k=10, filters={"date_from": "last year", "date_to": "2019-13"}
+        )
+
+        assert [c.text for c in by_year] == ["2024 bill"]
+        assert [c.text for c in by_month] == ["2019 bill"]
+        assert len(unparsed) == 2
+
+    @pytest.mark.asyncio
+    async def test_search_filters_scraped_documents_by_source_id(self, store):
+        doc_id = uuid4()
+        scraped = _chunk(doc_id, "scraped bill", [1.0, 0.0, 0.0], 0)
+        # As ingested from a scrape: the title is the URL's last path segment
+        scraped.metadata.update(source="aph-bills-index", source_name="Bills_Legislation")
+        uploaded = _chunk(doc_id, "uploaded bill", [1.0, 0.0, 0.0], 1)
+        await store.upsert([scraped, uploaded])
+
+        by_id = await store.search([1.0, 0.0, 0.0], k=10, filters={"sources": ["aph-bills-index"]})
+        by_name = await store.search([1.0, 0.0, 0.0], k=10, filters={"sources": ["Test Bill"]})
+
+        assert [c.text for c in by_id] == ["scraped bill"]
+        assert [c.text for c in by_name] == ["uploaded bill"]
@@ -0,0 +1,27 @@
+-- Demócrata Document Registry
+-- Tracks the document currently ingested from each source URL, so scheduled
+-- scrapes skip unchanged documents and replace the chunks of changed ones.
+
+-- =============================================================================
+-- Document Registry
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS public.document_registry (
+    source_url text PRIMARY KEY,
+    document_id uuid NOT NULL,        -- Chunks in the vector store carry this ID
+    content_hash text NOT NULL,       -- SHA-256 of the fetched content
+    chunk_count int NOT NULL DEFAULT 0,
+    created_at timestamptz DEFAULT now(),
+    updated_at timestamptz DEFAULT now()
+);
+
+DROP TRIGGER IF EXISTS update_document_registry_updated_at ON public.document_registry;
+CREATE TRIGGER update_document_registry_updated_at
+    BEFORE UPDATE ON public.document_registry
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- =============================================================================
+-- Row Level Security
+-- =============================================================================
+-- Only the ingestion service (which bypasses RLS) reads or writes the registry
+ALTER TABLE public.document_registry ENABLE ROW LEVEL SECURITY;
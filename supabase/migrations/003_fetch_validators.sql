@@ -0,0 +1,7 @@
+-- Demócrata Fetch Validators
+-- Records the HTTP validators each registered document was fetched with, so
+-- scheduled scrapes can send conditional requests and skip unchanged documents
+-- on a 304 Not Modified.
+
+ALTER TABLE public.document_registry ADD COLUMN IF NOT EXISTS etag text;
+ALTER TABLE public.document_registry ADD COLUMN IF NOT EXISTS last_modified text;  -- As sent by the server